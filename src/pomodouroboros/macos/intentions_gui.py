@@ -188,13 +188,17 @@ class IntentionDataSource(NSObject):
 
     # pragma mark NSTableViewDelegate
 
-    @interactionRoot
     def tableViewSelectionDidChange_(self, notification: NSObject) -> None:
         """
         The selection changed.
         """
-        debug("SELECTION CHANGED:", notification.object().selectedRowIndexes())
-        self.recalculate()
+        # Selection is not part of the model, so there's nothing to save.
+        with showFailures():
+            debug(
+                "SELECTION CHANGED:",
+                notification.object().selectedRowIndexes(),
+            )
+            self.recalculate()
 
     def startingBlocked(self) -> None:
         self.blockingIntervalRunning = True
@@ -15,8 +15,8 @@ from Foundation import NSIndexSet, NSObject
 from objc import IBAction, IBOutlet
 from quickmacapp import Status, answer, mainpoint
 from twisted.internet.defer import Deferred
-from twisted.internet.interfaces import IReactorTime
-from twisted.internet.task import LoopingCall
+from twisted.internet.interfaces import IReactorCore, IReactorTime
+from twisted.internet.threads import deferToThread
 
 from ..model.debugger import debug
 from ..model.intention import Estimate, Intention
@@ -29,8 +29,14 @@ from ..model.intervals import (
 )
 from ..model.nexus import Nexus
 from ..model.observables import Changes, IgnoreChanges, SequenceObserver
-from ..model.storage import loadDefaultNexus
-from ..model.util import interactionRoot, intervalSummary, showFailures
+from ..model.paging import loadDefaultHistory
+from ..model.scheduler import AdvanceScheduler
+from ..model.util import (
+    BackgroundSaver,
+    interactionRoot,
+    intervalSummary,
+    showFailures,
+)
 from ..storage import TEST_MODE
 from .intentions_gui import IntentionDataSource
 from .mac_utils import SometimesBackground
@@ -392,12 +398,14 @@ def newMain(reactor: IReactorTime) -> None:
     """
 
     NSColor.setIgnoresAlpha_(False)
-    theNexus = loadDefaultNexus(
+    history = loadDefaultHistory(
         reactor.seconds(),
         userInterfaceFactory=lambda nexus: MacUserInterface.build(
             nexus, reactor
         ),
     )
+    theNexus = history.nexus
+    assert theNexus is not None
     theNexus.userInterface
     # hmm. UI is lazily constructed which is not great, violates the mac's
     # assumptions about launching, makes it seem sluggish, so let's force it to
@@ -407,10 +415,10 @@ def newMain(reactor: IReactorTime) -> None:
         reactor.seconds() + 1.0, reactor.seconds() + 1000.0
     )
 
-    def doAdvance() -> None:
-        theNexus.advanceToTime(reactor.seconds())
-
-    LoopingCall(doAdvance).start(3.0, now=True)
+    AdvanceScheduler(theNexus, reactor).start()
+    BackgroundSaver(
+        reactor, deferToThread, prepare=lambda nexus: history.prepareSave()
+    ).start(IReactorCore(reactor))
 
     if TEST_MODE:
         # When I'm no longer bootstrapping the application I'll want to *not*
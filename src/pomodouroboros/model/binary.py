@@ -0,0 +1,427 @@
+# -*- test-case-name: pomodouroboros.model.test.test_binary -*-
+"""
+A compact binary encoding of L{SavedNexus}, as an alternative to JSON.
+
+In JSON, every interval repeats the names of its keys, and every timestamp
+is written out in decimal.  Here:
+
+    - the structure is implied by the order of the fields, following
+      L{pomodouroboros.model.schema};
+
+    - pomodoros refer to their intentions by position in the list of
+      intentions, rather than repeating their IDs;
+
+    - timestamps are mostly written as the whole number of seconds since the
+      timestamp before them, since an interval usually ends a whole number of
+      seconds after it starts, and the next one starts when it ends; any that
+      aren't are written as the 8 bytes of the float itself, so the encoding
+      is lossless either way;
+
+    - each interval's type, and the result of a pomodoro's evaluation, are
+      packed into a single byte.
+
+The data begins with L{MAGIC} and a version byte, L{VERSION}.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from math import copysign
+from struct import Struct
+from typing import cast
+
+from .schema import (
+    SavedDuration,
+    SavedEstimate,
+    SavedEvaluation,
+    SavedEvaluationResult,
+    SavedIntention,
+    SavedInterval,
+    SavedIntervalType,
+    SavedNexus,
+    SavedSession,
+)
+from .snapshots import replacingFile
+from .storage import loadFromFile, saveToFile
+
+MAGIC = b"POMO"
+VERSION = 1
+
+_double = Struct("<d")
+
+_intervalTypes: list[SavedIntervalType] = [
+    "Pomodoro",
+    "Break",
+    "GracePeriod",
+    "StartPrompt",
+]
+_intervalCodes = {name: code for code, name in enumerate(_intervalTypes)}
+_results: list[SavedEvaluationResult] = [
+    "distracted",
+    "interrupted",
+    "focused",
+    "achieved",
+]
+_resultCodes = {name: code for code, name in enumerate(_results)}
+
+# Interval type bytes: the type code is in the low 2 bits; for a pomodoro,
+# the next bit is set if it has been evaluated, and the 2 bits above that
+# are the result.
+_evaluated = 1 << 2
+_resultShift = 3
+
+# Number headers: the kind is in the low 2 bits, and for the first two kinds,
+# the zigzag-encoded integer is above them.
+_wholeDelta = 0
+_integer = 1
+_doubleFollows = 2
+
+
+class UnsupportedFormat(Exception):
+    """
+    The data is not a binary snapshot of a nexus, in a version that we can
+    read.
+    """
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return (value >> 1) ^ -(value & 1)
+
+
+@dataclass
+class _Writer:
+    out: bytearray = field(default_factory=bytearray)
+    clock: float = 0.0
+    """
+    The last timestamp written, which the next is written relative to.
+    """
+
+    def varint(self, value: int) -> None:
+        out = self.out
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+    def string(self, value: str) -> None:
+        encoded = value.encode("utf-8")
+        self.varint(len(encoded))
+        self.out += encoded
+
+    def number(self, value: float, base: float) -> None:
+        if type(value) is int:
+            self.varint(_zigzag(value) << 2 | _integer)
+            return
+        delta = value - base
+        if delta.is_integer() and abs(delta) < 2**53:
+            whole = int(delta)
+            candidate = float(base) + whole
+            if candidate == value and copysign(1.0, candidate) == copysign(
+                1.0, value
+            ):
+                self.varint(_zigzag(whole) << 2 | _wholeDelta)
+                return
+        self.out.append(_doubleFollows)
+        self.out += _double.pack(value)
+
+    def time(self, value: float) -> None:
+        self.number(value, self.clock)
+        self.clock = value
+
+
+@dataclass
+class _Reader:
+    data: bytes
+    offset: int = 0
+    clock: float = 0.0
+
+    def byte(self) -> int:
+        value = self.data[self.offset]
+        self.offset += 1
+        return value
+
+    def varint(self) -> int:
+        data = self.data
+        offset = self.offset
+        result = 0
+        shift = 0
+        while True:
+            byte = data[offset]
+            offset += 1
+            result |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        self.offset = offset
+        return result
+
+    def string(self) -> str:
+        length = self.varint()
+        start = self.offset
+        self.offset = end = start + length
+        if end > len(self.data):
+            raise IndexError("string runs past the end")
+        return self.data[start:end].decode("utf-8")
+
+    def number(self, base: float) -> float:
+        header = self.varint()
+        kind = header & 3
+        if kind == _wholeDelta:
+            return float(base) + _unzigzag(header >> 2)
+        if kind == _integer:
+            return _unzigzag(header >> 2)
+        if kind == _doubleFollows:
+            (value,) = _double.unpack_from(self.data, self.offset)
+            self.offset += 8
+            return cast(float, value)
+        raise UnsupportedFormat(f"unknown number kind {kind}")
+
+    def time(self) -> float:
+        self.clock = self.number(self.clock)
+        return self.clock
+
+
+def packNexus(saved: SavedNexus) -> bytes:
+    """
+    Encode a saved nexus in the binary format.
+    """
+    w = _Writer()
+    w.out += MAGIC
+    w.out.append(VERSION)
+    w.string(saved["lastIntentionID"])
+    w.time(saved["initialTime"])
+    w.time(saved["lastUpdateTime"])
+
+    positions: dict[str, int] = {}
+    w.varint(len(saved["intentions"]))
+    for position, intention in enumerate(saved["intentions"]):
+        positions[intention["id"]] = position
+        w.string(intention["id"])
+        w.string(intention["title"])
+        w.string(intention["description"])
+        w.time(intention["created"])
+        w.time(intention["modified"])
+        w.out.append(1 if intention["abandoned"] else 0)
+        w.varint(len(intention["estimates"]))
+        for estimate in intention["estimates"]:
+            w.number(estimate["duration"], 0.0)
+            w.time(estimate["madeAt"])
+
+    w.varint(len(saved["upcomingDurations"]))
+    for duration in saved["upcomingDurations"]:
+        w.out.append(_intervalCodes[duration["intervalType"]])
+        w.number(duration["seconds"], 0.0)
+
+    w.varint(len(saved["streaks"]))
+    for streak in saved["streaks"]:
+        w.varint(len(streak))
+        for interval in streak:
+            if interval["intervalType"] == "Pomodoro":
+                evaluation = interval["evaluation"]
+                w.out.append(
+                    _intervalCodes["Pomodoro"]
+                    if evaluation is None
+                    else _intervalCodes["Pomodoro"]
+                    | _evaluated
+                    | _resultCodes[evaluation["result"]] << _resultShift
+                )
+                intentionID = interval["intentionID"]
+                if intentionID not in positions:
+                    raise ValueError(
+                        f"pomodoro refers to unknown intention {intentionID!r}"
+                    )
+                w.varint(positions[intentionID])
+                w.time(interval["startTime"])
+                w.time(interval["endTime"])
+                w.varint(interval["indexInStreak"])
+                if evaluation is not None:
+                    w.time(evaluation["timestamp"])
+            elif interval["intervalType"] == "Break":
+                w.out.append(_intervalCodes["Break"])
+                w.time(interval["startTime"])
+                w.time(interval["endTime"])
+            elif interval["intervalType"] == "GracePeriod":
+                w.out.append(_intervalCodes["GracePeriod"])
+                w.time(interval["startTime"])
+                w.time(interval["originalPomEnd"])
+            elif interval["intervalType"] == "StartPrompt":
+                w.out.append(_intervalCodes["StartPrompt"])
+                w.time(interval["startTime"])
+                w.time(interval["endTime"])
+                w.number(interval["pointsBeforeLoss"], 0.0)
+                w.number(interval["pointsAfterLoss"], 0.0)
+
+    w.varint(len(saved["sessions"]))
+    for session in saved["sessions"]:
+        w.out.append(1 if session["automatic"] else 0)
+        w.time(session["start"])
+        w.time(session["end"])
+    return bytes(w.out)
+
+
+def unpackNexus(data: bytes) -> SavedNexus:
+    """
+    Decode a saved nexus from the binary format.
+
+    @raise UnsupportedFormat: if C{data} is not in a version of the binary
+        format that we can read, or is truncated.
+    """
+    if data[: len(MAGIC)] != MAGIC:
+        raise UnsupportedFormat("not a binary nexus")
+    version = data[len(MAGIC) : len(MAGIC) + 1]
+    if version != bytes([VERSION]):
+        raise UnsupportedFormat(f"unknown version {version!r}")
+    try:
+        return _unpack(_Reader(data, len(MAGIC) + 1))
+    except IndexError as ie:
+        raise UnsupportedFormat("truncated") from ie
+
+
+def _unpack(r: _Reader) -> SavedNexus:
+    lastIntentionID = r.string()
+    initialTime = r.time()
+    lastUpdateTime = r.time()
+
+    intentions: list[SavedIntention] = []
+    for _ in range(r.varint()):
+        intentionID = r.string()
+        title = r.string()
+        description = r.string()
+        created = r.time()
+        modified = r.time()
+        abandoned = bool(r.byte())
+        estimates: list[SavedEstimate] = []
+        for _ in range(r.varint()):
+            duration = r.number(0.0)
+            estimates.append({"duration": duration, "madeAt": r.time()})
+        intentions.append(
+            {
+                "created": created,
+                "modified": modified,
+                "title": title,
+                "description": description,
+                "estimates": estimates,
+                "abandoned": abandoned,
+                "id": intentionID,
+            }
+        )
+
+    upcomingDurations: list[SavedDuration] = []
+    for _ in range(r.varint()):
+        intervalType = _intervalTypes[r.byte()]
+        upcomingDurations.append(
+            {"intervalType": intervalType, "seconds": r.number(0.0)}
+        )
+
+    streaks: list[list[SavedInterval]] = []
+    for _ in range(r.varint()):
+        streak: list[SavedInterval] = []
+        for _ in range(r.varint()):
+            packed = r.byte()
+            intervalType = _intervalTypes[packed & 3]
+            if intervalType == "Pomodoro":
+                intentionID = intentions[r.varint()]["id"]
+                startTime = r.time()
+                endTime = r.time()
+                indexInStreak = r.varint()
+                evaluation: SavedEvaluation | None = None
+                if packed & _evaluated:
+                    evaluation = {
+                        "result": _results[packed >> _resultShift],
+                        "timestamp": r.time(),
+                    }
+                streak.append(
+                    {
+                        "startTime": startTime,
+                        "intentionID": intentionID,
+                        "endTime": endTime,
+                        "evaluation": evaluation,
+                        "indexInStreak": indexInStreak,
+                        "intervalType": "Pomodoro",
+                    }
+                )
+            elif intervalType == "Break":
+                startTime = r.time()
+                streak.append(
+                    {
+                        "startTime": startTime,
+                        "endTime": r.time(),
+                        "intervalType": "Break",
+                    }
+                )
+            elif intervalType == "GracePeriod":
+                startTime = r.time()
+                streak.append(
+                    {
+                        "startTime": startTime,
+                        "originalPomEnd": r.time(),
+                        "intervalType": "GracePeriod",
+                    }
+                )
+            else:
+                startTime = r.time()
+                endTime = r.time()
+                pointsBeforeLoss = r.number(0.0)
+                streak.append(
+                    {
+                        "startTime": startTime,
+                        "endTime": endTime,
+                        "pointsBeforeLoss": pointsBeforeLoss,
+                        "pointsAfterLoss": r.number(0.0),
+                        "intervalType": "StartPrompt",
+                    }
+                )
+        streaks.append(streak)
+
+    sessions: list[SavedSession] = []
+    for _ in range(r.varint()):
+        automatic = bool(r.byte())
+        start = r.time()
+        sessions.append(
+            {"start": start, "end": r.time(), "automatic": automatic}
+        )
+
+    saved: SavedNexus = {
+        "initialTime": initialTime,
+        "lastIntentionID": lastIntentionID,
+        "intentions": intentions,
+        "lastUpdateTime": lastUpdateTime,
+        "upcomingDurations": upcomingDurations,
+        "streaks": streaks,
+        "sessions": sessions,
+    }
+    return saved
+
+
+def saveBinaryToFile(filename: str, saved: SavedNexus) -> None:
+    """
+    Save the given nexus to a file in the binary format.
+    """
+    with replacingFile(filename, "wb") as new:
+        new.write(packNexus(saved))
+
+
+def loadBinaryFromFile(filename: str) -> SavedNexus:
+    """
+    Load a nexus from a file in the binary format.
+    """
+    with open(filename, "rb") as f:
+        return unpackNexus(f.read())
+
+
+def jsonToBinary(jsonFile: str, binaryFile: str) -> None:
+    """
+    Convert a nexus saved as JSON to the binary format.
+    """
+    saveBinaryToFile(binaryFile, cast(SavedNexus, loadFromFile(jsonFile)))
+
+
+def binaryToJSON(binaryFile: str, jsonFile: str) -> None:
+    """
+    Convert a nexus saved in the binary format to JSON.
+    """
+    saveToFile(jsonFile, loadBinaryFromFile(binaryFile))
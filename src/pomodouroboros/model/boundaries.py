@@ -102,6 +102,25 @@ class UIEventListener(Protocol):
         """
 
 
+class ActionListener(Protocol):
+    """
+    Something that needs to know when the user acts on a L{Nexus}, such as the
+    driver that advances it through time.
+    """
+
+    def beforeAction(self) -> None:
+        """
+        The user is about to change the L{Nexus}; bring it up to date with the
+        current time first.
+        """
+
+    def afterAction(self) -> None:
+        """
+        The user has changed the L{Nexus}, possibly changing its
+        L{Nexus.nextEventTime}.
+        """
+
+
 @dataclass
 class NoUserInterface(UIEventListener):
     """
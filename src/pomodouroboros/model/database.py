@@ -0,0 +1,520 @@
+# -*- test-case-name: pomodouroboros.model.test.test_database -*-
+"""
+Storage for a L{Nexus} in a local SQLite database, as an alternative to the
+JSON files of L{pomodouroboros.model.storage}.
+
+Intentions, their estimates, intervals, their evaluations and sessions each
+have a table of their own, as do the score events they produce.  Saving only
+writes the rows that changed, and questions about the history, like how many
+points were scored on each day, are answered with indexed queries, rather
+than by loading all of it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from json import dumps, loads
+from sqlite3 import Connection, connect
+from typing import Any, Iterable, cast
+
+from .boundaries import NoUserInterface, ScoreEvent, UserInterfaceFactory
+from .debugger import debug
+from .intention import Intention
+from .intervals import AnyInterval, Pomodoro
+from .nexus import Nexus
+from .schema import (
+    SavedEstimate,
+    SavedEvaluation,
+    SavedIntention,
+    SavedInterval,
+    SavedNexus,
+    SavedPomodoro,
+    SavedSession,
+    SavedStreak,
+)
+from .sessions import Session
+from .snapshots import loadChecksummed
+from .storage import (
+    ChangeTracker,
+    nexusFromJSON,
+    saveDurations,
+    saveInterval,
+    saveToFile,
+)
+
+# Timestamps and durations are left without a declared type, so that SQLite
+# gives them back exactly as they were saved, whether integer or float.
+_schema = """
+create table if not exists nexus (
+    key text primary key,
+    value text not null
+);
+create table if not exists intentions (
+    position integer primary key,
+    id text not null unique,
+    created,
+    modified,
+    title text not null,
+    description text not null,
+    abandoned integer not null
+);
+create index if not exists intentionsByCreated on intentions (created);
+create table if not exists estimates (
+    intentionID text not null,
+    position integer not null,
+    duration,
+    madeAt,
+    primary key (intentionID, position)
+);
+create table if not exists intervals (
+    streak integer not null,
+    position integer not null,
+    intervalType text not null,
+    startTime,
+    endTime,
+    intentionID text,
+    indexInStreak integer,
+    originalPomEnd,
+    pointsBeforeLoss,
+    pointsAfterLoss,
+    primary key (streak, position)
+);
+create index if not exists intervalsByStart on intervals (startTime);
+create index if not exists intervalsByIntention
+    on intervals (intentionID, startTime);
+create table if not exists evaluations (
+    streak integer not null,
+    position integer not null,
+    result text not null,
+    timestamp,
+    primary key (streak, position)
+);
+create index if not exists evaluationsByTime on evaluations (timestamp);
+create table if not exists sessions (
+    position integer primary key,
+    start,
+    "end",
+    automatic integer not null
+);
+create index if not exists sessionsByStart on sessions (start);
+create table if not exists scoreEvents (
+    source text not null,
+    time,
+    points
+);
+create index if not exists scoreEventsByTime on scoreEvents (time, points);
+create index if not exists scoreEventsBySource on scoreEvents (source);
+"""
+
+_tables = [
+    "nexus",
+    "intentions",
+    "estimates",
+    "intervals",
+    "evaluations",
+    "sessions",
+    "scoreEvents",
+]
+
+_intervalColumns = """
+    streak, position, intervalType, startTime, endTime, intentionID,
+    indexInStreak, originalPomEnd, pointsBeforeLoss, pointsAfterLoss
+"""
+
+
+def _savedInterval(
+    row: tuple[Any, ...], evaluation: SavedEvaluation | None
+) -> SavedInterval:
+    """
+    Convert a row of the C{intervals} table back to the interval's paired
+    JSON data structure, as L{saveInterval} would have saved it.
+    """
+    (
+        streak,
+        position,
+        intervalType,
+        startTime,
+        endTime,
+        intentionID,
+        indexInStreak,
+        originalPomEnd,
+        pointsBeforeLoss,
+        pointsAfterLoss,
+    ) = row
+    if intervalType == "Pomodoro":
+        return {
+            "startTime": startTime,
+            "intentionID": intentionID,
+            "endTime": endTime,
+            "evaluation": evaluation,
+            "indexInStreak": indexInStreak,
+            "intervalType": "Pomodoro",
+        }
+    elif intervalType == "Break":
+        return {
+            "startTime": startTime,
+            "endTime": endTime,
+            "intervalType": "Break",
+        }
+    elif intervalType == "GracePeriod":
+        return {
+            "startTime": startTime,
+            "originalPomEnd": originalPomEnd,
+            "intervalType": "GracePeriod",
+        }
+    elif intervalType == "StartPrompt":
+        return {
+            "startTime": startTime,
+            "endTime": endTime,
+            "pointsBeforeLoss": pointsBeforeLoss,
+            "pointsAfterLoss": pointsAfterLoss,
+            "intervalType": "StartPrompt",
+        }
+    raise ValueError(f"unknown interval type {intervalType}")
+
+
+@dataclass
+class NexusDatabase(ChangeTracker):
+    """
+    Storage for a L{Nexus} in the SQLite database at C{filename}.
+
+    Once attached to a L{Nexus}, the database observes the changes to its
+    history, like any L{ChangeTracker}, so that each L{NexusDatabase.save}
+    only writes the rows for the intentions, intervals and sessions which
+    changed since the previous one, in a single transaction.  After a change
+    to the history that can't be described that way, the next save rewrites
+    all of them.
+    """
+
+    filename: str
+    _connection: Connection = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._connection = connect(self.filename)
+        self._connection.executescript(_schema)
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        self._connection.close()
+
+    def load(self, userInterfaceFactory: UserInterfaceFactory) -> Nexus | None:
+        """
+        Load a L{Nexus} from the database.
+
+        @return: the loaded L{Nexus}, or C{None} if nothing has been saved
+            yet.
+        """
+        saved = self.savedNexus()
+        if saved is None:
+            return None
+        self._mustCompact = False
+        return nexusFromJSON(saved, userInterfaceFactory)
+
+    def savedNexus(self) -> SavedNexus | None:
+        """
+        Read the whole of the saved L{Nexus}, exactly as L{nexusToJSON} would
+        have saved it.
+
+        @return: the L{SavedNexus}, or C{None} if nothing has been saved yet.
+        """
+        db = self._connection
+        header = {
+            key: loads(value)
+            for key, value in db.execute("select key, value from nexus")
+        }
+        if not header:
+            return None
+        estimates: dict[str, list[SavedEstimate]] = {}
+        for intentionID, duration, madeAt in db.execute(
+            "select intentionID, duration, madeAt from estimates"
+            " order by intentionID, position"
+        ):
+            estimates.setdefault(intentionID, []).append(
+                {"duration": duration, "madeAt": madeAt}
+            )
+        intentions: list[SavedIntention] = [
+            {
+                "created": created,
+                "modified": modified,
+                "title": title,
+                "description": description,
+                "estimates": estimates.get(intentionID, []),
+                "abandoned": bool(abandoned),
+                "id": intentionID,
+            }
+            for (
+                intentionID,
+                created,
+                modified,
+                title,
+                description,
+                abandoned,
+            ) in db.execute(
+                "select id, created, modified, title, description, abandoned"
+                " from intentions order by position"
+            )
+        ]
+        evaluations: dict[tuple[int, int], SavedEvaluation] = {
+            (streak, position): {"result": result, "timestamp": timestamp}
+            for streak, position, result, timestamp in db.execute(
+                "select streak, position, result, timestamp from evaluations"
+            )
+        }
+        streaks: list[SavedStreak] = [
+            [] for each in range(header["streakCount"])
+        ]
+        for row in db.execute(
+            f"select {_intervalColumns} from intervals"
+            " order by streak, position"
+        ):
+            streaks[row[0]].append(
+                _savedInterval(row, evaluations.get((row[0], row[1])))
+            )
+        sessions: list[SavedSession] = [
+            {"start": start, "end": end, "automatic": bool(automatic)}
+            for start, end, automatic in db.execute(
+                'select start, "end", automatic from sessions'
+                " order by position"
+            )
+        ]
+        return {
+            "initialTime": header["initialTime"],
+            "lastIntentionID": header["lastIntentionID"],
+            "intentions": intentions,
+            "lastUpdateTime": header["lastUpdateTime"],
+            "upcomingDurations": header["upcomingDurations"],
+            "streaks": streaks,
+            "sessions": sessions,
+        }
+
+    def save(self) -> None:
+        """
+        Save the changes made to our L{Nexus} since the last save, in a single
+        transaction.
+        """
+        nexus = self.nexus
+        assert nexus is not None, "database must be attached to save"
+        with self._connection as db:
+            if self._mustCompact:
+                self._writeAll(db, nexus)
+            else:
+                self._writeChanges(db, nexus)
+            db.executemany(
+                "insert or replace into nexus (key, value) values (?, ?)",
+                [
+                    (key, dumps(value))
+                    for key, value in {
+                        "initialTime": nexus._initialTime,
+                        "lastIntentionID": str(nexus._lastIntentionID),
+                        "lastUpdateTime": nexus._lastUpdateTime,
+                        "upcomingDurations": saveDurations(
+                            nexus._upcomingDurations.remaining
+                        ),
+                        "streakCount": len(nexus._streaks),
+                    }.items()
+                ],
+            )
+        self._clearChanges()
+        self._mustCompact = False
+
+    def _writeAll(self, db: Connection, nexus: Nexus) -> None:
+        debug("rewriting all of the database", self.filename)
+        for table in _tables:
+            db.execute(f"delete from {table}")
+        for position, intention in enumerate(nexus._intentions):
+            self._writeIntention(db, position, intention)
+        for streakIndex, streak in enumerate(nexus._streaks):
+            for index, interval in enumerate(streak):
+                self._writeInterval(db, streakIndex, index, interval)
+        self._writeSessions(db, nexus._sessions)
+
+    def _writeChanges(self, db: Connection, nexus: Nexus) -> None:
+        changed = dict(self._intentions)
+        for streakIndex, index, interval in self._changedIntervals(nexus):
+            self._writeInterval(db, streakIndex, index, interval)
+            if isinstance(interval, Pomodoro):
+                # The score for its intention depends on its pomodoros.
+                changed[id(interval.intention)] = interval.intention
+        for intention in changed.values():
+            row = db.execute(
+                "select position from intentions where id = ?",
+                (str(intention.id),),
+            ).fetchone()
+            if row is None:
+                # New intentions are only ever appended.
+                row = db.execute("select count(*) from intentions").fetchone()
+            self._writeIntention(db, row[0], intention)
+        if self._sessionsChanged:
+            self._writeSessions(db, nexus._sessions)
+
+    def _writeIntention(
+        self, db: Connection, position: int, intention: Intention
+    ) -> None:
+        intentionID = str(intention.id)
+        db.execute(
+            "insert or replace into intentions"
+            " (position, id, created, modified, title, description, abandoned)"
+            " values (?, ?, ?, ?, ?, ?, ?)",
+            (
+                position,
+                intentionID,
+                intention.created,
+                intention.modified,
+                intention.title,
+                intention.description,
+                intention.abandoned,
+            ),
+        )
+        db.execute(
+            "delete from estimates where intentionID = ?", (intentionID,)
+        )
+        db.executemany(
+            "insert into estimates (intentionID, position, duration, madeAt)"
+            " values (?, ?, ?, ?)",
+            [
+                (intentionID, index, estimate.duration, estimate.madeAt)
+                for index, estimate in enumerate(intention.estimates)
+            ],
+        )
+        self._writeScoreEvents(
+            db,
+            f"intention {intentionID}",
+            intention.intentionScoreEvents(position),
+        )
+
+    def _writeInterval(
+        self, db: Connection, streak: int, position: int, interval: AnyInterval
+    ) -> None:
+        saved = cast(dict[str, Any], saveInterval(interval))
+        db.execute(
+            f"insert or replace into intervals ({_intervalColumns})"
+            " values (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                streak,
+                position,
+                saved["intervalType"],
+                saved["startTime"],
+                saved.get("endTime"),
+                saved.get("intentionID"),
+                saved.get("indexInStreak"),
+                saved.get("originalPomEnd"),
+                saved.get("pointsBeforeLoss"),
+                saved.get("pointsAfterLoss"),
+            ),
+        )
+        db.execute(
+            "delete from evaluations where streak = ? and position = ?",
+            (streak, position),
+        )
+        if (evaluation := saved.get("evaluation")) is not None:
+            db.execute(
+                "insert into evaluations (streak, position, result, timestamp)"
+                " values (?, ?, ?, ?)",
+                (
+                    streak,
+                    position,
+                    evaluation["result"],
+                    evaluation["timestamp"],
+                ),
+            )
+        self._writeScoreEvents(
+            db, f"interval {streak} {position}", interval.scoreEvents()
+        )
+
+    @staticmethod
+    def _writeScoreEvents(
+        db: Connection, source: str, events: Iterable[ScoreEvent]
+    ) -> None:
+        db.execute("delete from scoreEvents where source = ?", (source,))
+        db.executemany(
+            "insert into scoreEvents (source, time, points) values (?, ?, ?)",
+            [(source, event.time, event.points) for event in events],
+        )
+
+    @staticmethod
+    def _writeSessions(db: Connection, sessions: Iterable[Session]) -> None:
+        db.execute("delete from sessions")
+        db.executemany(
+            'insert into sessions (position, start, "end", automatic)'
+            " values (?, ?, ?, ?)",
+            [
+                (position, session.start, session.end, session.automatic)
+                for position, session in enumerate(sessions)
+            ],
+        )
+
+    def dailyScores(
+        self, startTime: float, endTime: float
+    ) -> list[tuple[str, float]]:
+        """
+        The points scored on each day between the given times, inclusive.
+
+        @return: each day, as an ISO 8601 date in local time, and the points
+            scored on it, in order.
+        """
+        return self._connection.execute(
+            "select date(time, 'unixepoch', 'localtime') as day, sum(points)"
+            " from scoreEvents where time between ? and ?"
+            " group by day order by day",
+            (startTime, endTime),
+        ).fetchall()
+
+    def intentionPomodoros(
+        self, intentionID: int, startTime: float, endTime: float
+    ) -> list[SavedPomodoro]:
+        """
+        The pomodoros for the intention with the given ID which were started
+        between the given times, inclusive, in order.
+        """
+        return [
+            cast(
+                SavedPomodoro,
+                _savedInterval(
+                    row[:-2],
+                    None
+                    if row[-2] is None
+                    else {"result": row[-2], "timestamp": row[-1]},
+                ),
+            )
+            for row in self._connection.execute(
+                f"select {_intervalColumns}, result, timestamp from intervals"
+                " left join evaluations using (streak, position)"
+                " where intentionID = ? and startTime between ? and ?"
+                " order by startTime",
+                (str(intentionID), startTime, endTime),
+            )
+        ]
+
+
+def jsonToDatabase(jsonFile: str, databaseFile: str) -> None:
+    """
+    Migrate a L{Nexus} saved as JSON into a database, replacing anything
+    already saved there.
+    """
+    database = NexusDatabase(databaseFile)
+    try:
+        database.attach(
+            nexusFromJSON(
+                cast(SavedNexus, loadChecksummed(jsonFile)),
+                lambda nexus: NoUserInterface(),
+            )
+        )
+        database.save()
+    finally:
+        database.close()
+
+
+def databaseToJSON(databaseFile: str, jsonFile: str) -> None:
+    """
+    Migrate a L{Nexus} saved in a database back to JSON.
+    """
+    database = NexusDatabase(databaseFile)
+    try:
+        saved = database.savedNexus()
+    finally:
+        database.close()
+    if saved is None:
+        raise ValueError(f"nothing has been saved in {databaseFile}")
+    saveToFile(jsonFile, saved)
@@ -1,17 +1,37 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from bisect import bisect_right
+from dataclasses import dataclass, field
 from itertools import count
-from typing import TYPE_CHECKING, Sequence
+from math import inf
+from typing import TYPE_CHECKING, Callable, Sequence
 
-from .boundaries import EvaluationResult, PomStartResult, ScoreEvent
+from .boundaries import (
+    EvaluationResult,
+    IntervalType,
+    PomStartResult,
+    ScoreEvent,
+)
 from .debugger import debug
+from .scoring import (
+    BreakCompleted,
+    intentionCompletedPoints,
+    intentionCreatedPoints,
+    intentionSetPoints,
+)
 
 if TYPE_CHECKING:
     from .nexus import Nexus
     from .intention import Intention
 
-from .intervals import AnyInterval, Break, GracePeriod, Pomodoro
+from .intervals import (
+    AnyInterval,
+    Break,
+    Duration,
+    GracePeriod,
+    Pomodoro,
+    StartPrompt,
+)
 
 
 @dataclass
@@ -121,23 +141,305 @@ def idealFuture(
     return hypothetical
 
 
-def idealScore(
-    nexus: Nexus, workPeriodBegin: float, workPeriodEnd: float
+@dataclass(frozen=True)
+class IdealEvent:
+    """
+    A score event that would occur in an ideal future, but has not actually
+    happened.
+    """
+
+    time: float
+    points: float
+
+
+@dataclass
+class _Projection:
+    """
+    The state of an ideal future, being projected forward arithmetically from
+    the durations in a L{Nexus}'s rules and the scoring rules.
+
+    The interval we are in is described by its type (C{None} when idle), its
+    start and end, and (for grace periods) the end of the pomodoro it would
+    begin.
+    """
+
+    durations: list[Duration]
+    upcoming: list[Duration]
+    initialTime: float
+    workPeriodEnd: float
+    streakPomodoros: int
+    kind: IntervalType | None = None
+    start: float = 0.0
+    end: float = 0.0
+    originalEnd: float = 0.0
+    hypothetical: bool = False
+    events: list[ScoreEvent] = field(default_factory=list)
+
+    def intentionEvent(self, time: float, points: float) -> None:
+        if self.initialTime <= time <= self.workPeriodEnd:
+            self.events.append(IdealEvent(time, points))
+
+    def intervalEvent(self, intervalStart: float, event: ScoreEvent) -> None:
+        if (
+            intervalStart > self.initialTime
+            and event.time <= self.workPeriodEnd
+        ):
+            self.events.append(event)
+
+    def transition(self, at: float) -> None:
+        """
+        The current interval is over; the next duration determines what comes
+        after it.
+        """
+        self.hypothetical = True
+        if self.kind == IntervalType.GracePeriod:
+            # New streaks begin when grace periods expire.
+            self.upcoming[:] = []
+        nextDuration = self.upcoming.pop(0) if self.upcoming else None
+        if nextDuration is None:
+            self.kind = None
+            self.streakPomodoros = 0
+        elif nextDuration.intervalType == IntervalType.Pomodoro:
+            self.kind = IntervalType.GracePeriod
+            self.start, self.originalEnd = at, at + nextDuration.seconds
+            self.end = self.start + ((self.originalEnd - self.start) / 3)
+        else:
+            self.kind = IntervalType.Break
+            self.start, self.end = at, at + nextDuration.seconds
+            self.intervalEvent(
+                self.start, BreakCompleted(Break(self.start, self.end))
+            )
+
+    def run(
+        self, now: float, activityStart: float, intentionCount: int
+    ) -> list[ScoreEvent] | None:
+        """
+        Let time pass with no action from C{now} until C{activityStart}, then
+        execute perfectly until C{workPeriodEnd}.
+
+        @return: the resulting events, or C{None} if the activity would begin
+            with the evaluation of a pomodoro which was not projected.
+        """
+        while self.kind is not None and activityStart >= self.end:
+            self.transition(self.end)
+
+        now = max(now, activityStart)
+        nextIntentionIndex = intentionCount
+        fillers = max(0, 9 - nextIntentionIndex)
+        for _ in range(fillers):
+            self.intentionEvent(
+                now, intentionCreatedPoints(nextIntentionIndex)
+            )
+            nextIntentionIndex += 1
+
+        while now <= self.workPeriodEnd:
+            if self.kind is None or self.kind == IntervalType.GracePeriod:
+                # Start a pomodoro on a placeholder intention right away.
+                if fillers:
+                    fillers -= 1
+                else:
+                    self.intentionEvent(
+                        now, intentionCreatedPoints(nextIntentionIndex)
+                    )
+                    nextIntentionIndex += 1
+                if self.kind is None:
+                    first, *self.upcoming = self.durations
+                    assert (
+                        first.intervalType == IntervalType.Pomodoro
+                    ), "streak must begin with a pomodoro"
+                    self.start, self.end = now, now + first.seconds
+                else:
+                    self.end = self.originalEnd
+                self.kind = IntervalType.Pomodoro
+                self.hypothetical = True
+                self.intervalEvent(
+                    self.start,
+                    IdealEvent(
+                        self.start, intentionSetPoints(self.streakPomodoros)
+                    ),
+                )
+                self.streakPomodoros += 1
+            elif self.kind == IntervalType.Pomodoro:
+                if not self.hypothetical:
+                    return None
+                pomodoroStart, now = self.start, self.end
+                self.transition(now)
+                # Achieve the pomodoro's intention right as it ends.
+                self.intervalEvent(
+                    pomodoroStart,
+                    IdealEvent(now, EvaluationResult.achieved.points),
+                )
+                self.intentionEvent(now, intentionCompletedPoints(1))
+            else:
+                now = self.end
+                self.transition(now)
+        return self.events
+
+
+def projectedEvents(
+    nexus: Nexus, activityStart: float, workPeriodEnd: float
+) -> list[ScoreEvent] | None:
+    """
+    Compute the score events that L{idealFuture} would add to C{nexus}'s own
+    score events before C{workPeriodEnd}, arithmetically, from the durations in
+    the nexus's rules and the scoring rules, without constructing a
+    hypothetical L{Nexus}.
+
+    @return: the events, or C{None} if the ideal future would begin with the
+        evaluation of a pomodoro that is already running, which depends on
+        the details of its intention; in that case, use L{idealFuture}.
+    """
+    projection = _Projection(
+        durations=list(nexus._rules.streakIntervalDurations),
+        upcoming=nexus._peekUpcomingDurations(),
+        initialTime=nexus._initialTime,
+        workPeriodEnd=workPeriodEnd,
+        streakPomodoros=nexus._pomodorosInStreak(),
+    )
+    current = nexus._activeInterval
+    if isinstance(current, (Break, Pomodoro, GracePeriod)):
+        projection.kind = current.intervalType
+        projection.start, projection.end = current.startTime, current.endTime
+        if isinstance(current, GracePeriod):
+            projection.originalEnd = current.originalPomEnd
+    else:
+        # Idle, or being prompted to start, which is the same as idle as far
+        # as starting a pomodoro goes.
+        assert current is None or isinstance(current, StartPrompt)
+    return projection.run(
+        nexus._lastUpdateTime, activityStart, len(nexus._intentions)
+    )
+
+
+@dataclass(frozen=True)
+class PointLoss:
+    """
+    The next time that the user's ideal score will drop if they remain idle,
+    and their ideal score before and after that drop.
+    """
+
+    time: float
+    scoreBefore: float
+    scoreAfter: float
+
+
+@dataclass
+class PointLossSchedule:
+    """
+    Every future drop in the ideal score of an idle user, until the end of a
+    work period.
+
+    While the user remains idle, the ideal future is always the same pattern
+    of events, starting at the current time; each time the last of those
+    events would fall after the end of the work period, the ideal score drops.
+    So a schedule is computed once for a given state of the L{Nexus}, and
+    answers L{PointLossSchedule.pointLoss} for any later time in that state
+    with a binary search.
+    """
+
+    workPeriodEnd: float
+    streakPomodoros: int
+    recordedScore: float
+    recordedLatest: float | None
+    offsets: list[float]
+    """
+    The distinct times of the ideal events, relative to the moment the user
+    begins executing, in ascending order.
+    """
+    cumulativePoints: list[float]
+    """
+    For each offset, the total points for ideal events at or before it.
+    """
+
+    @classmethod
+    def build(
+        cls, nexus: Nexus, workPeriodEnd: float
+    ) -> PointLossSchedule | None:
+        """
+        Build a schedule for the current state of C{nexus}.
+
+        @return: the schedule, or C{None} if the nexus is not idle, or if it
+            is at its initial time (when the first ideal pomodoro would not
+            count).
+        """
+        now = nexus._lastUpdateTime
+        current = nexus._activeInterval
+        if now <= nexus._initialTime or not (
+            current is None or isinstance(current, StartPrompt)
+        ):
+            return None
+        streakPomodoros = nexus._pomodorosInStreak()
+        projected = _Projection(
+            durations=list(nexus._rules.streakIntervalDurations),
+            upcoming=[],
+            initialTime=-inf,
+            workPeriodEnd=workPeriodEnd - now,
+            streakPomodoros=streakPomodoros,
+        ).run(0.0, 0.0, len(nexus._intentions))
+        assert projected is not None, "idle projections never fall back"
+        offsets: list[float] = []
+        cumulativePoints: list[float] = []
+        total = 0.0
+        for event in sorted(projected, key=lambda it: it.time):
+            total += event.points
+            if offsets and offsets[-1] == event.time:
+                cumulativePoints[-1] = total
+            else:
+                offsets.append(event.time)
+                cumulativePoints.append(total)
+        recorded = list(nexus.scoreEvents(endTime=workPeriodEnd))
+        return cls(
+            workPeriodEnd=workPeriodEnd,
+            streakPomodoros=streakPomodoros,
+            recordedScore=sum(each.points for each in recorded),
+            recordedLatest=max((each.time for each in recorded), default=None),
+            offsets=offsets,
+            cumulativePoints=cumulativePoints,
+        )
+
+    def _idealScore(self, activityStart: float) -> tuple[float, float | None]:
+        """
+        Compute the ideal score, and the time of the latest ideal event, if
+        the user begins executing at C{activityStart}.
+        """
+        last = bisect_right(self.offsets, self.workPeriodEnd - activityStart)
+        if not last:
+            return self.recordedScore, self.recordedLatest
+        latest = activityStart + self.offsets[last - 1]
+        return (
+            self.recordedScore + self.cumulativePoints[last - 1],
+            latest
+            if self.recordedLatest is None
+            else max(latest, self.recordedLatest),
+        )
+
+    def pointLoss(self, now: float) -> PointLoss | None:
+        """
+        When will the ideal score next drop, if the user is idle at C{now}?
+        This agrees with L{idealScore} for any time in the state that the
+        schedule was built for.
+        """
+        scoreBefore, latestScoreTime = self._idealScore(now)
+        if latestScoreTime is None:
+            return None
+        lossTime = now + (self.workPeriodEnd - latestScoreTime)
+        scoreAfter, _ = self._idealScore(lossTime + 1.0)
+        return PointLoss(lossTime, scoreBefore, scoreAfter)
+
+
+def _scoreInfo(
+    nexus: Nexus,
+    workPeriodEnd: float,
+    futureEvents: Callable[[float], list[ScoreEvent]],
 ) -> IdealScoreInfo:
     """
-    Compute the inflection point for the ideal score the user might achieve.
-    We present two hypothetical futures: one where the user executes perfectly
-    from C{workPeriodBegin} to C{workPeriodEnd}, and the other where they wait
-    exactly long enough to lose I{one} element of that perfect score, and then
-    begin executing perfectly.
+    Compute an L{IdealScoreInfo} from a function that computes all the score
+    events up to C{workPeriodEnd} in the ideal future beginning at a given
+    time.
     """
-    debug("ideal future 1")
     workPeriodBegin = nexus._lastUpdateTime
-    currentIdeal = idealFuture(nexus, workPeriodBegin, workPeriodEnd)
     idealScoreNow = sorted(
-        # TODO: we're scoring all events from all time here
-        currentIdeal.scoreEvents(endTime=workPeriodEnd),
-        key=lambda it: it.time,
+        futureEvents(workPeriodBegin), key=lambda it: it.time
     )
     if not idealScoreNow:
         return IdealScoreInfo(
@@ -154,13 +456,49 @@ def idealScore(
         idealScoreNow=ScoreSummary(idealScoreNow),
         workPeriodEnd=workPeriodEnd,
         nextPointLoss=pointLossTime,
-        idealScoreNext=ScoreSummary(
-            list(
-                (
-                    idealFuture(nexus, pointLossTime + 1.0, workPeriodEnd)
-                    if idealScoreNow
-                    else currentIdeal
-                ).scoreEvents(endTime=workPeriodEnd)
+        idealScoreNext=ScoreSummary(futureEvents(pointLossTime + 1.0)),
+    )
+
+
+def idealScore(
+    nexus: Nexus, workPeriodBegin: float, workPeriodEnd: float
+) -> IdealScoreInfo:
+    """
+    Compute the inflection point for the ideal score the user might achieve.
+    We present two hypothetical futures: one where the user executes perfectly
+    from C{workPeriodBegin} to C{workPeriodEnd}, and the other where they wait
+    exactly long enough to lose I{one} element of that perfect score, and then
+    begin executing perfectly.
+    """
+    # TODO: we're scoring all events from all time here
+    recorded = list(nexus.scoreEvents(endTime=workPeriodEnd))
+
+    def futureEvents(activityStart: float) -> list[ScoreEvent]:
+        projected = projectedEvents(nexus, activityStart, workPeriodEnd)
+        if projected is None:
+            return list(
+                idealFuture(nexus, activityStart, workPeriodEnd).scoreEvents(
+                    endTime=workPeriodEnd
+                )
+            )
+        return recorded + projected
+
+    return _scoreInfo(nexus, workPeriodEnd, futureEvents)
+
+
+def simulatedIdealScore(
+    nexus: Nexus, workPeriodBegin: float, workPeriodEnd: float
+) -> IdealScoreInfo:
+    """
+    Compute the same result as L{idealScore}, by simulating both futures with
+    L{idealFuture}.  This is much slower, but is a useful reference.
+    """
+    return _scoreInfo(
+        nexus,
+        workPeriodEnd,
+        lambda activityStart: list(
+            idealFuture(nexus, activityStart, workPeriodEnd).scoreEvents(
+                endTime=workPeriodEnd
             )
         ),
     )
@@ -28,7 +28,7 @@ class Estimate:
     madeAt: float  # when was this estimate made?
 
 
-@observable()
+@observable(slots=True)
 class Intention:
     """
     An intention of something to do.
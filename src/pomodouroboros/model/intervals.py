@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Callable, ClassVar, Iterable
+from typing import TYPE_CHECKING, Callable, ClassVar, Iterable, Sequence
 
 from .boundaries import (
     EvaluationResult,
@@ -27,6 +27,37 @@ class Duration:
     seconds: float
 
 
+@dataclass
+class DurationCursor:
+    """
+    The durations remaining in the current streak, as a position in a table
+    of durations (usually L{GameRules.streakIntervalDurations}).
+
+    Iterating it consumes durations, as the streak progresses; unlike a plain
+    iterator, the remaining durations can also be read, and the cursor
+    copied, without consuming anything.
+    """
+
+    table: Sequence[Duration] = ()
+    position: int = 0
+
+    def __iter__(self) -> DurationCursor:
+        return self
+
+    def __next__(self) -> Duration:
+        if self.position >= len(self.table):
+            raise StopIteration
+        self.position += 1
+        return self.table[self.position - 1]
+
+    @property
+    def remaining(self) -> Sequence[Duration]:
+        """
+        The durations that have not been consumed yet.
+        """
+        return self.table[self.position :]
+
+
 @dataclass
 class Evaluation:
     """
@@ -171,10 +202,56 @@ pomodoro going back to their genesis.
 """
 
 
+@dataclass
+class StreakSummary:
+    """
+    Running totals describing the intervals in a streak.
+    """
+
+    pomodoroCount: int = 0
+    breakCount: int = 0
+    focusedSeconds: float = 0.0
+    """
+    The total scheduled length of the streak's pomodoros.
+    """
+    lastEvaluation: Evaluation | None = None
+    """
+    The most recent evaluation of any of the streak's pomodoros.
+    """
+
+    @classmethod
+    def build(cls, intervals: Iterable[AnyInterval]) -> StreakSummary:
+        """
+        Summarize the given intervals.
+        """
+        self = cls()
+        for interval in intervals:
+            self.add(interval)
+        return self
+
+    def add(self, interval: AnyInterval) -> None:
+        """
+        Include a new interval in this summary.
+        """
+        if isinstance(interval, Pomodoro):
+            self.pomodoroCount += 1
+            self.focusedSeconds += interval.endTime - interval.startTime
+            evaluation = interval.evaluation
+            if evaluation is not None and (
+                self.lastEvaluation is None
+                or evaluation.timestamp >= self.lastEvaluation.timestamp
+            ):
+                self.lastEvaluation = evaluation
+        elif isinstance(interval, Break):
+            self.breakCount += 1
+
+
 def handleIdleStartPom(
     nexus: Nexus, startPom: Callable[[float, float], None]
 ) -> PomStartResult:
-    nexus._upcomingDurations = iter(nexus._rules.streakIntervalDurations)
+    nexus._upcomingDurations = DurationCursor(
+        nexus._rules.streakIntervalDurations
+    )
     nextDuration = next(nexus._upcomingDurations, None)
     assert (
         nextDuration is not None
@@ -1,11 +1,29 @@
 # -*- test-case-name: pomodouroboros.model.test -*-
 from __future__ import annotations
 
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
 from copy import deepcopy
 from dataclasses import dataclass, field, replace
-from typing import Iterable, Iterator, MutableSequence, Sequence
+from functools import wraps
+from heapq import merge
+from math import inf
+from typing import (
+    Callable,
+    Concatenate,
+    Generic,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    ParamSpec,
+    Protocol,
+    Sequence,
+    TypeVar,
+    overload,
+)
 
 from .boundaries import (
+    ActionListener,
     EvaluationResult,
     IntervalType,
     NoUserInterface,
@@ -15,25 +33,37 @@ from .boundaries import (
     UserInterfaceFactory,
 )
 from .debugger import debug
-from .ideal import idealScore
+from .ideal import PointLoss, PointLossSchedule, idealScore
 from .intention import Estimate, Intention
 from .intervals import (
     AnyInterval,
     Break,
     Duration,
+    DurationCursor,
     Evaluation,
     GracePeriod,
     Pomodoro,
     StartPrompt,
+    StreakSummary,
     handleIdleStartPom,
 )
-from .observables import IgnoreChanges, ObservableList
-from .sessions import Session
+from .observables import (
+    Changes,
+    IgnoreChanges,
+    ObservableList,
+    SequenceObserver,
+)
+from .scoreindex import ScoreIndex
+from .sessions import Session, SessionIndex
+from .sharing import SharedPrefixList
+
+T = TypeVar("T")
+P = ParamSpec("P")
 
 
 @dataclass(frozen=True)
 class GameRules:
-    streakIntervalDurations: Iterable[Duration] = field(
+    streakIntervalDurations: Sequence[Duration] = field(
         default_factory=lambda: [
             each
             for pomMinutes, breakMinutes in [
@@ -57,6 +87,315 @@ def _noUIFactory(nexus: Nexus) -> UIEventListener:
     return _theNoUserInterface
 
 
+@dataclass
+class _HistoryHook(Generic[T]):
+    """
+    Observer for the lists that make up a L{Nexus}'s history, which passes
+    every notification along to the observer that was previously there, then
+    lets the L{Nexus} know about the change once it is complete, so that it
+    can keep its indexes and caches up to date, and tell its
+    L{HistoryObserver}s.
+    """
+
+    original: SequenceObserver[T]
+    observed: ObservableList[T]
+    appended: Callable[[int, T], None]
+    replaced: Callable[[], None]
+
+    @classmethod
+    def install(
+        cls,
+        observed: ObservableList[T],
+        appended: Callable[[int, T], None],
+        replaced: Callable[[], None],
+    ) -> None:
+        """
+        Hook the given list, replacing any L{_HistoryHook} already present.
+        """
+        original = observed.observer
+        if isinstance(original, _HistoryHook):
+            original = original.original
+        observed.observer = cls(original, observed, appended, replaced)
+
+    def __repr__(self) -> str:
+        return repr(self.original)
+
+    def __deepcopy__(self, memo: dict[int, object]) -> object:
+        # A copy of the list isn't part of our nexus.
+        return deepcopy(self.original, memo)
+
+    @contextmanager
+    def added(self, key: int | slice, new: T | Iterable[T]) -> Iterator[None]:
+        with self.original.added(key, new):
+            yield
+        length = len(self.observed)
+        if isinstance(key, int) and key == length - 1:
+            self.appended(key, new)  # type:ignore[arg-type]
+        elif isinstance(key, slice) and key.stop == length:
+            # extended
+            for position, each in enumerate(
+                new, key.start  # type:ignore[arg-type]
+            ):
+                self.appended(position, each)
+        else:
+            self.replaced()
+
+    @contextmanager
+    def removed(
+        self, key: int | slice, old: T | Iterable[T]
+    ) -> Iterator[None]:
+        with self.original.removed(key, old):
+            yield
+        self.replaced()
+
+    @contextmanager
+    def changed(
+        self, key: int | slice, old: T | Iterable[T], new: T | Iterable[T]
+    ) -> Iterator[None]:
+        with self.original.changed(key, old, new):
+            yield
+        self.replaced()
+
+
+class _IntentionHook:
+    """
+    Observer for an L{Intention} in a L{Nexus}, which passes every
+    notification along to the observer that was previously there, then lets
+    the L{Nexus} know which attribute changed.
+
+    It isn't a dataclass, so that L{dataclasses.asdict} copies it with
+    L{_IntentionHook.__deepcopy__} rather than following it to the L{Nexus}.
+    """
+
+    def __init__(
+        self,
+        original: Changes[str, object],
+        intention: Intention,
+        nexus: Nexus,
+    ) -> None:
+        self.original = original
+        self.intention = intention
+        self.nexus = nexus
+
+    @classmethod
+    def install(cls, intention: Intention, nexus: Nexus) -> None:
+        """
+        Hook the given intention for the given L{Nexus}, replacing any
+        L{_IntentionHook} for another L{Nexus}.
+        """
+        original = intention.observer
+        if isinstance(original, _IntentionHook):
+            if original.nexus is nexus:
+                return
+            original = original.original
+        intention.observer = cls(original, intention, nexus)
+
+    def __repr__(self) -> str:
+        return repr(self.original)
+
+    def __deepcopy__(self, memo: dict[int, object]) -> object:
+        # A copy of the intention isn't part of our nexus.
+        return deepcopy(self.original, memo)
+
+    @contextmanager
+    def added(self, key: str, new: object) -> Iterator[None]:
+        with self.original.added(key, new):
+            yield
+        self.nexus._intentionChanged(self.intention, key)
+
+    @contextmanager
+    def removed(self, key: str, old: object) -> Iterator[None]:
+        with self.original.removed(key, old):
+            yield
+        self.nexus._intentionChanged(self.intention, key)
+
+    @contextmanager
+    def changed(self, key: str, old: object, new: object) -> Iterator[None]:
+        with self.original.changed(key, old, new):
+            yield
+        self.nexus._intentionChanged(self.intention, key)
+
+
+class HistoryObserver(Protocol):
+    """
+    Something which follows the changes made to a L{Nexus}'s history, such as
+    storage that saves only what changed, once it is added with
+    L{Nexus.addHistoryObserver}.  Each method is called once the change it
+    describes is complete.
+    """
+
+    def intentionAppended(self, position: int, intention: Intention) -> None:
+        """
+        C{intention} was added to the end of the intentions, at C{position}.
+        """
+
+    def intentionChanged(self, intention: Intention, key: str) -> None:
+        """
+        The attribute C{key} of C{intention} was set or deleted; or, for
+        C{"pomodoros"}, one of its pomodoros was evaluated.
+        """
+
+    def streakAppended(
+        self, position: int, streak: Sequence[AnyInterval]
+    ) -> None:
+        """
+        C{streak} was added to the end of the streaks, at C{position}.  Any
+        intervals already in it are reported to L{intervalAppended}
+        afterwards.
+        """
+
+    def intervalAppended(self, interval: AnyInterval) -> None:
+        """
+        C{interval} was added to the end of the current streak.
+        """
+
+    def sessionsChanged(self) -> None:
+        """
+        A session was added, removed, or replaced.
+        """
+
+    def historyReplaced(self) -> None:
+        """
+        The intentions or streaks were changed other than by adding to the end
+        of them, possibly renumbering them.
+        """
+
+
+class PagedHistory(Protocol):
+    """
+    The closed part of a L{Nexus}'s history, which has been paged out to disk
+    (see L{pomodouroboros.model.paging}) so that it need not stay in memory.
+    The L{Nexus} can still get at any of it through its lists of intentions,
+    streaks and sessions, but walking those lists would page all of it back
+    in, so it walks only the parts which are still resident instead.
+    """
+
+    def residentIntentions(self, count: int) -> Iterable[int]:
+        """
+        The positions, among the first C{count} intentions, of those which
+        have not been paged out, in order.  Paged-out intentions are always
+        completed or abandoned.
+        """
+
+    def residentStreaks(self, count: int) -> Iterable[int]:
+        """
+        The positions, among the first C{count} streaks, of those which have
+        not been paged out, in order.
+        """
+
+    def residentSessions(self, count: int) -> Iterable[int]:
+        """
+        The positions, among the first C{count} sessions, of those which have
+        not been paged out, in order.  Paged-out sessions are always over.
+        """
+
+    def pagedScoreEvents(
+        self, startTime: float, endTime: float
+    ) -> Iterable[ScoreEvent]:
+        """
+        Score events for the paged-out intentions and streaks between the
+        given times, in time order.
+        """
+
+
+@dataclass(eq=False)
+class _AvailableIntentions(Sequence[Intention]):
+    """
+    Live view of the intentions in a L{Nexus} that are neither completed nor
+    abandoned, in order.  It stays current even when the L{Nexus}'s history
+    is replaced, by being rebuilt in place.
+    """
+
+    _intentions: Sequence[Intention]
+    _positionOf: dict[int, int] = field(default_factory=dict)
+    """
+    The position of each intention (by identity) in C{_intentions}.
+    """
+    _available: list[int] = field(default_factory=list)
+    """
+    The positions of the available intentions, in order.
+    """
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (list, _AvailableIntentions)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def __len__(self) -> int:
+        return len(self._available)
+
+    @overload
+    def __getitem__(self, index: int) -> Intention:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[Intention]:
+        ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> Intention | Sequence[Intention]:
+        if isinstance(index, slice):
+            return [self._intentions[each] for each in self._available[index]]
+        return self._intentions[self._available[index]]
+
+    def rebuild(self, intentions: Iterable[tuple[int, Intention]]) -> None:
+        """
+        Stop tracking everything, then start tracking the given intentions,
+        paired with their positions.
+        """
+        self._positionOf.clear()
+        self._available.clear()
+        for position, intention in intentions:
+            self.track(position)
+
+    def track(self, position: int) -> None:
+        """
+        Start tracking the intention at the given position.
+        """
+        self._positionOf[id(self._intentions[position])] = position
+        self.update(self._intentions[position])
+
+    def update(self, intention: Intention) -> None:
+        """
+        The given intention may have become available or unavailable.
+        """
+        position = self._positionOf.get(id(intention))
+        if position is None or self._intentions[position] is not intention:
+            return
+        at = bisect_left(self._available, position)
+        present = at < len(self._available) and self._available[at] == position
+        available = not intention.completed and not intention.abandoned
+        if present and not available:
+            del self._available[at]
+        elif available and not present:
+            self._available.insert(at, position)
+
+
+def _userAction(
+    method: Callable[Concatenate[Nexus, P], T]
+) -> Callable[Concatenate[Nexus, P], T]:
+    """
+    Decorator for L{Nexus} methods that the user calls to change it, which
+    notifies its L{ActionListener}s before and afterwards.
+    """
+
+    @wraps(method)
+    def notifying(self: Nexus, *args: P.args, **kwargs: P.kwargs) -> T:
+        listeners = self._actionListeners[:]
+        for listener in listeners:
+            listener.beforeAction()
+        result = method(self, *args, **kwargs)
+        for listener in listeners:
+            listener.afterAction()
+        return result
+
+    return notifying
+
+
 @dataclass
 class Nexus:
     """
@@ -73,7 +412,7 @@ class Nexus:
     )
 
     _userInterface: UIEventListener | None = None
-    _upcomingDurations: Iterator[Duration] = iter(())
+    _upcomingDurations: DurationCursor = field(default_factory=DurationCursor)
     _rules: GameRules = field(default_factory=GameRules)
 
     _streaks: ObservableList[ObservableList[AnyInterval]] = field(
@@ -91,17 +430,103 @@ class Nexus:
 
     _lastUpdateTime: float = field(default=0.0)
 
+    _pagedHistory: PagedHistory | None = field(
+        default=None, repr=False, compare=False
+    )
+    """
+    The part of our history which has been paged out to disk, if any.  A fork
+    shares it along with the rest of our history.
+    """
+
+    _scoreIndex: ScoreIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    Time-ordered index of all of our score events, built on demand by
+    L{Nexus.scoreEvents} and kept up to date by L{_HistoryHook}s on our history.
+    """
+
+    _pointLossSchedule: PointLossSchedule | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    The future drops in the ideal score while we are idle in the current
+    session, built on demand by L{Nexus._nextPointLoss} and discarded whenever
+    anything that contributes to the score changes.
+    """
+
+    _owned: set[int] | None = field(default=None, repr=False, compare=False)
+    """
+    For a L{Nexus} forked by L{Nexus.cloneWithoutUI}, the identities of the
+    intentions, intervals, and streaks that belong to it alone; the rest of
+    its history is shared with the L{Nexus} it was forked from.  C{None} if
+    this L{Nexus} was not forked, and so owns all of its history.
+    """
+
+    _currentInterval: tuple[AnyInterval | None] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    The last interval in our current streak (in a 1-tuple, so that C{None} can
+    mean it hasn't been looked up), which L{Nexus._activeInterval} checks
+    against our last update time; discarded whenever our streaks change.
+    """
+
+    _streakSummary: StreakSummary | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    Summary of our current streak, built on demand and kept up to date as
+    intervals are added to it.
+    """
+
+    _availableIntentions: _AvailableIntentions | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    Live view of our available intentions, built on demand by
+    L{Nexus.availableIntentions}, and kept up to date by the L{_IntentionHook}
+    on each intention.
+    """
+
+    _sessionIndex: SessionIndex | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    Index of our sessions, built on demand and discarded whenever they change.
+    """
+
+    _sessionSpan: tuple[Session | None, float, float] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    """
+    The last result of L{SessionIndex.sessionAt}: the active session, and the
+    span of time over which it remains active, so that it only needs to be
+    looked up again once our last update time leaves that span.
+    """
+
+    _actionListeners: list[ActionListener] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    """
+    The L{ActionListener}s to notify around each of the user's actions.
+    """
+
+    _historyObservers: list[HistoryObserver] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    """
+    The L{HistoryObserver}s to notify of each change to our history.
+    """
+
     @property
     def _activeInterval(self) -> AnyInterval | None:
         debug("determining active interval")
-        if not self._streaks:
-            debug("active interval: no streaks")
+        if (current := self._currentInterval) is None:
+            current = self._currentInterval = (self._findCurrentInterval(),)
+        (candidateInterval,) = current
+        if candidateInterval is None:
             return None
-        currentStreak = self._streaks[-1]
-        if not currentStreak:
-            debug("active interval: no current streak")
-            return None
-        candidateInterval = currentStreak[-1]
         now = self._lastUpdateTime
 
         if now < candidateInterval.startTime:
@@ -124,8 +549,19 @@ class Nexus:
         debug("active interval: yay:", candidateInterval)
         return candidateInterval
 
+    def _findCurrentInterval(self) -> AnyInterval | None:
+        if not self._streaks:
+            debug("active interval: no streaks")
+            return None
+        currentStreak = self._streaks[-1]
+        if not currentStreak:
+            debug("active interval: no current streak")
+            return None
+        return currentStreak[-1]
+
     def __post_init__(self) -> None:
         debug(f"post-init, IT={self._initialTime} LUT={self._lastUpdateTime}")
+        self._hookHistory()
         if self._initialTime > self._lastUpdateTime:
             debug("post-init advance")
             self.advanceToTime(self._initialTime)
@@ -134,61 +570,285 @@ class Nexus:
 
     def cloneWithoutUI(self) -> Nexus:
         """
-        Create a deep copy of this L{Nexus}, detached from any user interface,
-        to perform hypothetical model interactions.
-        """
-        previouslyUpcoming = list(self._upcomingDurations)
-
-        def split() -> Iterator[Duration]:
-            return iter(previouslyUpcoming)
-
-        self._upcomingDurations = split()
-        debug("constructing hypothetical")
-        hypothetical = deepcopy(
-            replace(
-                self,
-                _intentions=self._intentions[:],
-                _interfaceFactory=_noUIFactory,
-                _userInterface=_theNoUserInterface,
-                _upcomingDurations=split(),
-                _sessions=ObservableList(IgnoreChanges),
-                _streaks=ObservableList(
-                    IgnoreChanges,
-                    [
-                        ObservableList(IgnoreChanges, each[:])
-                        for each in self._streaks
-                    ],
-                ),
+        Fork this L{Nexus}, detached from any user interface, to perform
+        hypothetical model interactions.
+
+        Rather than copying our history, the fork shares it, so forking costs
+        the same no matter how long the history is.  The fork copies an
+        individual intention or interval only when it needs to change one that
+        it shares with us; so while the fork is in use, this L{Nexus}'s history
+        may be added to but its existing intentions and intervals must not be
+        changed.
+        """
+        debug("forking hypothetical")
+        streaks: ObservableList[ObservableList[AnyInterval]] = ObservableList(
+            IgnoreChanges,
+            SharedPrefixList(self._streaks, max(len(self._streaks) - 1, 0)),
+        )
+        owned: set[int] = set()
+        if self._streaks:
+            # The fork will be appending to its current streak, so that one
+            # needs to be its own.
+            currentStreak = ObservableList(
+                IgnoreChanges, SharedPrefixList.of(self._streaks[-1])
             )
+            owned.add(id(currentStreak))
+            streaks.append(currentStreak)
+        hypothetical = replace(
+            self,
+            _intentions=ObservableList(
+                IgnoreChanges, SharedPrefixList.of(self._intentions)
+            ),
+            _interfaceFactory=_noUIFactory,
+            _userInterface=_theNoUserInterface,
+            _upcomingDurations=replace(self._upcomingDurations),
+            _sessions=ObservableList(IgnoreChanges),
+            _streaks=streaks,
+            _owned=owned,
         )
-        debug("constructed")
-        # because it's init=False we have to copy it manually
-        hypothetical._lastUpdateTime = self._lastUpdateTime
+        debug("forked")
         return hypothetical
 
+    def _claim(self, new: T) -> T:
+        """
+        Record that a newly created intention, interval, or streak belongs to
+        this L{Nexus} alone, and return it.
+        """
+        if self._owned is not None:
+            self._owned.add(id(new))
+        return new
+
+    def _isShared(self, thing: object) -> bool:
+        """
+        Is the given part of our history shared with the L{Nexus} that we were
+        forked from?
+        """
+        return self._owned is not None and id(thing) not in self._owned
+
+    def _writableIntention(self, intention: Intention) -> Intention:
+        """
+        Get a version of the given intention that we may change, copying it
+        first if it is shared with the L{Nexus} that we were forked from.
+        """
+        if not self._isShared(intention):
+            return intention
+        debug("copying shared intention", intention.id)
+        copied = self._claim(
+            replace(  # type:ignore[misc]
+                intention,
+                estimates=intention.estimates[:],
+                pomodoros=intention.pomodoros[:],
+                observer=IgnoreChanges(),
+            )
+        )
+        _IntentionHook.install(copied, self)
+        for index in reversed(range(len(self._intentions))):
+            if self._intentions[index] is intention:
+                self._intentions[index] = copied
+                break
+        return copied
+
+    def _writablePomodoro(self, pomodoro: Pomodoro) -> Pomodoro:
+        """
+        Get a version of the given pomodoro that we may change, copying it (and
+        its intention) first if it is shared with the L{Nexus} that we were
+        forked from.
+        """
+        if not self._isShared(pomodoro):
+            return pomodoro
+        debug("copying shared pomodoro", pomodoro.startTime)
+        intention = self._writableIntention(pomodoro.intention)
+        copied = self._claim(replace(pomodoro, intention=intention))
+        intention.pomodoros[:] = [
+            copied if each is pomodoro else each
+            for each in intention.pomodoros
+        ]
+        # Pomodoros being changed are almost always in the current streak, so
+        # search backwards.
+        for streakIndex in reversed(range(len(self._streaks))):
+            streak = self._streaks[streakIndex]
+            for position in reversed(range(len(streak))):
+                if streak[position] is not pomodoro:
+                    continue
+                if self._isShared(streak):
+                    streak = self._claim(
+                        ObservableList(
+                            IgnoreChanges, SharedPrefixList.of(streak)
+                        )
+                    )
+                    self._streaks[streakIndex] = streak
+                streak[position] = copied
+                return copied
+        return copied
+
+    def _hookHistory(self) -> None:
+        """
+        Observe our intentions and streaks so that changes to them will be
+        reflected in our score index and caches, and passed along to our
+        L{HistoryObserver}s.
+
+        Only the current streak is ever added to, so earlier streaks are left
+        alone; this keeps hooking cheap, and means that a fork's hooks are
+        never installed on streaks that it shares with another L{Nexus}.  For
+        the same reason, a fork hooks only the intentions it adds or copies.
+        """
+        if not isinstance(self._intentions, ObservableList):
+            self._intentions = ObservableList(
+                IgnoreChanges, list(self._intentions)
+            )
+        _HistoryHook.install(
+            self._intentions, self._intentionAppended, self._historyChanged
+        )
+        _HistoryHook.install(
+            self._streaks, self._streakAppended, self._historyChanged
+        )
+        if self._streaks:
+            _HistoryHook.install(
+                self._streaks[-1],
+                self._intervalAppended,
+                self._historyChanged,
+            )
+        _HistoryHook.install(
+            self._sessions, self._sessionAppended, self._sessionsChanged
+        )
+        if self._owned is None:
+            for position, intention in self._residentIntentions():
+                _IntentionHook.install(intention, self)
+
+    def observeIntention(self, intention: Intention) -> None:
+        """
+        Start observing an intention which has been read back in to our
+        history since we began observing it, such as one that was paged back
+        in from disk, so that changes to it will be passed along to our
+        L{HistoryObserver}s.
+        """
+        _IntentionHook.install(intention, self)
+
+    def _historyReplaced(self) -> None:
+        """
+        Something other than an append happened to one of our history lists;
+        discard the score index, and make sure any new lists are hooked.
+        """
+        debug("history replaced, discarding score index")
+        self._currentInterval = None
+        self._streakSummary = None
+        self._scoreIndex = None
+        self._pointLossSchedule = None
+        self._hookHistory()
+        if (view := self._availableIntentions) is not None:
+            # Callers may be holding on to it, so it mustn't be replaced.
+            view.rebuild(self._residentIntentions())
+
+    def _historyChanged(self) -> None:
+        self._historyReplaced()
+        for observer in self._historyObservers[:]:
+            observer.historyReplaced()
+
+    def _intentionAppended(self, key: int, intention: Intention) -> None:
+        self._pointLossSchedule = None
+        if not self._isShared(intention):
+            _IntentionHook.install(intention, self)
+        if (view := self._availableIntentions) is not None:
+            view.track(key)
+        if (index := self._scoreIndex) is not None:
+            index.addIntention(key, intention)
+        for observer in self._historyObservers[:]:
+            observer.intentionAppended(key, intention)
+
+    def _intentionChanged(self, intention: Intention, key: str) -> None:
+        # Any of its estimates, its pomodoros or its status may have changed,
+        # so its score events may have too.
+        self._scoreSourceChanged(intention)
+        self._intentionStatusChanged(intention)
+        for observer in self._historyObservers[:]:
+            observer.intentionChanged(intention, key)
+
+    def _streakAppended(
+        self, key: int, streak: ObservableList[AnyInterval]
+    ) -> None:
+        self._currentInterval = None
+        self._streakSummary = None
+        _HistoryHook.install(
+            streak, self._intervalAppended, self._historyChanged
+        )
+        for observer in self._historyObservers[:]:
+            observer.streakAppended(key, streak)
+        for position, interval in enumerate(streak):
+            self._intervalAppended(position, interval)
+
+    def _intervalAppended(self, key: int, interval: AnyInterval) -> None:
+        self._currentInterval = None
+        if (summary := self._streakSummary) is not None:
+            summary.add(interval)
+        if not isinstance(interval, StartPrompt):
+            # Start prompts have no effect on the score; they are appended
+            # while we're idle, when the schedule is most useful.
+            self._pointLossSchedule = None
+        if (index := self._scoreIndex) is not None:
+            index.addInterval(interval)
+            if isinstance(interval, Pomodoro):
+                # A new pomodoro changes the number of estimation attempts
+                # that count for its intention.
+                index.refresh(interval.intention)
+        for observer in self._historyObservers[:]:
+            observer.intervalAppended(interval)
+
+    def _sessionAppended(self, key: int, session: Session) -> None:
+        self._sessionsChanged()
+
+    def _sessionsChanged(self) -> None:
+        self._sessionIndex = None
+        self._sessionSpan = None
+        for observer in self._historyObservers[:]:
+            observer.sessionsChanged()
+
+    def _intentionStatusChanged(self, intention: Intention) -> None:
+        """
+        An intention may have been completed, or un-completed.
+        """
+        if (view := self._availableIntentions) is not None:
+            view.update(intention)
+
+    def _scoreSourceChanged(self, source: Intention | AnyInterval) -> None:
+        """
+        An intention or interval that we already know about has been changed
+        in a way that may change its score events.
+        """
+        self._pointLossSchedule = None
+        if (index := self._scoreIndex) is not None:
+            index.refresh(source)
+
+    def _peekUpcomingDurations(self) -> list[Duration]:
+        """
+        Get a list of the durations remaining in the current streak, without
+        consuming them.
+        """
+        return list(self._upcomingDurations.remaining)
+
     def scoreEvents(
         self, *, startTime: float | None = None, endTime: float | None = None
     ) -> Iterable[ScoreEvent]:
         """
-        Get all score-relevant events since the given timestamp.
+        Get all score-relevant events since the given timestamp, in time
+        order.
         """
         if startTime is None:
             startTime = self._initialTime
         if endTime is None:
             endTime = self._lastUpdateTime
-        for intentionIndex, intention in enumerate(self._intentions):
-            for event in intention.intentionScoreEvents(intentionIndex):
-                if startTime <= event.time and event.time <= endTime:
-                    yield event
-        for streak in self._streaks:
-            for interval in streak:
-                if interval.startTime > startTime:
-                    for event in interval.scoreEvents():
-                        debug(
-                            "score", event.time > endTime, event, event.points
-                        )
-                        if startTime <= event.time and event.time <= endTime:
-                            yield event
+        if (index := self._scoreIndex) is None:
+            debug("building score index")
+            index = self._scoreIndex = ScoreIndex.build(
+                self._residentIntentions(), self._residentStreaks()
+            )
+        events = index.events(startTime, endTime)
+        if (paged := self._pagedHistory) is None:
+            return events
+        return merge(
+            paged.pagedScoreEvents(startTime, endTime),
+            events,
+            key=lambda event: event.time,
+        )
 
     @property
     def userInterface(self) -> UIEventListener:
@@ -218,17 +878,170 @@ class Nexus:
         This property is a list of all intentions that are available for the
         user to select for a new pomodoro.
         """
-        return [
-            i for i in self._intentions if not i.completed and not i.abandoned
-        ]
+        if self._owned is not None:
+            # A fork's intentions are shared with the nexus it was forked
+            # from, so it doesn't hook them to keep a view up to date.
+            return [
+                i
+                for position, i in self._residentIntentions()
+                if not i.completed and not i.abandoned
+            ]
+        if (view := self._availableIntentions) is None:
+            view = self._availableIntentions = _AvailableIntentions(
+                self._intentions
+            )
+            view.rebuild(self._residentIntentions())
+        return view
+
+    def _residentIntentions(self) -> Iterator[tuple[int, Intention]]:
+        """
+        Our intentions, paired with their positions, leaving out any which
+        have been paged out.
+        """
+        intentions = self._intentions
+        if (paged := self._pagedHistory) is None:
+            yield from enumerate(intentions)
+            return
+        for position in paged.residentIntentions(len(intentions)):
+            yield position, intentions[position]
+
+    def _residentStreaks(self) -> Iterator[Sequence[AnyInterval]]:
+        """
+        Our streaks, leaving out any which have been paged out.
+        """
+        streaks = self._streaks
+        if (paged := self._pagedHistory) is None:
+            yield from streaks
+            return
+        for position in paged.residentStreaks(len(streaks)):
+            yield streaks[position]
+
+    def _residentSessions(self) -> Iterator[Session]:
+        """
+        Our sessions, leaving out any which have been paged out.
+        """
+        sessions = self._sessions
+        if (paged := self._pagedHistory) is None:
+            yield from sessions
+            return
+        for position in paged.residentSessions(len(sessions)):
+            yield sessions[position]
+
+    @property
+    def streakSummary(self) -> StreakSummary:
+        """
+        Summary of the user's current streak.
+        """
+        if (summary := self._streakSummary) is None:
+            summary = self._streakSummary = StreakSummary.build(
+                self._streaks[-1] if self._streaks else ()
+            )
+        return summary
+
+    def _pomodorosInStreak(self) -> int:
+        """
+        How many pomodoros are in the current streak?
+        """
+        return self.streakSummary.pomodoroCount
+
+    def _nextPointLoss(self, session: Session) -> PointLoss | None:
+        """
+        Find the next time that the ideal score for the given session will
+        drop, while we are idle.
+        """
+        schedule = self._pointLossSchedule
+        if (
+            schedule is None
+            or schedule.workPeriodEnd != session.end
+            or schedule.streakPomodoros != self._pomodorosInStreak()
+        ):
+            debug("building point-loss schedule")
+            schedule = self._pointLossSchedule = PointLossSchedule.build(
+                self, session.end
+            )
+        if schedule is not None:
+            return schedule.pointLoss(self._lastUpdateTime)
+        scoreInfo = idealScore(self, session.start, session.end)
+        if scoreInfo.nextPointLoss is None:
+            return None
+        return PointLoss(
+            scoreInfo.nextPointLoss,
+            scoreInfo.scoreBeforeLoss(),
+            scoreInfo.scoreAfterLoss(),
+        )
+
+    def _sessionsAt(self, now: float) -> tuple[Session | None, float, float]:
+        """
+        Find the session active at C{now}, and the span of time over which it
+        stays active, as per L{SessionIndex.sessionAt}.
+        """
+        span = self._sessionSpan
+        if span is None or not span[1] <= now < span[2]:
+            span = self._sessionSpan = self._indexedSessions().sessionAt(now)
+        return span
+
+    def _indexedSessions(self) -> SessionIndex:
+        if (index := self._sessionIndex) is None:
+            index = self._sessionIndex = SessionIndex.build(
+                self._residentSessions()
+            )
+        return index
 
     def _activeSession(self) -> Session | None:
-        for session in self._sessions:
-            if session.start <= self._lastUpdateTime < session.end:
-                debug("session active", session.start, session.end)
-                return session
-        debug("no session")
-        return None
+        session, _, _ = self._sessionsAt(self._lastUpdateTime)
+        if session is None:
+            debug("no session")
+        else:
+            debug("session active", session.start, session.end)
+        return session
+
+    def nextEventTime(self) -> float | None:
+        """
+        Find the next time after our last update at which our state will change
+        on its own: when the active interval (including a grace period, or a
+        start prompt waiting for a drop in the ideal score) ends, when a
+        session starts or ends, or when the ideal score drops while we're idle
+        during a session.
+
+        @return: the timestamp of the next change, or C{None} if nothing will
+            change until the user does something.
+        """
+        now = self._lastUpdateTime
+        session, _, nextBoundary = self._sessionsAt(now)
+        candidates = [nextBoundary]
+        active = self._activeInterval
+        if active is not None:
+            candidates.append(active.endTime)
+        elif session is not None:
+            nextDrop = self._nextPointLoss(session)
+            if nextDrop is not None:
+                candidates.append(nextDrop.time)
+        upcoming = min(each for each in candidates if each > now)
+        return None if upcoming == inf else upcoming
+
+    def addActionListener(self, listener: ActionListener) -> None:
+        """
+        Notify C{listener} before and after each of the user's actions.
+        """
+        self._actionListeners.append(listener)
+
+    def removeActionListener(self, listener: ActionListener) -> None:
+        """
+        Stop notifying a listener added with L{Nexus.addActionListener}.
+        """
+        self._actionListeners.remove(listener)
+
+    def addHistoryObserver(self, observer: HistoryObserver) -> None:
+        """
+        Notify C{observer} of each change to our history.
+        """
+        self._historyObservers.append(observer)
+
+    def removeHistoryObserver(self, observer: HistoryObserver) -> None:
+        """
+        Stop notifying an observer added with L{Nexus.addHistoryObserver}.
+        """
+        self._historyObservers.remove(observer)
 
     def advanceToTime(self, newTime: float) -> None:
         """
@@ -241,6 +1054,12 @@ class Nexus:
             and (currentEndTime := self._streaks[-1][-1].endTime) is not None
             and currentEndTime == self._lastUpdateTime
         )
+        # When catching up on a long stretch of time (after the computer wakes
+        # from sleep, for example), intervals which begin and end entirely
+        # within that stretch are recorded without being announced to the UI.
+        # It hears only that the interval which was running has ended, and
+        # about the interval (if any) that we land in.
+        unannounced: AnyInterval | None = None
         while self._lastUpdateTime < newTime or earlyEvaluationSpecialCase:
             earlyEvaluationSpecialCase = False
             newInterval: AnyInterval | None = None
@@ -254,16 +1073,13 @@ class Nexus:
                 debug("interval None, update to real time", newTime)
                 activeSession = self._activeSession()
                 if activeSession is not None:
-                    scoreInfo = idealScore(
-                        self, activeSession.start, activeSession.end
-                    )
-                    nextDrop = scoreInfo.nextPointLoss
-                    if nextDrop is not None and nextDrop > newTime:
+                    nextDrop = self._nextPointLoss(activeSession)
+                    if nextDrop is not None and nextDrop.time > newTime:
                         newInterval = StartPrompt(
                             self._lastUpdateTime,
-                            nextDrop,
-                            scoreInfo.scoreBeforeLoss(),
-                            scoreInfo.scoreAfterLoss(),
+                            nextDrop.time,
+                            nextDrop.scoreBefore,
+                            nextDrop.scoreAfter,
                         )
             else:
                 debug("interval active", newTime)
@@ -281,19 +1097,22 @@ class Nexus:
                         debug(
                             currentInterval.intervalType, "grace/prompt expiry"
                         )
-                        self._upcomingDurations = iter(())
+                        self._upcomingDurations = DurationCursor()
 
                     debug("getting duration", currentInterval.intervalType)
                     newDuration = next(self._upcomingDurations, None)
-                    debug("first interface lookup")
-                    self.userInterface.intervalProgress(1.0)
-                    debug("second interface lookup")
-                    self.userInterface.intervalEnd()
+                    if currentInterval is not unannounced:
+                        debug("first interface lookup")
+                        self.userInterface.intervalProgress(1.0)
+                        debug("second interface lookup")
+                        self.userInterface.intervalEnd()
                     debug("testing newDuration")
                     if newDuration is None:
                         debug("no new duration, so catching up to real time")
                         # XXX needs test coverage
-                        self._streaks.append(ObservableList(IgnoreChanges))
+                        self._streaks.append(
+                            self._claim(ObservableList(IgnoreChanges))
+                        )
                     else:
                         debug("new duration", newDuration)
                         newInterval = preludeIntervalMap[
@@ -320,15 +1139,24 @@ class Nexus:
             # through the loop, then we need to mention that fact to the UI.
             if newInterval is not None:
                 debug("newInterval created", newInterval)
-                self._createdInterval(newInterval)
+                if newInterval.endTime <= newTime:
+                    debug("newInterval already elapsed")
+                    self._streaks[-1].append(self._claim(newInterval))
+                    unannounced = newInterval
+                else:
+                    self._createdInterval(newInterval)
                 # should really be active now
                 assert self._activeInterval is newInterval
 
     def _createdInterval(self, newInterval: AnyInterval) -> None:
-        self._streaks[-1].append(newInterval)
-        self.userInterface.intervalStart(newInterval)
-        self.userInterface.intervalProgress(0.0)
+        # Make sure the UI exists before the new interval does, since creating
+        # it announces whatever interval is active at the time.
+        ui = self.userInterface
+        self._streaks[-1].append(self._claim(newInterval))
+        ui.intervalStart(newInterval)
+        ui.intervalProgress(0.0)
 
+    @_userAction
     def addIntention(
         self,
         title: str = "",
@@ -341,29 +1169,64 @@ class Nexus:
         self._lastIntentionID += 1
         newID = self._lastIntentionID
         self._intentions.append(
-            newIntention := Intention(
-                newID,
-                self._lastUpdateTime,
-                self._lastUpdateTime,
-                title,
-                description,
+            newIntention := self._claim(
+                Intention(
+                    newID,
+                    self._lastUpdateTime,
+                    self._lastUpdateTime,
+                    title,
+                    description,
+                    estimates=(
+                        []
+                        if estimate is None
+                        else [
+                            Estimate(
+                                duration=estimate, madeAt=self._lastUpdateTime
+                            )
+                        ]
+                    ),
+                )
             )
         )
-        if estimate is not None:
-            newIntention.estimates.append(
-                Estimate(duration=estimate, madeAt=self._lastUpdateTime)
-            )
         return newIntention
 
-    def addManualSession(self, startTime: float, endTime: float) -> None:
+    @_userAction
+    def addManualSession(
+        self, startTime: float, endTime: float, coalesce: bool = False
+    ) -> None:
         """
         Add a 'work session'; a discrete interval where we will be scored, and
         notified of potential drops to our score if we don't set intentions.
+
+        @param coalesce: If true, rather than adding a session that overlaps
+            other manual sessions, merge them all (along with any that it
+            touches) into one.
         """
-        self._sessions.append(Session(startTime, endTime, False))
-        # MutableSequence doesn't have a .sort() method
-        self._sessions[:] = sorted(self._sessions)
+        newSession = Session(startTime, endTime, False)
+        if coalesce:
+            merged = [
+                each
+                for each in self._indexedSessions().overlapping(
+                    startTime, endTime, touching=True
+                )
+                if not each.automatic
+            ]
+            for each in merged:
+                # Find it by bisecting, rather than by searching from the
+                # start, which would read in any sessions paged out to disk.
+                del self._sessions[bisect_left(self._sessions, each)]
+            newSession = Session(
+                min([startTime, *(each.start for each in merged)]),
+                max([endTime, *(each.end for each in merged)]),
+                False,
+            )
+        # Keep the sessions sorted, with a single notification for the one
+        # that was inserted.
+        self._sessions.insert(
+            bisect_right(self._sessions, newSession), newSession
+        )
 
+    @_userAction
     def startPomodoro(self, intention: Intention) -> PomStartResult:
         """
         When you start a pomodoro, the length of time set by the pomodoro is
@@ -377,27 +1240,40 @@ class Nexus:
 
         def startPom(startTime: float, endTime: float) -> None:
             ui = self.userInterface
+            writable = self._writableIntention(intention)
             newPomodoro = Pomodoro(
-                intention=intention,
-                indexInStreak=sum(
-                    isinstance(each, Pomodoro) for each in self._streaks[-1]
-                ),
+                intention=writable,
+                indexInStreak=self._pomodorosInStreak(),
                 startTime=startTime,
                 endTime=endTime,
             )
-            intention.pomodoros.append(newPomodoro)
+            writable.pomodoros.append(newPomodoro)
+            self._intentionStatusChanged(writable)
             self._createdInterval(newPomodoro)
 
         return handleStartFunc(self, startPom)
 
+    @_userAction
     def evaluatePomodoro(
         self, pomodoro: Pomodoro, result: EvaluationResult
     ) -> None:
         """
         The user has determined the success criteria.
         """
+        pomodoro = self._writablePomodoro(pomodoro)
         timestamp = self._lastUpdateTime
-        pomodoro.evaluation = Evaluation(result, timestamp)
+        intention = pomodoro.intention
+        # Evaluating a pomodoro changes the intention's pomodoros, although
+        # not the list of them, so let its observer know; through our hook,
+        # that also brings its score events and its status up to date.
+        with intention.observer.changed(
+            "pomodoros", intention.pomodoros, intention.pomodoros
+        ):
+            pomodoro.evaluation = Evaluation(result, timestamp)
+        # Evaluations are rare, so rather than working out whether this one
+        # belongs to the current streak, just summarize it again later.
+        self._streakSummary = None
+        self._scoreSourceChanged(pomodoro)
         if result == EvaluationResult.achieved:
             assert (
                 pomodoro.intention.completed
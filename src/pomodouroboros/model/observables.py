@@ -2,13 +2,14 @@
 from __future__ import annotations
 
 import sys
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager, nullcontext
 from dataclasses import dataclass, field
 from enum import Enum, auto
 from functools import total_ordering
 from typing import (
     IO,
     Annotated,
+    Any,
     Callable,
     ContextManager,
     Generic,
@@ -18,6 +19,7 @@ from typing import (
     MutableMapping,
     MutableSequence,
     Protocol,
+    Sequence,
     TypeVar,
     dataclass_transform,
     overload,
@@ -73,21 +75,44 @@ def noop() -> Iterator[None]:
     yield
 
 
+_nothing: ContextManager[None] = nullcontext()
+"""
+A reusable context manager that does nothing, cheaper than calling L{noop}.
+"""
+
+
 @dataclass
 class IgnoreChanges:
+    """
+    An observer that ignores every change.
+
+    The observables check for it, either the class itself or an instance,
+    and skip notifying it altogether, so that models which nobody is
+    watching, like the hypothetical ones that the L{Nexus} simulates, pay
+    nothing for being observable.
+    """
+
     @classmethod
     def added(cls, key: object, new: object) -> ContextManager[None]:
-        return noop()
+        return _nothing
 
     @classmethod
     def removed(cls, key: object, old: object) -> ContextManager[None]:
-        return noop()
+        return _nothing
 
     @classmethod
     def changed(
         cls, key: object, old: object, new: object
     ) -> ContextManager[None]:
-        return noop()
+        return _nothing
+
+
+def _ignoring(observer: object) -> bool:
+    """
+    Is the given observer L{IgnoreChanges}, either the class itself or an
+    instance of it, so that it need not be notified at all?
+    """
+    return observer is IgnoreChanges or observer.__class__ is IgnoreChanges
 
 
 _IgnoreChangesImplements: type[Changes[object, object]] = IgnoreChanges
@@ -164,6 +189,10 @@ class ObservableDict(MutableMapping[K, V]):
 
     # notifying write operations
     def __setitem__(self, key: K, value: V) -> None:
+        observer = self.observer
+        if _ignoring(observer):
+            self._storage[key] = value
+            return
         with (
             self.observer.changed(key, self._storage[key], value)
             if key in self._storage
@@ -172,7 +201,11 @@ class ObservableDict(MutableMapping[K, V]):
             return self._storage.__setitem__(key, value)
 
     def __delitem__(self, key: K) -> None:
-        with self.observer.removed(key, self._storage[key]):
+        observer = self.observer
+        if _ignoring(observer):
+            del self._storage[key]
+            return
+        with observer.removed(key, self._storage[key]):
             return self._storage.__delitem__(key)
 
 
@@ -210,6 +243,14 @@ class ObservableList(MutableSequence[V]):
         ...
 
     def __setitem__(self, index: int | slice, value: V | Iterable[V]) -> None:
+        observer = self.observer
+        if _ignoring(observer):
+            # see below about these type:ignores
+            self._storage.__setitem__(
+                index,  # type:ignore[index]
+                value,  # type:ignore[assignment]
+            )
+            return
         with (
             self.observer.changed(index, self._storage[index], value)
             if (
@@ -230,16 +271,86 @@ class ObservableList(MutableSequence[V]):
             )
 
     def __delitem__(self, index: int | slice) -> None:
-        with self.observer.removed(index, self._storage[index]):
+        observer = self.observer
+        if _ignoring(observer):
+            del self._storage[index]
+            return
+        with observer.removed(index, self._storage[index]):
             self._storage.__delitem__(index)
 
     def insert(self, index: int, value: V) -> None:
         """
         a value was inserted
         """
-        with self.observer.added(index, value):
+        observer = self.observer
+        if _ignoring(observer):
+            self._storage.insert(index, value)
+            return
+        with observer.added(index, value):
             self._storage.insert(index, value)
 
+    # bulk write operations, each with a single notification, rather than the
+    # per-element ones that MutableSequence would build them from
+    def extend(self, values: Iterable[V]) -> None:
+        """
+        values were appended, occupying the notified slice
+        """
+        observer = self.observer
+        if _ignoring(observer):
+            # copy ourselves first, or extending would never run out of values
+            self._storage.extend(list(values) if values is self else values)
+            return
+        new = list(values)
+        if not new:
+            return
+        start = len(self._storage)
+        with self.observer.added(slice(start, start + len(new)), new):
+            self._storage.extend(new)
+
+    def __iadd__(self, values: Iterable[V]) -> ObservableList[V]:
+        self.extend(values)
+        return self
+
+    def clear(self) -> None:
+        """
+        every value was removed
+        """
+        observer = self.observer
+        if _ignoring(observer):
+            self._storage.clear()
+            return
+        old = list(self._storage)
+        if not old:
+            return
+        with self.observer.removed(slice(0, len(old)), old):
+            self._storage.clear()
+
+    def remove(self, value: V) -> None:
+        """
+        the first occurrence of a value was removed
+        """
+        observer = self.observer
+        if _ignoring(observer):
+            self._storage.remove(value)
+            return
+        index = self._storage.index(value)
+        with self.observer.removed(index, self._storage[index]):
+            del self._storage[index]
+
+    def reverse(self) -> None:
+        """
+        the values were reversed in place
+        """
+        observer = self.observer
+        if _ignoring(observer):
+            self._storage.reverse()
+            return
+        old = list(self._storage)
+        if len(old) < 2:
+            return
+        with self.observer.changed(slice(0, len(old)), old, old[::-1]):
+            self._storage.reverse()
+
     # proxied read operations
     @overload
     def __getitem__(self, index: int) -> V:
@@ -345,6 +456,9 @@ class ObservableProperty:
 
     def __set__(self, instance: object, value: object) -> None:
         notify: Changes[str, object] = getattr(instance, self.observer_name)
+        if _ignoring(notify):
+            instance.__dict__[self.field_name] = value
+            return
 
         # I need to avoid invoking the observer if the instance isn't fully
         # initialized
@@ -359,6 +473,9 @@ class ObservableProperty:
         if self.field_name not in instance.__dict__:
             raise AttributeError(f"couldn't find {self.field_name!r}")
         notify: Changes[str, object] = getattr(instance, self.observer_name)
+        if _ignoring(notify):
+            del instance.__dict__[self.field_name]
+            return
         with notify.removed(
             self.field_name, instance.__dict__[self.field_name]
         ):
@@ -395,13 +512,117 @@ class MustSpecifyObserver(Exception):
     """
 
 
+_slottedSetter = """
+def set_{index}(self, value):
+    try:
+        observer = getObserver(self)
+    except AttributeError:
+        observer = IgnoreChanges
+    if ignoring(observer):
+        put_{index}(self, value)
+        return
+    try:
+        old = get_{index}(self)
+    except AttributeError:
+        with observer.added({name!r}, value):
+            put_{index}(self, value)
+        return
+    with observer.changed({name!r}, old, value):
+        put_{index}(self, value)
+
+def delete_{index}(self):
+    old = get_{index}(self)
+    try:
+        observer = getObserver(self)
+    except AttributeError:
+        observer = IgnoreChanges
+    if ignoring(observer):
+        remove_{index}(self)
+        return
+    with observer.removed({name!r}, old):
+        remove_{index}(self)
+"""
+
+
+def _slottedProperties(cls: type, observerName: str, names: list[str]) -> None:
+    """
+    Replace the slots of a slotted dataclass with properties that read them
+    directly, and write them through setters generated for each field, which
+    notify the observer in the same way as L{ObservableProperty}.
+
+    The slots' own descriptors are kept by the generated code, so the values
+    are still stored in them.
+    """
+    namespace: dict[str, Any] = {
+        "IgnoreChanges": IgnoreChanges,
+        "ignoring": _ignoring,
+        "getObserver": cls.__dict__[observerName].__get__,
+    }
+    slots = {}
+    for index, name in enumerate(names):
+        slot = slots[name] = cls.__dict__[name]
+        namespace[f"get_{index}"] = slot.__get__
+        namespace[f"put_{index}"] = slot.__set__
+        namespace[f"remove_{index}"] = slot.__delete__
+    exec(
+        "".join(
+            _slottedSetter.format(index=index, name=name)
+            for index, name in enumerate(names)
+        ),
+        namespace,
+    )
+    for index, name in enumerate(names):
+        setattr(
+            cls,
+            name,
+            property(
+                namespace[f"get_{index}"],
+                namespace[f"set_{index}"],
+                namespace[f"delete_{index}"],
+            ),
+        )
+    slots[observerName] = cls.__dict__[observerName]
+
+    # Copying or unpickling an instance restores its state straight into its
+    # slots, as it would into a __dict__, without notifying anyone.
+    def __getstate__(self: object) -> dict[str, object]:
+        state = {}
+        for name, slot in slots.items():
+            try:
+                state[name] = slot.__get__(self)
+            except AttributeError:
+                pass
+        return state
+
+    def __setstate__(self: object, state: dict[str, object]) -> None:
+        for name, value in state.items():
+            slots[name].__set__(self, value)
+
+    setattr(cls, "__getstate__", __getstate__)
+    setattr(cls, "__setstate__", __setstate__)
+
+
 @dataclass_transform(field_specifiers=(field,))
-def observable(repr: bool = True) -> Callable[[Ty], Ty]:
+def observable(repr: bool = True, slots: bool = False) -> Callable[[Ty], Ty]:
+    """
+    Make a class into a dataclass whose attributes notify the one annotated
+    as its L{Observer} whenever they change.
+
+    @param slots: If true, store the attributes in C{__slots__} rather than
+        each instance's C{__dict__}, as C{dataclass(slots=True)} does, and
+        generate a setter specialized to each one, rather than using an
+        L{ObservableProperty}.  Instances are smaller and faster to use, but
+        can't have attributes that aren't fields (except C{__weakref__}), and
+        the observer has no class-level default.
+    """
+
     def make_observable(cls: Ty) -> Ty:
         observerName = None
         originalAnnotations = cls.__annotations__
 
-        cls = dataclass(repr=repr)(cls)  # type:ignore[assignment]
+        cls = dataclass(  # type:ignore[assignment]
+            repr=repr, slots=slots, weakref_slot=slots
+        )(cls)
         for i, (k, v) in enumerate(originalAnnotations.items()):
             if _isObserver(_unstringify(cls, v)):
                 observerIndex = i
@@ -413,6 +634,13 @@ def observable(repr: bool = True) -> Callable[[Ty], Ty]:
                 "you must annotate one attribute with Observer"
             )
 
+        if slots:
+            _slottedProperties(
+                cls,
+                observerName,
+                [k for k in originalAnnotations if k != observerName],
+            )
+            return cls
         for k, v in originalAnnotations.items():
             if k != observerName:
                 setattr(cls, k, ObservableProperty(observerName, k))
@@ -463,12 +691,31 @@ class PathObserver(Generic[Kcon, Vcon]):
 
     and you will see that the changes are reflected with keys of 'a.aValue' and
     'a.b.bValue' respectively.
+
+    Key paths are remembered as they're built, and so are children, so that
+    a deeply nested model can deliver a notification without building a
+    string for it.  Only the most recent C{remembered} string keys, integer
+    keys, and children are each kept, since a dictionary or a long list may
+    have any number of them; keeping them apart means the indices of a long
+    list don't push out the attribute names of the object holding it.
+    C{convert} must therefore give the same string for the same key every
+    time.
     """
 
     wrapped: Changes[str, Vcon]
     prefix: str
     convert: Callable[[Kcon], str] = str
     sep: str = "."
+    remembered: int = 256
+    _names: dict[str, str] = field(
+        default_factory=dict, init=False, compare=False
+    )
+    _indices: dict[int, str] = field(
+        default_factory=dict, init=False, compare=False
+    )
+    _children: dict[str, PathObserver[Kcon, Vcon]] = field(
+        default_factory=dict, init=False, compare=False
+    )
 
     def __repr__(self) -> str:
         return f"{self.wrapped}/({self.prefix})"
@@ -478,40 +725,73 @@ class PathObserver(Generic[Kcon, Vcon]):
             self.sep.join([self.prefix, segment]) if self.prefix else segment
         )
 
+    def _pathTo(self, key: Kcon) -> str:
+        """
+        Get the path to C{key} beneath this one, from the cache if possible.
+        """
+        segment = key
+        if isinstance(key, str):
+            path = self._names.get(key)
+            if path is None:
+                path = self._keyPath(self.convert(segment))
+                _remember(self._names, key, path, self.remembered)
+            return path
+        if isinstance(key, int):
+            path = self._indices.get(key)
+            if path is None:
+                path = self._keyPath(self.convert(segment))
+                _remember(self._indices, key, path, self.remembered)
+            return path
+        # slices, from bulk list operations, and anything else unusual.
+        return self._keyPath(self.convert(segment))
+
     def child(self, segment: str) -> PathObserver[Kcon, Vcon]:
         """
-        create child path observer
+        create child path observer, or return the one already created for
+        C{segment}
         """
-        return PathObserver(
+        existing = self._children.get(segment)
+        if existing is not None:
+            return existing
+        made = PathObserver(
             self.wrapped,
             self._keyPath(segment),
             self.convert,
             self.sep,
+            self.remembered,
         )
+        _remember(self._children, segment, made, self.remembered)
+        return made
 
-    @contextmanager
-    def added(self, key: Kcon, new: Vcon) -> Iterator[None]:
+    def added(self, key: Kcon, new: Vcon) -> ContextManager[None]:
         """
         C{value} was added for the given C{key}.
         """
-        with self.wrapped.added(self._keyPath(self.convert(key)), new):
-            yield
+        return self.wrapped.added(self._pathTo(key), new)
 
-    @contextmanager
-    def removed(self, key: Kcon, old: Vcon) -> Iterator[None]:
+    def removed(self, key: Kcon, old: Vcon) -> ContextManager[None]:
         """
         C{key} was removed for the given C{key}.
         """
-        with self.wrapped.removed(self._keyPath(self.convert(key)), old):
-            yield
+        return self.wrapped.removed(self._pathTo(key), old)
 
-    @contextmanager
-    def changed(self, key: Kcon, old: Vcon, new: Vcon) -> Iterator[None]:
+    def changed(self, key: Kcon, old: Vcon, new: Vcon) -> ContextManager[None]:
         """
         C{value} was changed from C{old} to C{new} for the given C{key}.
         """
-        with self.wrapped.changed(self._keyPath(self.convert(key)), old, new):
-            yield
+        return self.wrapped.changed(self._pathTo(key), old, new)
+
+
+def _remember(cache: dict[K, V], key: K, value: V, limit: int) -> None:
+    """
+    Put C{value} in C{cache} at C{key}, first evicting the oldest entry if
+    there are already C{limit} of them.
+    """
+    if len(cache) >= limit:
+        if limit <= 0:
+            return
+        del cache[next(iter(cache))]
+    cache[key] = value
 
 
 @dataclass(repr=False)
@@ -534,7 +814,7 @@ class AfterInitObserver:
         if original is not None:
             return original.added(key, new)
         else:
-            return noop()
+            return _nothing
 
     def removed(self, key: str, old: object) -> ContextManager[None]:
         """
@@ -544,7 +824,7 @@ class AfterInitObserver:
         if original is not None:
             return original.removed(key, old)
         else:
-            return noop()
+            return _nothing
 
     def changed(
         self, key: str, old: object, new: object
@@ -556,7 +836,7 @@ class AfterInitObserver:
         if original is not None:
             return original.changed(key, old, new)
         else:
-            return noop()
+            return _nothing
 
     def finalize(self, ref: object) -> None:
         """
@@ -565,6 +845,204 @@ class AfterInitObserver:
         self._original = None
 
 
+class ChangeKind(Enum):
+    """
+    Which of the methods of L{Changes} a L{Change} was reported to.
+    """
+
+    added = auto()
+    removed = auto()
+    changed = auto()
+
+
+@dataclass(frozen=True)
+class Change:
+    """
+    A single notification, buffered by a L{Batch}.
+    """
+
+    kind: ChangeKind
+    key: Any
+    old: Any = None
+    new: Any = None
+
+    def deliver(self, observer: Changes[Any, Any]) -> ContextManager[None]:
+        """
+        Report this change to the given observer, as it originally was.
+        """
+        if self.kind is ChangeKind.added:
+            return observer.added(self.key, self.new)
+        elif self.kind is ChangeKind.removed:
+            return observer.removed(self.key, self.old)
+        else:
+            return observer.changed(self.key, self.old, self.new)
+
+
+def _merged(first: Change, then: Change) -> Change | None:
+    """
+    Combine two successive changes to the same key into one, or into none at
+    all if the second undoes the first.
+    """
+    kinds = (first.kind, then.kind)
+    if kinds == (ChangeKind.added, ChangeKind.changed):
+        return Change(ChangeKind.added, then.key, new=then.new)
+    elif kinds == (ChangeKind.added, ChangeKind.removed):
+        return None
+    elif kinds == (ChangeKind.changed, ChangeKind.removed):
+        return Change(ChangeKind.removed, then.key, old=first.old)
+    elif kinds in {
+        (ChangeKind.changed, ChangeKind.changed),
+        (ChangeKind.removed, ChangeKind.added),
+    }:
+        return Change(ChangeKind.changed, then.key, first.old, then.new)
+    return then
+
+
+def coalesce(changes: Iterable[Change]) -> list[Change]:
+    """
+    Combine successive changes to the same key of an object or mapping into
+    one, reported in the place of the last of them.  Changes to a sequence
+    are kept as they are, in order, since each one moves the positions that
+    the ones after it refer to.
+    """
+    result: list[Change | None] = []
+    latest: dict[object, int] = {}
+    for change in changes:
+        key = change.key
+        if isinstance(key, (int, slice)):
+            result.append(change)
+            continue
+        merged: Change | None = change
+        if (position := latest.pop(key, None)) is not None:
+            previous = result[position]
+            assert previous is not None
+            result[position] = None
+            merged = _merged(previous, change)
+        if merged is not None:
+            latest[key] = len(result)
+            result.append(merged)
+    return [each for each in result if each is not None]
+
+
+class ChangeSetObserver(Changes[Kcon, Vcon], Protocol[Kcon, Vcon]):
+    """
+    An observer that can take all of the changes made during a L{batch} at
+    once.
+    """
+
+    def committed(self, changes: Sequence[Change]) -> None:
+        """
+        The given changes, coalesced, have all been made.
+        """
+
+
+@dataclass(repr=False)
+class Batch(Generic[K, V]):
+    """
+    Interposer that passes notifications along to the observer beneath it as
+    they happen, except during a L{batch}; then it buffers them, and delivers
+    them all, coalesced, once the batch is committed.
+
+    If the observer beneath it is a L{ChangeSetObserver}, they are delivered
+    to its C{committed} method, as one unit of work.  Otherwise, each one is
+    reported to it as usual, but with the change already made.
+    """
+
+    original: Changes[K, V]
+    _pending: list[Change] | None = field(default=None, init=False)
+    _depth: int = field(default=0, init=False)
+
+    def __repr__(self) -> str:
+        return repr(self.original)
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """
+        Buffer notifications until the outermost transaction is committed, or
+        fails; even then, whatever changes were made are delivered.
+        """
+        if self._pending is None:
+            self._pending = []
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if not self._depth:
+                pending, self._pending = self._pending, None
+                self._deliver(coalesce(pending))
+
+    def _deliver(self, changes: Sequence[Change]) -> None:
+        if not changes:
+            return
+        committed = getattr(self.original, "committed", None)
+        if committed is not None:
+            committed(changes)
+            return
+        for change in changes:
+            with change.deliver(self.original):
+                pass
+
+    @contextmanager
+    def _buffering(self, change: Change) -> Iterator[None]:
+        yield
+        assert self._pending is not None, "batch committed mid-change"
+        self._pending.append(change)
+
+    def added(self, key: K, new: V) -> ContextManager[None]:
+        if self._pending is None:
+            return self.original.added(key, new)
+        return self._buffering(Change(ChangeKind.added, key, new=new))
+
+    def removed(self, key: K, old: V) -> ContextManager[None]:
+        if self._pending is None:
+            return self.original.removed(key, old)
+        return self._buffering(Change(ChangeKind.removed, key, old=old))
+
+    def changed(self, key: K, old: V, new: V) -> ContextManager[None]:
+        if self._pending is None:
+            return self.original.changed(key, old, new)
+        return self._buffering(Change(ChangeKind.changed, key, old, new))
+
+
+_BatchImplements: type[Changes[str, object]] = Batch[str, object]
+
+_interposed = ("original", "_original", "wrapped")
+"""
+The attributes that interposers like L{DebugChanges}, L{AfterInitObserver}
+and L{PathObserver} keep the observer beneath them in.
+"""
+
+
+@contextmanager
+def batch(*observers: object) -> Iterator[None]:
+    """
+    Open a transaction on every L{Batch} among the given observers, or
+    beneath them, so that each delivers one coalesced set of changes once the
+    body of the C{with} statement is done, instead of one per change.
+    Observers with no L{Batch} are notified of each change as usual.
+
+    The L{Batch}es are committed in the order that they were given in.
+    """
+    with ExitStack() as stack:
+        for observer in reversed(observers):
+            seen: set[int] = set()
+            each: object = observer
+            while each is not None and id(each) not in seen:
+                seen.add(id(each))
+                if isinstance(each, Batch):
+                    stack.enter_context(each.transaction())
+                each = next(
+                    (
+                        beneath
+                        for name in _interposed
+                        if (beneath := getattr(each, name, None)) is not None
+                    ),
+                    None,
+                )
+        yield
+
+
 CN = TypeVar("CN", bound=Changes[str, object])
 
 
@@ -0,0 +1,1203 @@
+# -*- test-case-name: pomodouroboros.model.test.test_paging -*-
+"""
+Keeping the closed part of a L{Nexus}'s history on disk, in a shard file for
+each month (or week) of it, so that only the live part of it needs to stay in
+memory, or to be read at startup.
+
+Closed streaks, the completed or abandoned intentions whose pomodoros are all
+in those streaks, and sessions from earlier months, are written out to the
+shard for the month they began in, and read back in whenever something looks
+at them.  Anything read back in is only held on to while something else is
+using it.
+
+Everything else -- the current streak, the open intentions, recent sessions
+and the upcoming durations -- is kept in a small live file, along with a
+manifest of the shards: which of the intentions, streaks and sessions each
+one holds, the span of time they cover, and a summary of their score events.
+
+History is paged out when the live file is next saved, rather than as soon as
+it is closed, and the shards that changed are written just before the live
+file that refers to them, so a live file never refers to anything that hasn't
+been written yet; and anything in a shard beyond what the live file's
+manifest says it holds is ignored.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from gc import collect
+from heapq import merge
+from itertools import takewhile
+from json import dumps
+from math import inf
+from os import listdir, makedirs, remove, replace
+from os.path import exists, expanduser, join
+from re import compile as compileRegex
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    MutableSequence,
+    Sequence,
+    TypeVar,
+    cast,
+    overload,
+)
+from weakref import WeakValueDictionary, finalize, ref
+
+from .boundaries import ScoreEvent, UserInterfaceFactory
+from .debugger import debug
+from .intention import Intention
+from .intervals import AnyInterval, DurationCursor, Evaluation, Pomodoro
+from .nexus import Nexus
+from .observables import IgnoreChanges, ObservableList
+from .schema import SavedIntention, SavedIntentionID, SavedPomodoro
+from .sessions import Session
+from .snapshots import (
+    CorruptSnapshot,
+    Durability,
+    SnapshotFile,
+    loadChecksummed,
+    writeChecksummed,
+)
+from .storage import (
+    loadDefaultNexus,
+    loadDurations,
+    loadIntention,
+    loadInterval,
+    loadSession,
+    saveDurations,
+    saveIntention,
+    saveInterval,
+    saveSession,
+)
+
+T = TypeVar("T")
+
+defaultHistoryDirectory = expanduser("~/.local/share/pomodouroboros/history")
+
+
+def byMonth(timestamp: float) -> str:
+    """
+    Shard history by the calendar month, in local time, that it began in.
+    """
+    return datetime.fromtimestamp(timestamp).strftime("%Y-%m")
+
+
+def byWeek(timestamp: float) -> str:
+    """
+    Shard history by the ISO week, in local time, that it began in.
+    """
+    return datetime.fromtimestamp(timestamp).strftime("%G-W%V")
+
+
+_shardName = compileRegex(r"^.+-[0-9]+\.json$")
+
+_shardKeys = {
+    "intentions": ("ids", "intentions", "intentionEvents"),
+    "streaks": ("streaks", "streakEvents"),
+    "sessions": ("sessions",),
+}
+"""
+The lists in a shard's data that each kind of history is kept in, which all
+have an entry for each intention, streak, or session.
+"""
+
+
+@dataclass(frozen=True)
+class _PagedScore:
+    """
+    A score event for some paged-out history.  Where a query covers the whole
+    of a shard, this stands in for all of the shard's events at once, at the
+    time of its last one.
+    """
+
+    time: float
+    points: float
+
+
+@dataclass
+class _Shard:
+    """
+    The paged-out intentions, streaks and sessions from one month (or week),
+    kept in a file of their own, as listed in the manifest.
+    """
+
+    period: str
+    filename: str
+    ranges: dict[str, list[int]]
+    """
+    The positions of the intentions, streaks and sessions in this shard, as
+    C{[start, stop]}, keyed by kind.
+    """
+
+    firstID: int = 0
+    start: float = inf
+    end: float = -inf
+    """
+    The span of time that this shard's history covers.
+    """
+
+    points: float = 0
+    firstEvent: float = inf
+    lastEvent: float = -inf
+    firstStart: float = inf
+
+    def entries(self, data: dict[str, Any], key: str) -> list[Any]:
+        """
+        Get the entries for the history in this shard from one of the lists
+        in its data, leaving out any beyond it.
+        """
+        kind = next(kind for kind, keys in _shardKeys.items() if key in keys)
+        start, stop = self.ranges[kind]
+        return cast(list[Any], data[key][: stop - start])
+
+    def summarize(self, data: dict[str, Any]) -> None:
+        """
+        Summarize the score events for this shard's intentions and streaks,
+        saved as C{[time, points]} pairs, or, for streaks, C{[time, points,
+        intervalStart]}, along with the span of time it covers.
+        """
+        self.points = 0
+        self.firstEvent = self.firstStart = self.start = inf
+        self.lastEvent = self.end = -inf
+        for key in ["intentionEvents", "streakEvents"]:
+            for each in self.entries(data, key):
+                for time, points, *intervalStart in each or ():
+                    self.points += points
+                    self.firstEvent = min(self.firstEvent, time)
+                    self.lastEvent = max(self.lastEvent, time)
+                    if intervalStart:
+                        self.firstStart = min(
+                            self.firstStart, intervalStart[0]
+                        )
+        times = [
+            *(
+                time
+                for savedStreak in self.entries(data, "streaks")
+                for savedInterval in savedStreak
+                for time in (
+                    savedInterval["startTime"],
+                    savedInterval.get("endTime", savedInterval["startTime"]),
+                )
+            ),
+            *(
+                time
+                for savedSession in self.entries(data, "sessions")
+                for time in (savedSession["start"], savedSession["end"])
+            ),
+            *(
+                record[0]["created"]
+                for record in self.entries(data, "intentions")
+                if record is not None
+            ),
+        ]
+        if times:
+            self.start, self.end = min(times), max(times)
+
+
+@dataclass(eq=False, repr=False)
+class _PagedList(MutableSequence[T]):
+    """
+    Storage for an L{ObservableList} whose first C{paged} elements have been
+    paged out, and are read back in by C{load} whenever they're asked for.
+
+    Replacing one of those elements hands it to C{store}; any other change to
+    them pages the whole list back in with C{unpage} first.
+    """
+
+    load: Callable[[int], T]
+    store: Callable[[int, T], None]
+    unpage: Callable[[], None]
+    paged: int = 0
+    tail: list[T] = field(default_factory=list)
+
+    def __repr__(self) -> str:
+        return f"<{self.paged} paged out, then {self.tail!r}>"
+
+    def __len__(self) -> int:
+        return self.paged + len(self.tail)
+
+    def __iter__(self) -> Iterator[T]:
+        for index in range(self.paged):
+            yield self.load(index)
+        yield from self.tail
+
+    def _position(self, index: int) -> int:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        return index
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[T]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> T | list[T]:
+        if isinstance(index, slice):
+            return [self[each] for each in range(*index.indices(len(self)))]
+        index = self._position(index)
+        if index < self.paged:
+            return self.load(index)
+        return self.tail[index - self.paged]
+
+    @overload
+    def __setitem__(self, index: int, value: T) -> None:
+        ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[T]) -> None:
+        ...
+
+    def __setitem__(self, index: int | slice, value: T | Iterable[T]) -> None:
+        if isinstance(index, slice):
+            self.unpage()
+            self.tail[index] = value  # type:ignore[assignment]
+            return
+        index = self._position(index)
+        if index < self.paged:
+            self.store(index, value)  # type:ignore[arg-type]
+        else:
+            self.tail[index - self.paged] = value  # type:ignore[assignment]
+
+    @overload
+    def __delitem__(self, index: int) -> None:
+        ...
+
+    @overload
+    def __delitem__(self, index: slice) -> None:
+        ...
+
+    def __delitem__(self, index: int | slice) -> None:
+        if isinstance(index, int) and self._position(index) >= self.paged:
+            del self.tail[self._position(index) - self.paged]
+            return
+        self.unpage()
+        del self.tail[index]
+
+    def insert(self, index: int, value: T) -> None:
+        if index < 0:
+            index = max(index + len(self), 0)
+        if index >= self.paged:
+            self.tail.insert(index - self.paged, value)
+            return
+        self.unpage()
+        self.tail.insert(index, value)
+
+
+@dataclass
+class _PagedIntention:
+    """
+    What a L{HistoryPager} knows about an L{Intention} which has been paged
+    out, or some of whose pomodoros have, so that changes to it can be written
+    back to its shards.
+    """
+
+    position: int | None = None
+    """
+    The intention's position in its L{Nexus}, if it has ever been paged out.
+    """
+
+    paged: list[tuple[ref[Pomodoro], int, int, Evaluation | None]] = field(
+        default_factory=list
+    )
+    """
+    The intention's paged-out pomodoros, with the positions of their streaks
+    and their positions within them, and their evaluations as last written.
+    The pomodoros are held weakly, since they refer to the intention, which
+    its record mustn't keep alive.
+    """
+
+    def note(self, pomodoro: Pomodoro, streak: int, index: int) -> None:
+        """
+        Note that one of our intention's pomodoros has been written out as
+        part of a paged-out streak.
+        """
+        entry = (ref(pomodoro), streak, index, pomodoro.evaluation)
+        for position, (each, _, _, _) in enumerate(self.paged):
+            if each() is pomodoro:
+                self.paged[position] = entry
+                return
+        self.paged.append(entry)
+
+    def pomodoros(
+        self,
+    ) -> Iterator[tuple[Pomodoro, int, int, Evaluation | None]]:
+        """
+        The intention's paged-out pomodoros, as described by C{paged}.
+        """
+        for pomodoro, streak, index, written in self.paged:
+            if (each := pomodoro()) is not None:
+                yield each, streak, index, written
+
+
+@dataclass(eq=False)
+class HistoryPager:
+    """
+    Keeps the closed part of a L{Nexus}'s history in shard files in a
+    directory of its own, and only the live part of it in memory, and in the
+    live file alongside them.
+    """
+
+    directory: str
+    shardBy: Callable[[float], str] = byMonth
+    """
+    The period of time a shard covers: the name of the one that history
+    beginning at a given time belongs in.  Names must sort in time order.
+    """
+
+    cacheSize: int = 4
+    """
+    How many shards' worth of saved data to keep around after reading them,
+    since anything looking at one paged-out streak is likely to look at its
+    neighbours too.
+    """
+
+    durability: Durability = Durability.file
+    backups: int = 8
+    """
+    How many previous versions of the live file to keep; see
+    L{SnapshotFile.backups}.
+    """
+
+    nexus: Nexus | None = field(default=None, init=False)
+    _intentions: _PagedList[Intention] = field(init=False)
+    _streaks: _PagedList[ObservableList[AnyInterval]] = field(init=False)
+    _sessions: _PagedList[Session] = field(init=False)
+    _shards: list[_Shard] = field(default_factory=list)
+    _pinned: dict[int, Intention] = field(default_factory=dict)
+    """
+    Intentions which were still open when they were paged out, by position;
+    they are kept in the live file instead.
+    """
+
+    _live: WeakValueDictionary[tuple[str | int, ...], Any] = field(
+        default_factory=WeakValueDictionary
+    )
+    """
+    Everything in a shard that is still in use, keyed by C{("intention",
+    position)}, C{("streak", position)} or C{("interval", streakPosition,
+    positionInStreak)}, so that reading it back in again gives the same
+    object.
+    """
+
+    _paged: dict[int, _PagedIntention] = field(default_factory=dict)
+    """
+    What we know about each intention which has been paged out, or some of
+    whose pomodoros have, by identity, for as long as it exists.
+    """
+
+    _recent: OrderedDict[str, dict[str, Any]] = field(
+        default_factory=OrderedDict
+    )
+    _unfinished: dict[str, dict[str, Any]] = field(default_factory=dict)
+    """
+    The data for the shard that history is being paged out to, which hasn't
+    been finished yet.
+    """
+
+    _dirty: dict[str, dict[str, Any]] = field(default_factory=dict)
+    """
+    The data for shards that have changed since the live file was last
+    saved, which saving it writes out first.
+    """
+
+    _pending: bool = False
+    """
+    Whether a streak has been closed since history was last paged out, so
+    that the next save should page it out.
+    """
+
+    _discarded: list[str] = field(default_factory=list)
+    """
+    Shard files which are no longer needed, but which the live file on disk
+    may still refer to, until it is next saved.
+    """
+
+    _serial: int = 0
+    _snapshot: SnapshotFile = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._snapshot = SnapshotFile(
+            self.liveFile, self.durability, self.backups
+        )
+        self._intentions = _PagedList(
+            self._intention, self._storeIntention, self._unpage
+        )
+        self._streaks = _PagedList(
+            self._streak, self._storeStreak, self._unpage
+        )
+        self._sessions = _PagedList(
+            self._session, self._storeSession, self._unpage
+        )
+
+    @property
+    def liveFile(self) -> str:
+        """
+        The file holding the live part of our L{Nexus}, and the manifest of
+        our shards.
+        """
+        return join(self.directory, "live.json")
+
+    def attach(self, nexus: Nexus) -> None:
+        """
+        Start keeping the given L{Nexus}'s history in our directory, paging
+        out whatever of it is already closed, and replacing whatever history
+        was kept there before.
+        """
+        makedirs(self.directory, exist_ok=True)
+        for name in listdir(self.directory):
+            if _shardName.match(name):
+                self._discarded.append(join(self.directory, name))
+                serial = int(name[: -len(".json")].rsplit("-", 1)[1])
+                self._serial = max(self._serial, serial)
+        intentions = nexus._intentions
+        assert isinstance(intentions, ObservableList)
+        self._intentions.tail = list(intentions._storage)
+        intentions._storage = self._intentions
+        self._streaks.tail = list(nexus._streaks._storage)
+        nexus._streaks._storage = self._streaks
+        self._sessions.tail = list(nexus._sessions._storage)
+        nexus._sessions._storage = self._sessions
+        nexus._pagedHistory = self
+        self._hook(nexus)
+        self.pageOut()
+        # Almost all of the history has just been paged out, but intentions
+        # and their pomodoros refer to each other, so it won't be freed
+        # until it is collected.
+        collect()
+        self._shrinkLive()
+        self.save()
+
+    def load(self, userInterfaceFactory: UserInterfaceFactory) -> Nexus | None:
+        """
+        Load the L{Nexus} whose history is kept in our directory, reading
+        only the live file; the rest of its history is read in from its
+        shards as it is needed.
+
+        @return: the L{Nexus}, or C{None} if none has been saved here.
+        """
+        if not self._snapshot.exists():
+            return None
+        live = cast(dict[str, Any], self._snapshot.load())
+        self._serial = live["serial"]
+        self._shards = [_Shard(**each) for each in live["shards"]]
+        for kind, paged in self._kinds():
+            paged.paged = (
+                self._shards[-1].ranges[kind][1] if self._shards else 0
+            )
+
+        intentionIDMap: dict[SavedIntentionID, Intention] = {}
+        for position, savedIntention, refs, savedPomodoros in live["pinned"]:
+            intention = loadIntention(savedIntention)
+            record = self._record(intention)
+            record.position = position
+            for (streak, index), savedPomodoro in zip(refs, savedPomodoros):
+                pomodoro = loadInterval(
+                    savedPomodoro, {savedIntention["id"]: intention}
+                )
+                assert isinstance(pomodoro, Pomodoro)
+                intention.pomodoros.append(pomodoro)
+                self._live[("interval", streak, index)] = pomodoro
+                record.note(pomodoro, streak, index)
+            self._pinned[position] = intention
+            intentionIDMap[savedIntention["id"]] = intention
+        for savedIntention in live["intentions"]:
+            intention = loadIntention(savedIntention)
+            self._intentions.tail.append(intention)
+            intentionIDMap[savedIntention["id"]] = intention
+        for savedStreak in live["streaks"]:
+            streak = []
+            for savedInterval in savedStreak:
+                if (
+                    savedInterval["intervalType"] == "Pomodoro"
+                    and (intentionID := savedInterval["intentionID"])
+                    not in intentionIDMap
+                ):
+                    intentionIDMap[intentionID] = self._intentionWithID(
+                        intentionID
+                    )
+                interval = loadInterval(savedInterval, intentionIDMap)
+                if isinstance(interval, Pomodoro):
+                    interval.intention.pomodoros.append(interval)
+                streak.append(interval)
+            self._streaks.tail.append(ObservableList(IgnoreChanges, streak))
+        self._sessions.tail = [loadSession(each) for each in live["sessions"]]
+
+        nexus = Nexus(
+            _lastIntentionID=int(live["lastIntentionID"]),
+            _initialTime=live["initialTime"],
+            _intentions=ObservableList(IgnoreChanges, self._intentions),
+            _upcomingDurations=DurationCursor(
+                loadDurations(live["upcomingDurations"])
+            ),
+            _streaks=ObservableList(IgnoreChanges, self._streaks),
+            _sessions=ObservableList(IgnoreChanges, self._sessions),
+            _interfaceFactory=userInterfaceFactory,
+            _lastUpdateTime=live["lastUpdateTime"],
+            _pagedHistory=self,
+        )
+        self._hook(nexus)
+        return nexus
+
+    def save(self) -> None:
+        """
+        Save the live part of our L{Nexus}.
+        """
+        self.prepareSave()()
+
+    def prepareSave(self) -> Callable[[], None]:
+        """
+        Page out any streaks that have been closed since the last save, then
+        capture the shards that have changed since then, the live part of our
+        L{Nexus}, and the manifest of our shards.
+
+        @return: a function that writes the shards, then the live file that
+            refers to them, which may be run on another thread.
+        """
+        if self._pending:
+            self.pageOut()
+        durability = self.durability
+        shards = [
+            (join(self.directory, filename), dumps(data))
+            for filename, data in self._dirty.items()
+        ]
+        self._dirty.clear()
+        text = dumps(self._liveJSON())
+        snapshot = self._snapshot
+        discarded, self._discarded = self._discarded, []
+
+        def write() -> None:
+            for filename, shardText in shards:
+                writeChecksummed(filename, shardText, durability)
+            snapshot.write(text)
+            for filename in discarded:
+                if exists(filename):
+                    remove(filename)
+
+        return write
+
+    def pageOut(self) -> None:
+        """
+        Page out closed streaks, the intentions made before the current
+        streak, and sessions from earlier months, each to the shard for the
+        month it began in.  Intentions which are still open are pinned in the
+        live file instead, until they are finished with.
+
+        Nothing is written until the next save, so this is done then, rather
+        than as each streak is closed.
+        """
+        nexus = self.nexus
+        assert nexus is not None
+        self._pending = False
+        # What was paged out last time has probably been collected by now.
+        self._shrinkLive()
+        shardBy = self.shardBy
+        streaks, intentions, sessions = (
+            self._streaks,
+            self._intentions,
+            self._sessions,
+        )
+        # Every streak but the last is closed.
+        closed = streaks.tail[:-1]
+        current = shardBy(nexus._lastUpdateTime)
+        over = list(
+            takewhile(
+                lambda session: shardBy(session.end) < current, sessions.tail
+            )
+        )
+        # Page everything out in time order, so that each shard gets its own
+        # month's worth of each kind of history; a streak goes before the
+        # intentions made in the same month, so that they can be paged out
+        # along with their pomodoros.
+        for period, order, index in merge(
+            (
+                (
+                    shardBy(
+                        streak[0].startTime
+                        if streak
+                        else nexus._lastUpdateTime
+                    ),
+                    0,
+                    index,
+                )
+                for index, streak in enumerate(closed)
+            ),
+            (
+                (shardBy(intention.created), 1, index)
+                for index, intention in enumerate(intentions.tail)
+            ),
+            (
+                (shardBy(session.start), 2, index)
+                for index, session in enumerate(over)
+            ),
+        ):
+            if order == 0:
+                self._pageOutStreak(
+                    period, streaks.paged + index, closed[index]
+                )
+            elif order == 1:
+                self._pageOutIntention(
+                    period, intentions.paged + index, intentions.tail[index]
+                )
+            else:
+                self._pageOut("sessions", period, saveSession(over[index]))
+        counts: list[tuple[_PagedList[Any], int]] = [
+            (streaks, len(closed)),
+            (intentions, len(intentions.tail)),
+            (sessions, len(over)),
+        ]
+        for paged, count in counts:
+            del paged.tail[:count]
+            paged.paged += count
+
+        self._finishShard()
+        for position, intention in sorted(self._pinned.items()):
+            if self._pageable(intention):
+                self._storeIntention(position, intention)
+        nexus._historyReplaced()
+
+    def residentIntentions(self, count: int) -> Iterable[int]:
+        yield from sorted(
+            position for position in self._pinned if position < count
+        )
+        yield from range(self._intentions.paged, count)
+
+    def residentStreaks(self, count: int) -> Iterable[int]:
+        return range(self._streaks.paged, count)
+
+    def residentSessions(self, count: int) -> Iterable[int]:
+        return range(self._sessions.paged, count)
+
+    def pagedScoreEvents(
+        self, startTime: float, endTime: float
+    ) -> Iterable[ScoreEvent]:
+        found = []
+        for shard in self._shards:
+            if shard.lastEvent < startTime or shard.firstEvent > endTime:
+                continue
+            if (
+                startTime <= shard.firstEvent
+                and shard.lastEvent <= endTime
+                and shard.firstStart > startTime
+            ):
+                found.append(_PagedScore(shard.lastEvent, shard.points))
+                continue
+            # As with L{ScoreIndex.events}, events produced by intervals only
+            # count if the interval itself began after the start time.
+            data = self._read(shard)
+            for key in ["intentionEvents", "streakEvents"]:
+                for each in shard.entries(data, key):
+                    for time, points, *intervalStart in each or ():
+                        if startTime <= time <= endTime and all(
+                            start > startTime for start in intervalStart
+                        ):
+                            found.append(_PagedScore(time, points))
+        found.sort(key=lambda event: event.time)
+        return found
+
+    def _kinds(self) -> Iterable[tuple[str, _PagedList[Any]]]:
+        yield "intentions", self._intentions
+        yield "streaks", self._streaks
+        yield "sessions", self._sessions
+
+    def _hook(self, nexus: Nexus) -> None:
+        self.nexus = nexus
+        nexus.addHistoryObserver(self)
+        for key, value in list(self._live.items()):
+            if key[0] == "intention":
+                # Read in before there was a nexus to observe it.
+                nexus.observeIntention(value)
+
+    def intentionAppended(self, position: int, intention: Intention) -> None:
+        pass
+
+    def intentionChanged(self, intention: Intention, key: str) -> None:
+        if (record := self._paged.get(id(intention))) is not None:
+            self._intentionChanged(intention, record, key)
+
+    def streakAppended(
+        self, position: int, streak: Sequence[AnyInterval]
+    ) -> None:
+        self._pending = True
+
+    def intervalAppended(self, interval: AnyInterval) -> None:
+        pass
+
+    def sessionsChanged(self) -> None:
+        pass
+
+    def historyReplaced(self) -> None:
+        pass
+
+    def _record(self, intention: Intention) -> _PagedIntention:
+        """
+        Get the record of the given intention, making one if it has none.
+        """
+        if (record := self._paged.get(id(intention))) is None:
+            record = self._paged[id(intention)] = _PagedIntention()
+            finalize(intention, self._paged.__delitem__, id(intention))
+        return record
+
+    def _liveJSON(self) -> dict[str, Any]:
+        nexus = self.nexus
+        assert nexus is not None
+        pinned = []
+        for position, intention in sorted(self._pinned.items()):
+            record = self._paged.get(id(intention))
+            paged = [] if record is None else list(record.pomodoros())
+            pinned.append(
+                [
+                    position,
+                    saveIntention(intention),
+                    [[streak, index] for _, streak, index, _ in paged],
+                    [saveInterval(pomodoro) for pomodoro, _, _, _ in paged],
+                ]
+            )
+        return {
+            "initialTime": nexus._initialTime,
+            "lastIntentionID": str(nexus._lastIntentionID),
+            "lastUpdateTime": nexus._lastUpdateTime,
+            "upcomingDurations": saveDurations(
+                nexus._upcomingDurations.remaining
+            ),
+            "serial": self._serial,
+            "shards": [asdict(shard) for shard in self._shards],
+            "pinned": pinned,
+            "intentions": [
+                saveIntention(intention) for intention in self._intentions.tail
+            ],
+            "streaks": [
+                [saveInterval(interval) for interval in streak]
+                for streak in self._streaks.tail
+            ],
+            "sessions": [saveSession(each) for each in self._sessions.tail],
+        }
+
+    def _pageOut(self, kind: str, period: str, *entries: Any) -> _Shard:
+        """
+        Page out the next intention, streak, or session, saved as the given
+        entries for its shard's lists, to the shard for the given period.
+
+        @return: the shard.
+        """
+        shards = self._shards
+        if not shards or period > shards[-1].period:
+            # Anything later is paged out after this, so the previous shard
+            # is finished.
+            self._finishShard()
+            stops = {
+                each: shards[-1].ranges[each][1] if shards else 0
+                for each in _shardKeys
+            }
+            self._serial += 1
+            shard = _Shard(
+                period,
+                f"{period}-{self._serial}.json",
+                {each: [stop, stop] for each, stop in stops.items()},
+            )
+            shards.append(shard)
+            data: dict[str, Any] = {
+                key: [] for keys in _shardKeys.values() for key in keys
+            }
+        else:
+            # Earlier history is kept in the latest shard along with the rest,
+            # so that each kind of history is in order from one shard to the
+            # next.
+            shard = shards[-1]
+            data = self._read(shard)
+        self._unfinished[shard.filename] = data
+        start, stop = shard.ranges[kind]
+        for key, entry in zip(_shardKeys[kind], entries):
+            # Drop anything left beyond the shard from before a crash.
+            del data[key][stop - start :]
+            data[key].append(entry)
+        shard.ranges[kind][1] = stop + 1
+        return shard
+
+    def _pageOutStreak(
+        self, period: str, position: int, streak: ObservableList[AnyInterval]
+    ) -> None:
+        self._pageOut(
+            "streaks",
+            period,
+            [saveInterval(interval) for interval in streak],
+            self._streakEvents(streak),
+        )
+        self._registerStreak(position, streak)
+
+    def _pageOutIntention(
+        self, period: str, position: int, intention: Intention
+    ) -> None:
+        record, events = self._intentionRecord(position, intention)
+        if record is None:
+            self._pinned[position] = intention
+        else:
+            self._live[("intention", position)] = intention
+        shard = self._pageOut(
+            "intentions", period, intention.id, record, events
+        )
+        if shard.ranges["intentions"][0] == position:
+            shard.firstID = intention.id
+
+    def _finishShard(self) -> None:
+        for shard in self._shards[-1:]:
+            if (
+                data := self._unfinished.pop(shard.filename, None)
+            ) is not None:
+                self._write(shard, data)
+
+    def _pageable(self, intention: Intention) -> bool:
+        """
+        Can the given intention be paged out?  Only if it's finished with, and
+        all of its pomodoros have been paged out already.
+        """
+        if not (intention.completed or intention.abandoned):
+            return False
+        record = self._paged.get(id(intention))
+        pagedPomodoros = 0 if record is None else len(record.paged)
+        return pagedPomodoros == len(intention.pomodoros)
+
+    def _intentionRecord(
+        self, position: int, intention: Intention
+    ) -> tuple[list[Any] | None, list[list[float]] | None]:
+        """
+        The saved form of a paged-out intention, and its score events, or
+        C{None} for both if it has to stay in memory.
+        """
+        if not self._pageable(intention):
+            return None, None
+        record = self._record(intention)
+        record.position = position
+        refs = [[streak, index] for _, streak, index, _ in record.paged]
+        return [saveIntention(intention), refs], [
+            [event.time, event.points]
+            for event in intention.intentionScoreEvents(position)
+        ]
+
+    def _registerStreak(
+        self, position: int, streak: ObservableList[AnyInterval]
+    ) -> None:
+        self._live[("streak", position)] = streak
+        for index, interval in enumerate(streak):
+            self._live[("interval", position, index)] = interval
+            if isinstance(interval, Pomodoro):
+                self._record(interval.intention).note(
+                    interval, position, index
+                )
+
+    @staticmethod
+    def _streakEvents(
+        streak: ObservableList[AnyInterval],
+    ) -> list[list[float]]:
+        return [
+            [event.time, event.points, interval.startTime]
+            for interval in streak
+            for event in interval.scoreEvents()
+        ]
+
+    def _intention(self, position: int) -> Intention:
+        """
+        Get the paged-out intention at the given position, reading it back in
+        if nothing is using it.
+        """
+        if (pinned := self._pinned.get(position)) is not None:
+            return pinned
+        if (live := self._live.get(("intention", position))) is not None:
+            return cast(Intention, live)
+        shard = self._shard("intentions", position)
+        savedIntention: SavedIntention
+        savedIntention, refs = self._read(shard)["intentions"][
+            position - shard.ranges["intentions"][0]
+        ]
+        intention = loadIntention(savedIntention)
+        self._live[("intention", position)] = intention
+        record = self._record(intention)
+        record.position = position
+        if self.nexus is not None:
+            self.nexus.observeIntention(intention)
+        for streak, index in refs:
+            key = ("interval", streak, index)
+            if (pomodoro := self._live.get(key)) is None:
+                pomodoro = loadInterval(
+                    self._savedStreak(streak)[index],
+                    {savedIntention["id"]: intention},
+                )
+                self._live[key] = pomodoro
+            assert isinstance(pomodoro, Pomodoro)
+            intention.pomodoros.append(pomodoro)
+            record.note(pomodoro, streak, index)
+        return intention
+
+    def _intentionWithID(self, intentionID: SavedIntentionID) -> Intention:
+        """
+        Get the paged-out intention with the given ID.
+        """
+        wanted = int(intentionID)
+        shards = [
+            shard
+            for shard in self._shards
+            if shard.ranges["intentions"][0] < shard.ranges["intentions"][1]
+        ]
+        shard = shards[
+            bisect_right(shards, wanted, key=lambda each: each.firstID) - 1
+        ]
+        ids = shard.entries(self._read(shard), "ids")
+        return self._intention(
+            shard.ranges["intentions"][0] + bisect_left(ids, wanted)
+        )
+
+    def _streak(self, position: int) -> ObservableList[AnyInterval]:
+        """
+        Get the paged-out streak at the given position, reading it back in if
+        nothing is using it.
+        """
+        if (live := self._live.get(("streak", position))) is not None:
+            return cast(ObservableList[AnyInterval], live)
+        intervals = []
+        for index, savedInterval in enumerate(self._savedStreak(position)):
+            key = ("interval", position, index)
+            if (interval := self._live.get(key)) is None:
+                if savedInterval["intervalType"] == "Pomodoro":
+                    # Reading in its intention reads in all of its pomodoros.
+                    intention = self._intentionWithID(
+                        cast(SavedPomodoro, savedInterval)["intentionID"]
+                    )
+                    interval = self._live[key]
+                    assert interval.intention is intention
+                else:
+                    interval = loadInterval(savedInterval, {})
+                    self._live[key] = interval
+            intervals.append(interval)
+        streak = ObservableList(IgnoreChanges, intervals)
+        self._live[("streak", position)] = streak
+        return streak
+
+    def _savedStreak(self, position: int) -> list[Any]:
+        shard = self._shard("streaks", position)
+        return cast(
+            list[Any],
+            self._read(shard)["streaks"][
+                position - shard.ranges["streaks"][0]
+            ],
+        )
+
+    def _session(self, position: int) -> Session:
+        """
+        Get the paged-out session at the given position.
+        """
+        shard = self._shard("sessions", position)
+        return loadSession(
+            self._read(shard)["sessions"][
+                position - shard.ranges["sessions"][0]
+            ]
+        )
+
+    def _storeIntention(self, position: int, intention: Intention) -> None:
+        """
+        Replace the paged-out intention at the given position.
+        """
+        shard = self._shard("intentions", position)
+        data = self._read(shard)
+        offset = position - shard.ranges["intentions"][0]
+        record, events = self._intentionRecord(position, intention)
+        data["intentionEvents"][offset] = events
+        if record is None:
+            # Leave its last record where it is, for an older live file which
+            # doesn't have it pinned; pinning it takes precedence.
+            self._pinned[position] = intention
+            self._live.pop(("intention", position), None)
+        else:
+            data["intentions"][offset] = record
+            self._pinned.pop(position, None)
+            self._live[("intention", position)] = intention
+        self._write(shard, data)
+
+    def _storeStreak(
+        self, position: int, streak: ObservableList[AnyInterval]
+    ) -> None:
+        """
+        Replace the paged-out streak at the given position.
+        """
+        shard = self._shard("streaks", position)
+        data = self._read(shard)
+        offset = position - shard.ranges["streaks"][0]
+        data["streaks"][offset] = [
+            saveInterval(interval) for interval in streak
+        ]
+        data["streakEvents"][offset] = self._streakEvents(streak)
+        self._registerStreak(position, streak)
+        self._write(shard, data)
+
+    def _storeSession(self, position: int, session: Session) -> None:
+        """
+        Replace the paged-out session at the given position.
+        """
+        shard = self._shard("sessions", position)
+        data = self._read(shard)
+        data["sessions"][position - shard.ranges["sessions"][0]] = saveSession(
+            session
+        )
+        self._write(shard, data)
+
+    def _intentionChanged(
+        self, intention: Intention, record: _PagedIntention, key: str
+    ) -> None:
+        """
+        An intention that has been paged out, or some of whose pomodoros
+        have, has changed.  Replacing the changed parts of our L{Nexus}'s
+        history with themselves writes them back to their shards, and lets
+        the L{Nexus}, and anything else observing its history, know that they
+        changed.
+        """
+        nexus = self.nexus
+        assert nexus is not None
+        if key == "pomodoros":
+            # One of its pomodoros may have been evaluated.
+            for pomodoro, streak, _, written in record.pomodoros():
+                if pomodoro.evaluation != written:
+                    nexus._streaks[streak] = self._streak(streak)
+        if (position := record.position) is None:
+            # It has never been paged out, so anything else observing our
+            # history has been observing it all along.
+            return
+        intentions = nexus._intentions
+        if (
+            position >= len(intentions)
+            or intentions[position] is not intention
+        ):
+            # Our history has been renumbered since it was paged back in.
+            for position in reversed(range(len(intentions))):
+                if intentions[position] is intention:
+                    break
+            else:
+                return
+            record.position = position
+        intentions[position] = intention
+
+    def _unpage(self) -> None:
+        """
+        Read everything back in, for a change to the history that would
+        renumber what has been paged out.  It stays in the live file until
+        it is paged out again.
+        """
+        debug("reading in all paged-out history")
+        everything = {kind: list(paged) for kind, paged in self._kinds()}
+        for intention in everything["intentions"]:
+            if (record := self._paged.get(id(intention))) is not None:
+                # Keep the record, so that changes to an intention that was
+                # paged in are still noticed.
+                record.paged.clear()
+        for kind, paged in self._kinds():
+            paged.tail, paged.paged = everything[kind], 0
+        self._discarded.extend(
+            join(self.directory, shard.filename) for shard in self._shards
+        )
+        self._shards.clear()
+        self._pinned.clear()
+        self._live.clear()
+        self._recent.clear()
+        self._unfinished.clear()
+        self._dirty.clear()
+
+    def _shrinkLive(self) -> None:
+        # A dictionary doesn't give back the room taken by entries that have
+        # been removed from it.
+        self._live = WeakValueDictionary(self._live)
+
+    def _shard(self, kind: str, position: int) -> _Shard:
+        shards = self._shards
+        return shards[
+            bisect_right(
+                shards, position, key=lambda each: each.ranges[kind][1]
+            )
+        ]
+
+    def _read(self, shard: _Shard) -> dict[str, Any]:
+        if (data := self._unfinished.get(shard.filename)) is not None:
+            return data
+        if (data := self._dirty.get(shard.filename)) is not None:
+            return data
+        recent = self._recent
+        if (data := recent.get(shard.filename)) is None:
+            data = cast(
+                dict[str, Any],
+                loadChecksummed(join(self.directory, shard.filename)),
+            )
+        self._remember(shard, data)
+        return data
+
+    def _write(self, shard: _Shard, data: dict[str, Any]) -> None:
+        shard.summarize(data)
+        self._dirty[shard.filename] = data
+        self._remember(shard, data)
+
+    def _remember(self, shard: _Shard, data: dict[str, Any]) -> None:
+        recent = self._recent
+        recent[shard.filename] = data
+        recent.move_to_end(shard.filename)
+        while len(recent) > self.cacheSize:
+            recent.popitem(last=False)
+
+
+def _setAside(path: str) -> str:
+    """
+    Move the given file or directory aside, to a name that isn't taken yet.
+
+    @return: the new name.
+    """
+    aside = path + ".corrupt"
+    count = 1
+    while exists(aside):
+        count += 1
+        aside = f"{path}.corrupt-{count}"
+    replace(path, aside)
+    return aside
+
+
+def loadDefaultHistory(
+    currentTime: float,
+    userInterfaceFactory: UserInterfaceFactory,
+    directory: str = defaultHistoryDirectory,
+) -> HistoryPager:
+    """
+    Load the default nexus from the shards in C{directory}, moving it there
+    from the single file that earlier versions kept it in if need be.
+
+    If the live file is damaged, the newest intact version of it is recovered
+    from its backups, along with the shards that it refers to.  If there is
+    no intact version at all, the damaged history is set aside where it can
+    be looked at later, and the user is told that it is starting over, rather
+    than being given the stale history in the single file.
+
+    @return: the L{HistoryPager} keeping the loaded nexus's history, which
+        should be used to save it.
+    """
+    pager = HistoryPager(directory)
+    try:
+        nexus = pager.load(userInterfaceFactory)
+    except CorruptSnapshot:
+        aside = _setAside(directory)
+        debug("no intact live file; set", directory, "aside as", aside)
+        pager = HistoryPager(directory)
+        nexus = Nexus(currentTime, userInterfaceFactory, 0)
+        pager.attach(nexus)
+        nexus.userInterface.describeCurrentState(
+            "Your history could not be read, so it has been moved to "
+            f"{aside}, and a new one has been started."
+        )
+        return pager
+    if nexus is None:
+        pager.attach(loadDefaultNexus(currentTime, userInterfaceFactory))
+    else:
+        nexus.advanceToTime(currentTime)
+    return pager
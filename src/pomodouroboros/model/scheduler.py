@@ -0,0 +1,95 @@
+# -*- test-case-name: pomodouroboros.model.test.test_scheduler -*-
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+from twisted.internet.interfaces import IDelayedCall, IReactorTime
+
+from .boundaries import ActionListener
+from .debugger import debug
+from .nexus import Nexus
+
+
+@dataclass
+class AdvanceScheduler(ActionListener):
+    """
+    Keep a L{Nexus} up to date with the passage of time, by advancing it at
+    the moments when its state can change rather than polling it.
+
+    A single timer is armed for the L{Nexus}'s next event time.  As an
+    L{ActionListener}, the scheduler also brings the L{Nexus} up to date before
+    each of the user's actions (since it may not have been advanced for a
+    while), and re-arms the timer afterwards.
+    """
+
+    nexus: Nexus
+    reactor: IReactorTime
+    progressInterval: float | None = 3.0
+    """
+    While an interval is running, also advance this often (in seconds) so that
+    the UI can show its progress, or C{None} to only advance when the state of
+    the L{Nexus} changes.
+    """
+    _pending: IDelayedCall | None = field(default=None, init=False)
+
+    def start(self) -> None:
+        """
+        Advance the L{Nexus} to the current time, and keep advancing it until
+        L{AdvanceScheduler.stop} is called.
+        """
+        self.nexus.addActionListener(self)
+        self.advance()
+
+    def stop(self) -> None:
+        """
+        Stop advancing the L{Nexus}.
+        """
+        self.nexus.removeActionListener(self)
+        self._cancel()
+
+    def advance(self) -> None:
+        """
+        Advance the L{Nexus} to the current time, then arm the timer for the
+        next time it will need advancing.
+        """
+        self._cancel()
+        self.nexus.advanceToTime(self.reactor.seconds())
+        self.rearm()
+
+    def rearm(self) -> None:
+        """
+        Arm the timer for the next time that the L{Nexus} will need advancing,
+        replacing any timer that is already armed.
+        """
+        self._cancel()
+        now = self.reactor.seconds()
+        when = self.nexus.nextEventTime()
+        if (
+            self.progressInterval is not None
+            and self.nexus._activeInterval is not None
+        ):
+            progressTime = now + self.progressInterval
+            when = progressTime if when is None else min(when, progressTime)
+        debug("next advance at", when)
+        if when is not None:
+            self._pending = self.reactor.callLater(
+                max(0.0, when - now), self.advance
+            )
+
+    def beforeAction(self) -> None:
+        """
+        Bring the L{Nexus} up to date before the user changes it.
+        """
+        self._cancel()
+        self.nexus.advanceToTime(self.reactor.seconds())
+
+    def afterAction(self) -> None:
+        """
+        The user changed the L{Nexus}; re-arm the timer.
+        """
+        self.rearm()
+
+    def _cancel(self) -> None:
+        if self._pending is not None and self._pending.active():
+            self._pending.cancel()
+        self._pending = None
@@ -0,0 +1,157 @@
+# -*- test-case-name: pomodouroboros.model.test.test_model -*-
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import dataclass, field
+from functools import partial
+from math import inf
+from typing import Callable, Iterable, Iterator
+
+from .boundaries import ScoreEvent
+from .intention import Intention
+from .intervals import AnyInterval
+
+_Entry = tuple[float, int, ScoreEvent, "float | None"]
+"""
+An entry in a L{ScoreIndex}: the time of the event, a serial number to keep
+entries unique (so that comparisons between entries never reach the event),
+the event itself, and the start time of the interval which produced it (or
+C{None}, if it was produced by an intention).
+"""
+
+
+@dataclass
+class _Source:
+    """
+    Something that produces score events, and the keys of the entries that it
+    has produced.
+    """
+
+    source: Intention | AnyInterval
+    keys: list[tuple[float, int]]
+    intentionIndex: int | None
+
+
+@dataclass
+class ScoreIndex:
+    """
+    A time-ordered index of all the L{ScoreEvent}s produced by a collection of
+    intentions and intervals, so that the events in a time range can be found
+    without walking the whole history.
+
+    Each intention and interval is tracked as a separate source of events, so
+    that when one of them changes, its events can be replaced in the index.
+    """
+
+    _entries: list[_Entry] = field(default_factory=list)
+    _sources: dict[int, _Source] = field(default_factory=dict)
+    _serial: int = 0
+
+    @classmethod
+    def build(
+        cls,
+        intentions: Iterable[tuple[int, Intention]],
+        streaks: Iterable[Iterable[AnyInterval]],
+    ) -> ScoreIndex:
+        """
+        Build a new L{ScoreIndex} from intentions, paired with their positions
+        in the L{Nexus}'s list of intentions, and a list of streaks.
+        """
+        self = cls()
+        for intentionIndex, intention in intentions:
+            self._track(
+                intention,
+                intention.intentionScoreEvents(intentionIndex),
+                None,
+                intentionIndex,
+                self._entries.append,
+            )
+        for streak in streaks:
+            for interval in streak:
+                self._track(
+                    interval,
+                    interval.scoreEvents(),
+                    interval.startTime,
+                    None,
+                    self._entries.append,
+                )
+        self._entries.sort()
+        return self
+
+    def _track(
+        self,
+        source: Intention | AnyInterval,
+        events: Iterable[ScoreEvent],
+        intervalStart: float | None,
+        intentionIndex: int | None,
+        insert: Callable[[_Entry], None],
+    ) -> None:
+        keys = []
+        for event in events:
+            key = (event.time, self._serial)
+            self._serial += 1
+            keys.append(key)
+            insert((*key, event, intervalStart))
+        self._sources[id(source)] = _Source(source, keys, intentionIndex)
+
+    def _untrack(self, source: Intention | AnyInterval) -> _Source | None:
+        tracked = self._sources.pop(id(source), None)
+        if tracked is not None:
+            for key in tracked.keys:
+                del self._entries[bisect_left(self._entries, key)]
+        return tracked
+
+    def addIntention(self, intentionIndex: int, intention: Intention) -> None:
+        """
+        Index the events for an intention at the given index in the
+        L{Nexus}'s list of intentions.
+        """
+        self._untrack(intention)
+        self._track(
+            intention,
+            intention.intentionScoreEvents(intentionIndex),
+            None,
+            intentionIndex,
+            partial(insort, self._entries),
+        )
+
+    def addInterval(self, interval: AnyInterval) -> None:
+        """
+        Index the events for an interval.
+        """
+        self._untrack(interval)
+        self._track(
+            interval,
+            interval.scoreEvents(),
+            interval.startTime,
+            None,
+            partial(insort, self._entries),
+        )
+
+    def refresh(self, source: Intention | AnyInterval) -> None:
+        """
+        An intention or interval already in this index has changed in a way
+        that might affect its score events; re-index it.
+        """
+        tracked = self._sources.get(id(source))
+        if tracked is None:
+            return
+        if tracked.intentionIndex is not None:
+            assert isinstance(source, Intention)
+            self.addIntention(tracked.intentionIndex, source)
+        else:
+            assert not isinstance(source, Intention)
+            self.addInterval(source)
+
+    def events(self, startTime: float, endTime: float) -> Iterator[ScoreEvent]:
+        """
+        Yield all events between C{startTime} and C{endTime}, inclusive, in
+        time order.  Events produced by intervals are only included if the
+        interval itself began after C{startTime}.
+        """
+        entries = self._entries
+        first = bisect_left(entries, (startTime,))
+        last = bisect_right(entries, (endTime, inf))
+        for _, _, event, intervalStart in entries[first:last]:
+            if intervalStart is None or intervalStart > startTime:
+                yield event
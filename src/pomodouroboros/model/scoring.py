@@ -13,6 +13,35 @@ if TYPE_CHECKING:
 _is_score_event: type[ScoreEvent]
 
 
+def intentionCreatedPoints(intentionIndex: int) -> int:
+    """
+    Creating intentions is good, but there are diminishing returns.  The first
+    3 intentions will give you 3 points each, the next 3 will give you 2
+    points, and the next 3 will give you 1 point each.  Every intention after
+    the 9th one is worth 0 points.
+    """
+    # >>> [max(0, 3-(x//3)) for x in range(15)]
+    # [3, 3, 3, 2, 2, 2, 1, 1, 1, 0, 0, 0, 0, 0, 0]
+    return max(0, 3 - (intentionIndex // 3))
+
+
+def intentionCompletedPoints(pomodoroCount: int) -> int:
+    """
+    When an intention is completed, the user is given 10 points.  This can be
+    given two additional bonuses: if it took more than 1 pomodoro to finish, 1
+    additional point per pomodoro will be granted, up to 5 pomodoros.
+    """
+    return 10 + min(5, pomodoroCount - 1)
+
+
+def intentionSetPoints(streakLength: int) -> float:
+    """
+    Setting an intention yields 1 point, doubled for each pomodoro before it in
+    the current streak.
+    """
+    return int(2**streakLength)
+
+
 @dataclass
 class IntentionCreatedEvent:
     """
@@ -29,14 +58,9 @@ class IntentionCreatedEvent:
     @property
     def points(self) -> int:
         """
-        Creating intentions is good, but there are diminishing returns.  The
-        first 3 intentions will give you 3 points each, the next 3 will give
-        you 2 points, and the next 3 will give you 1 point each.  Every
-        intention after the 9th one is worth 0 points.
+        See L{intentionCreatedPoints}.
         """
-        # >>> [max(0, 3-(x//3)) for x in range(15)]
-        # [3, 3, 3, 2, 2, 2, 1, 1, 1, 0, 0, 0, 0, 0, 0]
-        return max(0, 3 - (self.intentionIndex // 3))
+        return intentionCreatedPoints(self.intentionIndex)
 
 
 _is_score_event = IntentionCreatedEvent
@@ -55,13 +79,9 @@ class IntentionCompleted:
     @property
     def points(self) -> int:
         """
-        When an intention is completed, the user is given 10 points.  This can
-        be given two additional bonuses: if it took more than 1 pomodoro to
-        finish, 1 additional point per pomodoro will be granted, up to 5 pomodoros.
+        See L{intentionCompletedPoints}.
         """
-        score = 10
-        score += min(5, (len(self.intention.pomodoros) - 1))
-        return score
+        return intentionCompletedPoints(len(self.intention.pomodoros))
 
 
 _is_score_event = IntentionCompleted
@@ -110,7 +130,7 @@ class EstimationAccuracy:
         timeOfEvaluation = self.time
         allEstimateScores: list[int] = []
         for estimate, recencyCap in zip(
-            self.intention.estimates[-10::-1], range(10, 1, -1)
+            self.intention.estimates[:-11:-1], range(10, 0, -1)
         ):
             # Counting down from the most recent estimate to the 10th most
             # recent, we give progressively smaller caps to the estimate.
@@ -180,9 +200,9 @@ class IntentionSet:
     @property
     def points(self) -> float:
         """
-        Setting an intention yields 1 point.
+        See L{intentionSetPoints}.
         """
-        return int(2**self.streakLength)
+        return intentionSetPoints(self.streakLength)
 
 
 _is_score_event = IntentionSet
@@ -1,7 +1,13 @@
 # -*- test-case-name: pomodouroboros.model.test.test_sessions -*-
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import IntEnum
+from itertools import accumulate
+from math import inf
+from typing import Iterable
 from zoneinfo import ZoneInfo
 
 from datetype import DateTime, Time
@@ -30,6 +36,85 @@ class Session:
     automatic: bool
 
 
+@dataclass(frozen=True)
+class SessionIndex:
+    """
+    A sorted collection of L{Session}s, indexed so that the session in effect
+    at any given time can be found in logarithmic time, even when sessions
+    overlap.
+    """
+
+    sessions: list[Session]
+    starts: list[float]
+    maxEnds: list[float]
+    """
+    The latest end time of each session, or of any session before it.
+    """
+    boundaries: list[float]
+    """
+    Every distinct start and end time, in order.
+    """
+
+    @classmethod
+    def build(cls, sessions: Iterable[Session]) -> SessionIndex:
+        """
+        Index some sessions.
+        """
+        ordered = sorted(sessions)
+        return cls(
+            ordered,
+            [each.start for each in ordered],
+            list(accumulate((each.end for each in ordered), max)),
+            sorted(
+                {edge for each in ordered for edge in (each.start, each.end)}
+            ),
+        )
+
+    def sessionAt(
+        self, timestamp: float
+    ) -> tuple[Session | None, float, float]:
+        """
+        Find the earliest-starting session in effect at C{timestamp}.
+
+        @return: a 3-tuple of the session (or C{None}), and the start and end
+            of the span of time around C{timestamp} over which the answer
+            stays the same; it includes its start but not its end.
+        """
+        started = bisect_right(self.starts, timestamp)
+        # Since maxEnds is sorted, this is the first session that ends after
+        # the timestamp; if it started by then, nothing before it could have.
+        first = bisect_right(self.maxEnds, timestamp)
+        session = self.sessions[first] if first < started else None
+        edge = bisect_right(self.boundaries, timestamp)
+        return (
+            session,
+            self.boundaries[edge - 1] if edge else -inf,
+            self.boundaries[edge] if edge < len(self.boundaries) else inf,
+        )
+
+    def overlapping(
+        self, start: float, end: float, *, touching: bool = False
+    ) -> list[Session]:
+        """
+        Find all the sessions which overlap the span of time from C{start} to
+        C{end}, in order.
+
+        @param touching: If true, also include sessions which merely touch it,
+            ending at C{start} or starting at C{end}.
+        """
+        if touching:
+            first = bisect_left(self.maxEnds, start)
+            last = bisect_right(self.starts, end)
+        else:
+            first = bisect_right(self.maxEnds, start)
+            last = bisect_left(self.starts, end)
+        return [
+            each
+            for each in self.sessions[first:last]
+            if each.end > start or (touching and each.end == start)
+        ]
+
+
 @dataclass
 class DailySessionRule:
     dailyStart: Time[ZoneInfo]
@@ -0,0 +1,115 @@
+# -*- test-case-name: pomodouroboros.model.test.test_model -*-
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import (
+    Iterable,
+    Iterator,
+    MutableSequence,
+    Sequence,
+    TypeVar,
+    overload,
+)
+
+V = TypeVar("V")
+
+
+@dataclass(eq=False, repr=False)
+class SharedPrefixList(MutableSequence[V]):
+    """
+    A list which begins with the first C{length} elements of some other
+    sequence, without copying them.
+
+    Appending to a L{SharedPrefixList} never touches the shared sequence, and
+    replacing an individual element in the shared prefix is recorded as an
+    override; any other change copies the prefix first.  So as long as the
+    shared sequence itself is only ever appended to, this behaves as an
+    independent copy of it, at a cost proportional to the number of changes
+    rather than the length of the sequence.
+    """
+
+    _base: Sequence[V]
+    _length: int
+    _overrides: dict[int, V] = field(default_factory=dict)
+    _tail: list[V] = field(default_factory=list)
+
+    @classmethod
+    def of(cls, base: Sequence[V]) -> SharedPrefixList[V]:
+        """
+        Create a L{SharedPrefixList} sharing all of C{base}.
+        """
+        return cls(base, len(base))
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+    def _materialize(self) -> None:
+        self._tail = list(self)
+        self._base = ()
+        self._length = 0
+        self._overrides = {}
+
+    def _prefixItem(self, index: int) -> V:
+        if index in self._overrides:
+            return self._overrides[index]
+        return self._base[index]
+
+    def __len__(self) -> int:
+        return self._length + len(self._tail)
+
+    def __iter__(self) -> Iterator[V]:
+        for index in range(self._length):
+            yield self._prefixItem(index)
+        yield from self._tail
+
+    @overload
+    def __getitem__(self, index: int) -> V:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> MutableSequence[V]:
+        ...
+
+    def __getitem__(self, index: int | slice) -> V | MutableSequence[V]:
+        if isinstance(index, slice):
+            return [self[each] for each in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list index out of range")
+        if index < self._length:
+            return self._prefixItem(index)
+        return self._tail[index - self._length]
+
+    @overload
+    def __setitem__(self, index: int, value: V) -> None:
+        ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[V]) -> None:
+        ...
+
+    def __setitem__(self, index: int | slice, value: V | Iterable[V]) -> None:
+        if isinstance(index, slice):
+            self._materialize()
+            self._tail[index] = value  # type:ignore[assignment]
+            return
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("list assignment index out of range")
+        if index < self._length:
+            self._overrides[index] = value  # type:ignore[assignment]
+        else:
+            self._tail[index - self._length] = value  # type:ignore[assignment]
+
+    def __delitem__(self, index: int | slice) -> None:
+        self._materialize()
+        del self._tail[index]
+
+    def insert(self, index: int, value: V) -> None:
+        if index >= len(self):
+            self._tail.append(value)
+            return
+        self._materialize()
+        self._tail.insert(index, value)
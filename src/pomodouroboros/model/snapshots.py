@@ -0,0 +1,496 @@
+# -*- test-case-name: pomodouroboros.model.test.test_snapshots -*-
+"""
+Writing snapshots of saved state so that a crash, or a full disk, can't leave
+the user with nothing to load.
+
+A snapshot is a JSON object with a CRC-32 checksum of its text appended as
+its last member, so that a truncated or corrupted file can be told apart
+from an intact one by reading it once, without decoding it.  Each is written
+to a temporary file which then replaces the old one, as durably as its
+L{Durability} asks for.
+
+A L{SnapshotFile} also keeps a bounded ring of its previous versions in a
+directory alongside it: every so often a whole copy, and in between, deltas
+from one version to the next, which, since saved history is mostly appended
+to, are small.  If the snapshot itself is found to be damaged, the newest
+intact version is rebuilt from the ring instead.
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from json import dumps, loads
+from os import (
+    O_RDONLY,
+    SEEK_END,
+    close,
+    fsync,
+    listdir,
+    makedirs,
+    open as openDescriptor,
+    remove,
+    replace,
+)
+from os.path import basename, dirname, exists, join
+from re import compile as compileRegex
+from shutil import copyfileobj
+from typing import IO, Any, Iterator, cast
+from zlib import crc32
+
+from .debugger import debug
+
+
+class Durability(Enum):
+    """
+    How sure to be that a file has reached the disk before carrying on.
+    """
+
+    none = "none"
+    """
+    Leave it to the operating system; a crash of the whole machine may lose
+    recent writes, or leave files empty.
+    """
+
+    file = "file"
+    """
+    Flush each file's contents to disk before it replaces the old one, so
+    that a file is always either its old contents or its new ones.
+    """
+
+    directory = "directory"
+    """
+    Also flush the directory once a file has been replaced, so that the
+    replacement itself is on disk too.
+    """
+
+
+class CorruptSnapshot(Exception):
+    """
+    A snapshot failed its checksum, and no intact version of it could be
+    found.
+    """
+
+
+def _syncDirectory(directory: str) -> None:
+    descriptor = openDescriptor(directory or ".", O_RDONLY)
+    try:
+        fsync(descriptor)
+    finally:
+        close(descriptor)
+
+
+def syncFile(file: IO[Any], durability: Durability) -> None:
+    """
+    Flush an open file's contents to disk, if the given durability calls for
+    it.
+    """
+    if durability is not Durability.none:
+        file.flush()
+        fsync(file.fileno())
+
+
+@contextmanager
+def replacingFile(
+    filename: str, mode: str = "w", durability: Durability = Durability.none
+) -> Iterator[IO[Any]]:
+    """
+    Open a temporary file to write the new contents of C{filename} to, and
+    replace C{filename} with it once they have all been written, as durably
+    as C{durability} asks for.
+    """
+    newp = join(dirname(filename), ".temporary-" + basename(filename) + ".new")
+    with open(newp, mode) as new:
+        yield new
+        syncFile(new, durability)
+    replace(newp, filename)
+    if durability is Durability.directory:
+        _syncDirectory(dirname(filename))
+
+
+_trailer = compileRegex(r'"checksum": "crc32:([0-9a-f]{8})"\}$')
+
+
+def _checksum(text: str) -> str:
+    return f"crc32:{crc32(text.encode('utf-8')):08x}"
+
+
+def checksummed(text: str) -> str:
+    """
+    Add a checksum of some JSON object's text as its last member.  It covers
+    all of the text before it.
+    """
+    assert text.endswith("}"), "only objects can be checksummed"
+    body = text[:-1]
+    body += "" if body.rstrip().endswith("{") else ", "
+    return body + f'"checksum": "{_checksum(body)}"}}'
+
+
+def verified(text: str) -> bool | None:
+    """
+    Does some checksummed JSON text match its checksum?
+
+    @return: C{None} if it has no checksum at all.
+    """
+    found = _trailer.search(text, max(len(text) - 64, 0))
+    if found is None:
+        return None
+    return _checksum(text[: found.start()]) == "crc32:" + found.group(1)
+
+
+def verifiedFile(filename: str, chunkSize: int = 1 << 20) -> bool | None:
+    """
+    Does a checksummed JSON file match its checksum?  It is read a chunk at a
+    time, so that its whole text is never held in memory.
+
+    @return: C{None} if it has no checksum at all.
+    """
+    with open(filename, "rb") as f:
+        size = f.seek(0, SEEK_END)
+        f.seek(max(size - 64, 0))
+        found = _trailer.search(f.read().decode("utf-8", "replace"))
+        if found is None:
+            return None
+        remaining = size - len(found.group(0))
+        f.seek(0)
+        crc = 0
+        while remaining > 0:
+            chunk = f.read(min(chunkSize, remaining))
+            if not chunk:
+                return False
+            crc = crc32(chunk, crc)
+            remaining -= len(chunk)
+    return f"{crc:08x}" == found.group(1)
+
+
+class _ChecksummingWriter:
+    """
+    A file-like object for streaming the text of a JSON object out to a file
+    with a checksum of it added as its last member, as with L{checksummed}.
+    """
+
+    def __init__(self, out: IO[str]) -> None:
+        self._out = out
+        self._crc = 0
+        # The closing brace comes after the checksum, so hold on to the last
+        # character written until we know whether it's the last one.
+        self._pending = ""
+        self._last = ""
+
+    def write(self, text: str) -> int:
+        if text:
+            self._emit(self._pending + text[:-1])
+            self._pending = text[-1]
+        return len(text)
+
+    def _emit(self, text: str) -> None:
+        if stripped := text.rstrip():
+            self._last = stripped[-1]
+        self._crc = crc32(text.encode("utf-8"), self._crc)
+        self._out.write(text)
+
+    def finish(self) -> None:
+        assert self._pending == "}", "only objects can be checksummed"
+        self._emit("" if self._last == "{" else ", ")
+        self._out.write(f'"checksum": "crc32:{self._crc:08x}"}}')
+
+
+@contextmanager
+def checksumming(out: IO[str]) -> Iterator[IO[str]]:
+    """
+    Stream the text of a JSON object out to a file, adding a checksum of it
+    as its last member.
+    """
+    writer = _ChecksummingWriter(out)
+    yield cast(IO[str], writer)
+    writer.finish()
+
+
+def writeChecksummed(
+    filename: str, text: str, durability: Durability = Durability.none
+) -> None:
+    """
+    Replace a file with the given JSON object text, checksummed.
+    """
+    with replacingFile(filename, durability=durability) as new:
+        new.write(checksummed(text))
+
+
+def loadChecksummed(filename: str) -> Any:
+    """
+    Load a JSON object from a file, checking its checksum, if it has one.
+
+    @raise CorruptSnapshot: if it doesn't match.
+    """
+    with open(filename) as f:
+        text = f.read()
+    if verified(text) is False:
+        raise CorruptSnapshot(filename)
+    return withoutChecksum(loads(text))
+
+
+def withoutChecksum(loaded: Any) -> Any:
+    """
+    Remove the checksum from a loaded JSON object.
+    """
+    loaded.pop("checksum", None)
+    return loaded
+
+
+_chunkBoundary = compileRegex(r"(?<=[\]}]), ")
+
+
+def _chunks(text: str) -> list[str]:
+    """
+    Split some JSON text into chunks that are likely to recur from one
+    version to the next: roughly, one for each element of each list.
+    """
+    return _chunkBoundary.split(text)
+
+
+def _delta(old: list[str], new: list[str]) -> list[list[int] | str]:
+    """
+    Describe the chunks of a new version in terms of an old one: each either
+    a run of the old chunks, as C{[start, count]}, or a new chunk.
+    """
+    positions: dict[str, int] = {}
+    for position, chunk in enumerate(old):
+        positions.setdefault(chunk, position)
+    delta: list[list[int] | str] = []
+    following = -1
+    for chunk in new:
+        if 0 <= following < len(old) and old[following] == chunk:
+            run = delta[-1]
+            assert isinstance(run, list)
+            run[1] += 1
+            following += 1
+        elif (found := positions.get(chunk)) is not None:
+            delta.append([found, 1])
+            following = found + 1
+        else:
+            delta.append(chunk)
+            following = -1
+    return delta
+
+
+def _patched(old: list[str], delta: list[Any]) -> list[str]:
+    new: list[str] = []
+    for each in delta:
+        if isinstance(each, str):
+            new.append(each)
+        else:
+            start, count = each
+            new.extend(old[start : start + count])
+    return new
+
+
+@dataclass
+class SnapshotFile:
+    """
+    A file holding successive snapshots of some JSON object, with a ring of
+    its C{backups} previous versions kept in L{SnapshotFile.backupDirectory}.
+    """
+
+    filename: str
+    durability: Durability = Durability.file
+    backups: int = 8
+    """
+    How many versions to write as deltas before writing another whole copy.
+    Between this many and twice this many previous versions are kept.
+    """
+
+    _previous: list[str] | None = field(default=None, init=False)
+    """
+    The chunks of the version we last wrote, if we have written one.
+    """
+
+    _sinceWhole: int = field(default=0, init=False)
+
+    @property
+    def backupDirectory(self) -> str:
+        return self.filename + ".backups"
+
+    def exists(self) -> bool:
+        return exists(self.filename)
+
+    def write(self, text: str) -> None:
+        """
+        Write a new version, given as the text of a JSON object.
+
+        Its backup is written first, so that even if replacing the snapshot
+        itself is interrupted, the new version can still be recovered.
+        """
+        text = checksummed(text)
+        chunks = _chunks(text)
+        if self._previous is None or self._sinceWhole >= self.backups:
+            self._keep(text, None)
+        else:
+            self._keep(
+                dumps(_delta(self._previous, chunks), separators=(",", ":")),
+                self._generation(),
+            )
+        self._previous = chunks
+        with replacingFile(self.filename, durability=self.durability) as new:
+            new.write(text)
+
+    @contextmanager
+    def writing(self) -> Iterator[IO[str]]:
+        """
+        Stream a new version out, as the text of a JSON object, without
+        holding all of it in memory.  Since there's no text to work out a
+        delta from, a whole copy of it is kept as its backup.
+        """
+        with replacingFile(self.filename, durability=self.durability) as new:
+            with checksumming(new) as out:
+                yield out
+        self._previous = None
+        self._keepFile()
+
+    def intact(self) -> bool:
+        """
+        Does the snapshot match its checksum?  One without a checksum, from
+        an older version, is assumed to be intact.
+        """
+        return verifiedFile(self.filename) is not False
+
+    def load(self) -> Any:
+        """
+        Load the newest intact version, recovering it from the backups if the
+        snapshot itself isn't.
+
+        @raise CorruptSnapshot: if no intact version can be found.
+        """
+        if self.intact():
+            try:
+                return loadChecksummed(self.filename)
+            except ValueError:
+                debug("snapshot has no checksum, and is not valid JSON")
+        return withoutChecksum(loads(self.recover()))
+
+    def recover(self) -> str:
+        """
+        Rebuild the text of the newest intact version from the backups.
+
+        @raise CorruptSnapshot: if there is none.
+        """
+        entries: dict[int, tuple[int | None, str] | None] = {}
+        for generation in reversed(self._generations()):
+            text = self._rebuild(generation, entries)
+            if text is not None and verified(text) is not False:
+                debug("recovered", self.filename, "from backup", generation)
+                return text
+        raise CorruptSnapshot(self.filename)
+
+    def _generations(self) -> list[int]:
+        if not exists(self.backupDirectory):
+            return []
+        return sorted(
+            int(name)
+            for name in listdir(self.backupDirectory)
+            if name.isdigit()
+        )
+
+    def _generation(self) -> int:
+        generations = self._generations()
+        return generations[-1] if generations else 0
+
+    def _entry(self, generation: int) -> tuple[int | None, str] | None:
+        """
+        Read a backup, as the generation that it's a delta from (or C{None}
+        if it's a whole copy) and its text, or C{None} if it's damaged.
+        """
+        try:
+            with open(join(self.backupDirectory, str(generation))) as f:
+                header, text = f.read().split("\n", 1)
+            saved = loads(header)
+        except (OSError, ValueError):
+            return None
+        if saved["checksum"] != _checksum(text):
+            return None
+        return saved["base"], text
+
+    def _rebuild(
+        self,
+        generation: int,
+        entries: dict[int, tuple[int | None, str] | None],
+    ) -> str | None:
+        """
+        Rebuild the text of the given backup, from the whole copy before it
+        and the deltas since.
+        """
+        chain = []
+        each: int | None = generation
+        while each is not None:
+            if each not in entries:
+                entries[each] = self._entry(each)
+            if (entry := entries[each]) is None:
+                return None
+            chain.append(entry)
+            each = entry[0]
+        *deltas, (_, whole) = chain
+        chunks = _chunks(whole)
+        for _, delta in reversed(deltas):
+            chunks = _patched(chunks, loads(delta))
+        return ", ".join(chunks)
+
+    def _keep(self, text: str, base: int | None) -> None:
+        """
+        Write a backup of a new version, as either a whole copy, or a delta
+        from the given generation.
+        """
+        if not self.backups:
+            return
+        with self._keeping(_checksum(text), base) as new:
+            new.write(text)
+
+    def _keepFile(self) -> None:
+        """
+        Write a whole copy of the snapshot as a backup, a chunk at a time.
+        """
+        if not self.backups:
+            return
+        crc = 0
+        with open(self.filename, "rb") as f:
+            while chunk := f.read(1 << 20):
+                crc = crc32(chunk, crc)
+        with open(self.filename) as f, self._keeping(
+            f"crc32:{crc:08x}", None
+        ) as new:
+            copyfileobj(f, new)
+
+    @contextmanager
+    def _keeping(self, checksum: str, base: int | None) -> Iterator[IO[str]]:
+        """
+        Write out the next backup, then drop any that are too old to keep.
+        """
+        makedirs(self.backupDirectory, exist_ok=True)
+        generations = self._generations()
+        generation = (generations[-1] if generations else 0) + 1
+        with replacingFile(
+            join(self.backupDirectory, str(generation)),
+            durability=self.durability,
+        ) as new:
+            new.write(dumps({"base": base, "checksum": checksum}) + "\n")
+            yield new
+        if base is not None:
+            self._sinceWhole += 1
+            return
+        self._sinceWhole = 0
+        # Keep everything back to the previous whole copy, so that there are
+        # always at least as many previous versions as we were asked for.
+        whole = [each for each in generations if self._base(each) is None]
+        for each in generations:
+            if not whole or each < whole[-1]:
+                remove(join(self.backupDirectory, str(each)))
+
+    def _base(self, generation: int) -> int | None:
+        """
+        The generation that a backup is a delta from, or C{None} if it's a
+        whole copy (or can't be read).
+        """
+        try:
+            with open(join(self.backupDirectory, str(generation))) as f:
+                return cast(int | None, loads(f.readline())["base"])
+        except (OSError, ValueError):
+            return None
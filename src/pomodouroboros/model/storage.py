@@ -2,18 +2,28 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from functools import singledispatch
-from json import dump, load
+from json import dump, dumps, load
 from os import makedirs, replace
-from os.path import basename, dirname, exists, expanduser, join
-from typing import TypeAlias, cast
+from os.path import dirname, exists, expanduser
+from typing import (
+    IO,
+    Callable,
+    Iterable,
+    Sequence,
+    TypeAlias,
+    cast,
+)
 
 from .boundaries import EvaluationResult, IntervalType, UserInterfaceFactory
+from .debugger import debug
 from .intention import Estimate, Intention
 from .intervals import (
     AnyInterval,
     Break,
     Duration,
+    DurationCursor,
     Evaluation,
     GracePeriod,
     Pomodoro,
@@ -23,13 +33,22 @@ from .nexus import Nexus
 from .observables import IgnoreChanges, ObservableList
 from .schema import (
     SavedBreak,
+    SavedDuration,
     SavedGracePeriod,
+    SavedIntention,
     SavedIntentionID,
     SavedInterval,
     SavedNexus,
     SavedPomodoro,
+    SavedSession,
     SavedStartPrompt,
 )
+from .snapshots import (
+    CorruptSnapshot,
+    Durability,
+    SnapshotFile,
+    replacingFile,
+)
 from .sessions import Session
 
 
@@ -43,66 +62,22 @@ def nexusFromJSON(
     intentions: list[Intention] = []
 
     for savedIntention in saved["intentions"]:
-        intention = Intention(
-            id=int(savedIntention["id"]),
-            title=savedIntention["title"],
-            created=savedIntention["created"],
-            modified=savedIntention["modified"],
-            description=savedIntention["description"],
-            abandoned=savedIntention["abandoned"],
-            estimates=[
-                Estimate(
-                    duration=savedEstimate["duration"],
-                    madeAt=savedEstimate["madeAt"],
-                )
-                for savedEstimate in savedIntention["estimates"]
-            ],
-        )
+        intention = loadIntention(savedIntention)
         intentions.append(intention)
         intentionIDMap[savedIntention["id"]] = intention
 
-    def loadInterval(savedInterval: SavedInterval) -> AnyInterval:
-        if savedInterval["intervalType"] == "Pomodoro":
-            intention = intentionIDMap[savedInterval["intentionID"]]
-            evaluation = savedInterval["evaluation"]
-            pomodoro = Pomodoro(
-                startTime=savedInterval["startTime"],
-                intention=intention,
-                endTime=savedInterval["endTime"],
-                indexInStreak=savedInterval["indexInStreak"],
-                evaluation=Evaluation(
-                    EvaluationResult(evaluation["result"]),
-                    evaluation["timestamp"],
-                )
-                if evaluation is not None
-                else None,
-            )
-            intention.pomodoros.append(pomodoro)
-            return pomodoro
-        elif savedInterval["intervalType"] == "StartPrompt":
-            return StartPrompt(
-                startTime=savedInterval["startTime"],
-                endTime=savedInterval["endTime"],
-                pointsBeforeLoss=savedInterval["pointsBeforeLoss"],
-                pointsAfterLoss=savedInterval["pointsAfterLoss"],
-            )
-        elif savedInterval["intervalType"] == "Break":
-            return Break(
-                startTime=savedInterval["startTime"],
-                endTime=savedInterval["endTime"],
-            )
-        elif savedInterval["intervalType"] == "GracePeriod":
-            return GracePeriod(
-                startTime=savedInterval["startTime"],
-                originalPomEnd=savedInterval["originalPomEnd"],
-            )
+    def loadStreakInterval(savedInterval: SavedInterval) -> AnyInterval:
+        interval = loadInterval(savedInterval, intentionIDMap)
+        if isinstance(interval, Pomodoro):
+            interval.intention.pomodoros.append(interval)
+        return interval
 
     streaks = ObservableList(
         IgnoreChanges,
         [
             ObservableList(
                 IgnoreChanges,
-                [loadInterval(interval) for interval in savedStreak],
+                [loadStreakInterval(interval) for interval in savedStreak],
             )
             for savedStreak in saved["streaks"]
         ],
@@ -112,25 +87,12 @@ def nexusFromJSON(
         _initialTime=saved["initialTime"],
         _intentions=intentions,
         # lastUpdateTime below. maybe it should not be init=False
-        _upcomingDurations=iter(
-            [
-                Duration(
-                    IntervalType(each["intervalType"]), seconds=each["seconds"]
-                )
-                for each in saved["upcomingDurations"]
-            ]
+        _upcomingDurations=DurationCursor(
+            loadDurations(saved["upcomingDurations"])
         ),
         _streaks=streaks,
         _sessions=ObservableList(
-            IgnoreChanges,
-            [
-                Session(
-                    start=each["start"],
-                    end=each["end"],
-                    automatic=bool(each.get("automatic")),
-                )
-                for each in saved["sessions"]
-            ],
+            IgnoreChanges, [loadSession(each) for each in saved["sessions"]]
         ),
         _interfaceFactory=userInterfaceFactory,
         _lastUpdateTime=saved["lastUpdateTime"],
@@ -138,84 +100,204 @@ def nexusFromJSON(
     return nexus
 
 
-def nexusToJSON(nexus: Nexus) -> SavedNexus:
-    @singledispatch
-    def saveInterval(interval: AnyInterval) -> SavedInterval:
-        """
-        Save any interval to its paired JSON data structure.
-        """
-        raise TypeError("unsupported type")
-
-    @saveInterval.register(Pomodoro)
-    def savePomodoro(interval: Pomodoro) -> SavedPomodoro:
-        return {
-            "startTime": interval.startTime,
-            "intentionID": str(interval.intention.id),
-            "endTime": interval.endTime,
-            "evaluation": {
-                "result": interval.evaluation.result.value,
-                "timestamp": interval.evaluation.timestamp,
-            }
-            if interval.evaluation is not None
+def loadIntention(savedIntention: SavedIntention) -> Intention:
+    """
+    Load an intention, without its pomodoros, from its paired JSON data
+    structure.
+    """
+    return Intention(
+        id=int(savedIntention["id"]),
+        title=savedIntention["title"],
+        created=savedIntention["created"],
+        modified=savedIntention["modified"],
+        description=savedIntention["description"],
+        abandoned=savedIntention["abandoned"],
+        estimates=[
+            Estimate(
+                duration=savedEstimate["duration"],
+                madeAt=savedEstimate["madeAt"],
+            )
+            for savedEstimate in savedIntention["estimates"]
+        ],
+    )
+
+
+def loadSession(savedSession: SavedSession) -> Session:
+    """
+    Load a session from its paired JSON data structure.
+    """
+    return Session(
+        start=savedSession["start"],
+        end=savedSession["end"],
+        automatic=bool(savedSession.get("automatic")),
+    )
+
+
+def loadDurations(savedDurations: Iterable[SavedDuration]) -> list[Duration]:
+    """
+    Load a list of upcoming durations from its paired JSON data structure.
+    """
+    return [
+        Duration(IntervalType(each["intervalType"]), seconds=each["seconds"])
+        for each in savedDurations
+    ]
+
+
+def loadInterval(
+    savedInterval: SavedInterval,
+    intentionIDMap: dict[SavedIntentionID, Intention],
+) -> AnyInterval:
+    """
+    Load any interval from its paired JSON data structure.  A loaded
+    L{Pomodoro} is not added to its intention's C{pomodoros}; that is up to
+    the caller.
+    """
+    if savedInterval["intervalType"] == "Pomodoro":
+        evaluation = savedInterval["evaluation"]
+        return Pomodoro(
+            startTime=savedInterval["startTime"],
+            intention=intentionIDMap[savedInterval["intentionID"]],
+            endTime=savedInterval["endTime"],
+            indexInStreak=savedInterval["indexInStreak"],
+            evaluation=Evaluation(
+                EvaluationResult(evaluation["result"]),
+                evaluation["timestamp"],
+            )
+            if evaluation is not None
             else None,
-            "indexInStreak": interval.indexInStreak,
-            "intervalType": "Pomodoro",
-        }
+        )
+    elif savedInterval["intervalType"] == "StartPrompt":
+        return StartPrompt(
+            startTime=savedInterval["startTime"],
+            endTime=savedInterval["endTime"],
+            pointsBeforeLoss=savedInterval["pointsBeforeLoss"],
+            pointsAfterLoss=savedInterval["pointsAfterLoss"],
+        )
+    elif savedInterval["intervalType"] == "Break":
+        return Break(
+            startTime=savedInterval["startTime"],
+            endTime=savedInterval["endTime"],
+        )
+    elif savedInterval["intervalType"] == "GracePeriod":
+        return GracePeriod(
+            startTime=savedInterval["startTime"],
+            originalPomEnd=savedInterval["originalPomEnd"],
+        )
+    raise ValueError(f"unknown interval type {savedInterval['intervalType']}")
 
-    @saveInterval.register(Break)
-    def saveBreak(interval: Break) -> SavedBreak:
-        return {
-            "startTime": interval.startTime,
-            "endTime": interval.endTime,
-            "intervalType": "Break",
-        }
 
-    @saveInterval.register(GracePeriod)
-    def saveGracePeriod(interval: GracePeriod) -> SavedGracePeriod:
-        return {
-            "startTime": interval.startTime,
-            "originalPomEnd": interval.originalPomEnd,
-            "intervalType": "GracePeriod",
+@singledispatch
+def saveInterval(interval: AnyInterval) -> SavedInterval:
+    """
+    Save any interval to its paired JSON data structure.
+    """
+    raise TypeError("unsupported type")
+
+
+@saveInterval.register(Pomodoro)
+def savePomodoro(interval: Pomodoro) -> SavedPomodoro:
+    return {
+        "startTime": interval.startTime,
+        "intentionID": str(interval.intention.id),
+        "endTime": interval.endTime,
+        "evaluation": {
+            "result": interval.evaluation.result.value,
+            "timestamp": interval.evaluation.timestamp,
         }
+        if interval.evaluation is not None
+        else None,
+        "indexInStreak": interval.indexInStreak,
+        "intervalType": "Pomodoro",
+    }
+
+
+@saveInterval.register(Break)
+def saveBreak(interval: Break) -> SavedBreak:
+    return {
+        "startTime": interval.startTime,
+        "endTime": interval.endTime,
+        "intervalType": "Break",
+    }
+
+
+@saveInterval.register(GracePeriod)
+def saveGracePeriod(interval: GracePeriod) -> SavedGracePeriod:
+    return {
+        "startTime": interval.startTime,
+        "originalPomEnd": interval.originalPomEnd,
+        "intervalType": "GracePeriod",
+    }
+
+
+@saveInterval.register(StartPrompt)
+def saveStartPrompt(interval: StartPrompt) -> SavedStartPrompt:
+    return {
+        "startTime": interval.startTime,
+        "endTime": interval.endTime,
+        "pointsBeforeLoss": interval.pointsBeforeLoss,
+        "pointsAfterLoss": interval.pointsAfterLoss,
+        "intervalType": "StartPrompt",
+    }
+
 
-    @saveInterval.register(StartPrompt)
-    def saveStartPrompt(interval: StartPrompt) -> SavedStartPrompt:
-        return {
-            "startTime": interval.startTime,
-            "endTime": interval.endTime,
-            "pointsBeforeLoss": interval.pointsBeforeLoss,
-            "pointsAfterLoss": interval.pointsAfterLoss,
-            "intervalType": "StartPrompt",
+def saveIntention(intention: Intention) -> SavedIntention:
+    """
+    Save an intention to its paired JSON data structure.
+    """
+    return {
+        "created": intention.created,
+        "modified": intention.modified,
+        "title": intention.title,
+        "description": intention.description,
+        "estimates": [
+            {"duration": estimate.duration, "madeAt": estimate.madeAt}
+            for estimate in intention.estimates
+        ],
+        "abandoned": intention.abandoned,
+        "id": str(intention.id),
+    }
+
+
+def saveSession(session: Session) -> SavedSession:
+    """
+    Save a session to its paired JSON data structure.
+    """
+    return {
+        "start": session.start,
+        "end": session.end,
+        "automatic": session.automatic,
+    }
+
+
+def saveSessions(sessions: Iterable[Session]) -> list[SavedSession]:
+    """
+    Save a list of sessions to its paired JSON data structure.
+    """
+    return [saveSession(session) for session in sessions]
+
+
+def saveDurations(durations: Iterable[Duration]) -> list[SavedDuration]:
+    """
+    Save a list of upcoming durations to its paired JSON data structure.
+    """
+    return [
+        {
+            "intervalType": duration.intervalType.value,
+            "seconds": duration.seconds,
         }
+        for duration in durations
+    ]
+
 
+def nexusToJSON(nexus: Nexus) -> SavedNexus:
     return {
         "initialTime": nexus._initialTime,
         "lastIntentionID": str(nexus._lastIntentionID),
         "intentions": [
-            {
-                "created": intention.created,
-                "modified": intention.modified,
-                "title": intention.title,
-                "description": intention.description,
-                "estimates": [
-                    {"duration": estimate.duration, "madeAt": estimate.madeAt}
-                    for estimate in intention.estimates
-                ],
-                "abandoned": intention.abandoned,
-                "id": str(intention.id),
-            }
-            for intention in nexus._intentions
+            saveIntention(intention) for intention in nexus._intentions
         ],
         "lastUpdateTime": nexus._lastUpdateTime,
-        "upcomingDurations": [
-            {
-                "intervalType": duration.intervalType.value,
-                "seconds": duration.seconds,
-            }
-            # TODO: slightly inefficient, don't clone the whole thing just to
-            # clone the iterator
-            for duration in nexus.cloneWithoutUI()._upcomingDurations
-        ],
+        "upcomingDurations": saveDurations(nexus._upcomingDurations.remaining),
         "streaks": [
             [
                 saveInterval(streakInterval)
@@ -223,14 +305,7 @@ def nexusToJSON(nexus: Nexus) -> SavedNexus:
             ]
             for streakIntervals in nexus._streaks
         ],
-        "sessions": [
-            {
-                "start": session.start,
-                "end": session.end,
-                "automatic": session.automatic,
-            }
-            for session in nexus._sessions
-        ],
+        "sessions": saveSessions(nexus._sessions),
     }
 
 
@@ -239,14 +314,14 @@ JSON: TypeAlias = (
 )
 
 
-def saveToFile(filename: str, jsonObject: JSON) -> None:
+def saveToFile(
+    filename: str, jsonObject: JSON, durability: Durability = Durability.none
+) -> None:
     """
     Save the given JSON object to a file.
     """
-    newp = join(dirname(filename), ".temporary-" + basename(filename) + ".new")
-    with open(newp, "w") as new:
+    with replacingFile(filename, durability=durability) as new:
         dump(jsonObject, new)
-    replace(newp, filename)
 
 
 def loadFromFile(filename: str) -> JSON:
@@ -255,9 +330,213 @@ def loadFromFile(filename: str) -> JSON:
         return result
 
 
+def readNexusSnapshot(snapshot: SnapshotFile) -> SavedNexus:
+    """
+    Read a saved nexus from a L{SnapshotFile}, recovering the newest intact
+    version of it from its backups if need be.
+
+    @raise CorruptSnapshot: if there is no intact version.
+    """
+    return cast(SavedNexus, snapshot.load())
+
+
+def _writeSavedNexus(
+    out: IO[str],
+    initialTime: float,
+    lastIntentionID: str,
+    intentions: Iterable[SavedIntention],
+    lastUpdateTime: float,
+    upcomingDurations: list[SavedDuration],
+    streaks: Iterable[Iterable[SavedInterval]],
+    sessions: Iterable[SavedSession],
+) -> None:
+    """
+    Write out the parts of a L{SavedNexus} as JSON, exactly as C{dump} would
+    write the whole thing, but one intention, interval or session at a time.
+    """
+
+    def key(name: str) -> None:
+        out.write(", " + dumps(name) + ": ")
+
+    def items(values: Iterable[object]) -> None:
+        out.write("[")
+        separator = ""
+        for value in values:
+            out.write(separator)
+            out.write(dumps(value))
+            separator = ", "
+        out.write("]")
+
+    out.write('{"initialTime": ' + dumps(initialTime))
+    key("lastIntentionID")
+    out.write(dumps(lastIntentionID))
+    key("intentions")
+    items(intentions)
+    key("lastUpdateTime")
+    out.write(dumps(lastUpdateTime))
+    key("upcomingDurations")
+    items(upcomingDurations)
+    key("streaks")
+    out.write("[")
+    separator = ""
+    for streak in streaks:
+        out.write(separator)
+        items(streak)
+        separator = ", "
+    out.write("]")
+    key("sessions")
+    items(sessions)
+    out.write("}")
+
+
+def writeNexusJSON(nexus: Nexus, out: IO[str]) -> None:
+    """
+    Write a L{Nexus} out as JSON, exactly as C{dump(nexusToJSON(nexus), out)}
+    would, but saving one intention, interval or session at a time, so that
+    the whole L{SavedNexus} is never built in memory.
+    """
+    _writeSavedNexus(
+        out,
+        nexus._initialTime,
+        str(nexus._lastIntentionID),
+        (saveIntention(intention) for intention in nexus._intentions),
+        nexus._lastUpdateTime,
+        saveDurations(nexus._upcomingDurations.remaining),
+        (
+            (saveInterval(streakInterval) for streakInterval in streak)
+            for streak in nexus._streaks
+        ),
+        (saveSession(session) for session in nexus._sessions),
+    )
+
+
+def captureNexus(nexus: Nexus) -> Callable[[IO[str]], None]:
+    """
+    Capture the state of a L{Nexus} as it is now, saving each of its
+    intentions, intervals and sessions to its paired JSON data structure.
+
+    @return: a function that writes the captured state out as
+        L{writeNexusJSON} does.  The captured state shares nothing with the
+        L{Nexus}, so it may be written on another thread while the L{Nexus}
+        goes on changing; any change made after the capture is left for the
+        next save.
+    """
+    saved = nexusToJSON(nexus)
+
+    def write(out: IO[str]) -> None:
+        _writeSavedNexus(out, **saved)
+
+    return write
+
+
+def saveNexusToFile(filename: str, nexus: Nexus) -> None:
+    """
+    Save a L{Nexus} to a file as JSON, streaming it with L{writeNexusJSON}.
+    """
+    with replacingFile(filename) as new:
+        writeNexusJSON(nexus, new)
+
+
+@dataclass
+class ChangeTracker:
+    """
+    Once attached to a L{Nexus}, observes the changes made to its history, so
+    that they can be saved without saving the whole thing.
+    """
+
+    nexus: Nexus | None = field(default=None, init=False)
+    """
+    The L{Nexus} whose changes we are tracking, once attached.
+    """
+
+    _mustCompact: bool = field(default=True, init=False)
+    """
+    Whether the next save must write out the whole L{Nexus}: because nothing
+    has been written yet, or because the history was changed in a way that
+    can't be described as changes to individual items.
+    """
+
+    _intentions: dict[int, Intention] = field(default_factory=dict, init=False)
+    """
+    The intentions which changed since the last save, by identity.
+    """
+
+    _intervals: dict[int, AnyInterval] = field(
+        default_factory=dict, init=False
+    )
+    """
+    The intervals which changed since the last save, by identity.
+    """
+
+    _sessionsChanged: bool = field(default=False, init=False)
+
+    def attach(self, nexus: Nexus) -> None:
+        """
+        Start tracking the changes made to the given L{Nexus}.
+        """
+        self.nexus = nexus
+        nexus.addHistoryObserver(self)
+
+    def intentionAppended(self, position: int, intention: Intention) -> None:
+        self._intentions[id(intention)] = intention
+
+    def intentionChanged(self, intention: Intention, key: str) -> None:
+        self._intentions[id(intention)] = intention
+        if key == "pomodoros":
+            # Its pomodoros may have been evaluated.
+            for pomodoro in intention.pomodoros:
+                self._intervals[id(pomodoro)] = pomodoro
+
+    def streakAppended(
+        self, position: int, streak: Sequence[AnyInterval]
+    ) -> None:
+        # Its intervals are reported to intervalAppended.
+        pass
+
+    def intervalAppended(self, interval: AnyInterval) -> None:
+        self._intervals[id(interval)] = interval
+
+    def sessionsChanged(self) -> None:
+        self._sessionsChanged = True
+
+    def historyReplaced(self) -> None:
+        self._mustCompact = True
+
+    def _changedIntervals(
+        self, nexus: Nexus
+    ) -> list[tuple[int, int, AnyInterval]]:
+        """
+        Find the intervals that have changed, with the positions of their
+        streaks and their positions within them, in order.
+        """
+        pending = self._intervals
+        found: list[tuple[int, int, AnyInterval]] = []
+        # Changed intervals are almost always at the end of the current
+        # streak, so search backwards.
+        for streakIndex in reversed(range(len(nexus._streaks))):
+            streak = nexus._streaks[streakIndex]
+            for index in reversed(range(len(streak))):
+                if not pending:
+                    break
+                interval = streak[index]
+                if id(interval) in pending:
+                    del pending[id(interval)]
+                    found.append((streakIndex, index, interval))
+            if not pending:
+                break
+        found.reverse()
+        return found
+
+    def _clearChanges(self) -> None:
+        self._intentions = {}
+        self._intervals = {}
+        self._sessionsChanged = False
+
+
 defaultNexusFile = expanduser(
     "~/.local/share/pomodouroboros/current-nexus.json"
 )
+_defaultSnapshot = SnapshotFile(defaultNexusFile)
 
 
 def loadDefaultNexus(
@@ -267,20 +546,25 @@ def loadDefaultNexus(
     """
     Load the default nexus.
     """
-    if exists(defaultNexusFile):
-        # TODO: probably need to be extremely careful before shipping to
-        # end-users here, since failing to create a nexus makes the app
-        # unlaunchable
-        loaded = nexusFromJSON(
-            cast(
-                SavedNexus,
-                loadFromFile(defaultNexusFile),
-            ),
-            userInterfaceFactory,
-        )
-        loaded.advanceToTime(currentTime)
-        return loaded
-    return Nexus(currentTime, userInterfaceFactory, 0)
+    loaded = None
+    if _defaultSnapshot.exists():
+        try:
+            saved = readNexusSnapshot(_defaultSnapshot)
+        except CorruptSnapshot:
+            # Failing to load a nexus would make the app unlaunchable, so set
+            # the damaged one aside, where it can be looked at later, and
+            # start over.
+            debug(
+                "no intact nexus to load; setting", defaultNexusFile, "aside"
+            )
+            if exists(defaultNexusFile):
+                replace(defaultNexusFile, defaultNexusFile + ".corrupt")
+        else:
+            loaded = nexusFromJSON(saved, userInterfaceFactory)
+    if loaded is None:
+        return Nexus(currentTime, userInterfaceFactory, 0)
+    loaded.advanceToTime(currentTime)
+    return loaded
 
 
 def saveDefaultNexus(nexus: Nexus) -> None:
@@ -288,4 +572,23 @@ def saveDefaultNexus(nexus: Nexus) -> None:
     Save a given nexus to the default file for the current user.
     """
     makedirs(dirname(defaultNexusFile), exist_ok=True)
-    saveToFile(defaultNexusFile, nexusToJSON(nexus))
+    with _defaultSnapshot.writing() as new:
+        writeNexusJSON(nexus, new)
+
+
+def prepareDefaultSave(nexus: Nexus) -> Callable[[], None]:
+    """
+    Capture the state of a given nexus, as L{saveDefaultNexus} would save it,
+    with L{captureNexus}.
+
+    @return: a function that streams it out, as L{saveDefaultNexus} does,
+        which may be run on another thread.
+    """
+    writeOut = captureNexus(nexus)
+
+    def write() -> None:
+        makedirs(dirname(defaultNexusFile), exist_ok=True)
+        with _defaultSnapshot.writing() as new:
+            writeOut(new)
+
+    return write
@@ -0,0 +1,296 @@
+"""
+Timings of the model, which are not reliable enough on a shared machine to be
+asserted by tests.  Run them with::
+
+    python -m pomodouroboros.model.test.benchmarks
+"""
+
+from __future__ import annotations
+
+from dataclasses import field
+from io import StringIO
+from json import dumps, loads
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Callable, MutableSequence, TypeVar
+
+from ..binary import packNexus, unpackNexus
+from ..boundaries import NoUserInterface
+from ..intention import Estimate, Intention
+from ..intervals import Pomodoro
+from ..nexus import Nexus
+from ..observables import (
+    Changes,
+    DebugChanges,
+    IgnoreChanges,
+    MirrorList,
+    ObservableList,
+    Observer,
+    noop,
+    observable,
+)
+from ..storage import nexusFromJSON
+from .test_binary import multiYearHistory
+from .test_observables import HasDefaultObserver
+
+T = TypeVar("T")
+
+
+def best(
+    operation: Callable[[T], object],
+    prepare: Callable[[], T],
+    repeat: int = 3,
+) -> float:
+    """
+    Time C{operation} on a freshly C{prepare}d argument C{repeat} times, and
+    return the shortest, in seconds.
+    """
+    times = []
+    for each in range(repeat):
+        argument = prepare()
+        before = perf_counter()
+        operation(argument)
+        times.append(perf_counter() - before)
+    return min(times)
+
+
+def report(title: str, timings: dict[str, float]) -> None:
+    """
+    Print some named timings, in milliseconds.
+    """
+    print(title)
+    for name, seconds in timings.items():
+        print(f"    {name:<36} {seconds * 1000:10.2f}ms")
+
+
+def binaryFormat() -> None:
+    """
+    Saving and loading three years of history as JSON and in the binary
+    format.
+    """
+    saved = multiYearHistory(3)
+    asJSON = dumps(saved).encode("utf-8")
+    packed = packNexus(saved)
+    report(
+        "binary format, 3 years of history",
+        {
+            "save JSON": best(dumps, lambda: saved),
+            "save binary": best(packNexus, lambda: saved),
+            "load JSON": best(loads, lambda: asJSON),
+            "load binary": best(unpackNexus, lambda: packed),
+        },
+    )
+
+
+def bulkOperations() -> None:
+    """
+    Extending, clearing and reversing a list of 10,000 items, observed by a
+    L{MirrorList} and L{DebugChanges}, with L{ObservableList}'s bulk
+    operations and with the per-element ones that L{MutableSequence} would
+    otherwise build them from.
+    """
+    values = [str(each) for each in range(10_000)]
+    Operation = Callable[[ObservableList[str]], object]
+
+    def observed(contents: list[str]) -> ObservableList[str]:
+        mirror: list[str] = contents[:]
+        return ObservableList(
+            DebugChanges(MirrorList(mirror), StringIO()), contents[:]
+        )
+
+    def extend(o: ObservableList[str]) -> None:
+        o.extend(values)
+
+    def extendEach(o: ObservableList[str]) -> None:
+        MutableSequence.extend(o, values)
+
+    operations: list[tuple[str, Operation, Operation, list[str]]] = [
+        ("extend", extend, extendEach, []),
+        ("clear", ObservableList.clear, MutableSequence.clear, values),
+        ("reverse", ObservableList.reverse, MutableSequence.reverse, values),
+    ]
+    timings = {}
+    for name, bulk, perElement, contents in operations:
+        timings[name] = best(bulk, lambda: observed(contents))
+        timings[f"{name}, per element"] = best(
+            perElement, lambda: observed(contents)
+        )
+    report("bulk operations, 10,000 items", timings)
+
+
+class NotifiedNoop:
+    """
+    An observer which, like L{IgnoreChanges}, does nothing, but which the
+    observables can't tell does nothing.
+    """
+
+    def added(self, key: object, new: object) -> Any:
+        return noop()
+
+    def removed(self, key: object, old: object) -> Any:
+        return noop()
+
+    def changed(self, key: object, old: object, new: object) -> Any:
+        return noop()
+
+
+def ignoring() -> None:
+    """
+    Changing observables whose observer is L{IgnoreChanges}, which they skip
+    notifying, and whose observer is a L{NotifiedNoop}, which does just as
+    little but has to be notified, as every observer used to be.
+    """
+
+    def listWrites(observer: Changes[Any, Any]) -> None:
+        values: ObservableList[int] = ObservableList(observer, [])
+        for each in range(10_000):
+            values.append(each)
+        for each in range(10_000):
+            values[each] = each + 1
+        for each in range(10_000):
+            del values[-1]
+
+    def propertyWrites(observer: Changes[Any, Any]) -> None:
+        example = HasDefaultObserver(0)
+        example.observer = observer
+        for each in range(20_000):
+            example.value = each
+
+    def simulatedStreaks(observer: Changes[Any, Any]) -> None:
+        # Like a hypothetical Nexus simulating its future, which makes many
+        # objects as well as changing them.
+        streaks: ObservableList[ObservableList[HasDefaultObserver]]
+        streaks = ObservableList(observer, [])
+        for each in range(500):
+            streak: ObservableList[HasDefaultObserver]
+            streak = ObservableList(observer, [])
+            streaks.append(streak)
+            for interval in range(10):
+                new = HasDefaultObserver(interval)
+                new.observer = observer
+                streak.append(new)
+                new.value += 1
+                new.value += 1
+
+    observers: list[tuple[str, Callable[[], Changes[Any, Any]]]] = [
+        ("IgnoreChanges", lambda: IgnoreChanges),
+        ("IgnoreChanges()", IgnoreChanges),
+        ("NotifiedNoop()", NotifiedNoop),
+    ]
+    timings = {}
+    for name, workload in [
+        ("list writes", listWrites),
+        ("property writes", propertyWrites),
+        ("simulated streaks", simulatedStreaks),
+    ]:
+        for observerName, observer in observers:
+            timings[f"{name}, {observerName}"] = best(
+                workload, observer, repeat=5
+            )
+    report("observables ignoring their changes", timings)
+
+
+@observable()
+class DictIntention:
+    """
+    An L{Intention} as it was before it was slotted.
+    """
+
+    id: int
+    created: float
+    modified: float
+    title: str
+    description: str
+    estimates: list[Estimate] = field(default_factory=list)
+    pomodoros: list[Pomodoro] = field(default_factory=list)
+    abandoned: bool = False
+
+    observer: Observer = field(default_factory=IgnoreChanges)
+
+
+def slottedIntentions() -> None:
+    """
+    Reading the attributes of an L{Intention}, which is slotted, and of a
+    L{DictIntention}, and the memory that 5,000 of each take.
+    """
+
+    def made(cls: Any) -> Any:
+        return cls(1, 0.0, 0.0, "title", "description")
+
+    def reads(intention: Any) -> None:
+        for each in range(20_000):
+            intention.title
+            intention.abandoned
+            intention.pomodoros
+
+    def kilobytes(cls: Any) -> float:
+        start()
+        try:
+            instances = [
+                cls(each, 0.0, 0.0, "title", "description")
+                for each in range(5000)
+            ]
+            current, peak = get_traced_memory()
+        finally:
+            stop()
+        del instances
+        return current / 1000
+
+    timings = {}
+    for cls in [Intention, DictIntention]:
+        timings[f"reads, {cls.__name__}"] = best(
+            reads, lambda: made(cls), repeat=5
+        )
+    report("slotted intentions", timings)
+    for cls in [Intention, DictIntention]:
+        print(f"    {'memory, ' + cls.__name__:<36} {kilobytes(cls):10.2f}KB")
+
+
+def forking() -> None:
+    """
+    Forking a L{Nexus} with 1, 3 and 10 years of history, and then changing
+    the fork as the ideal score's simulations do: adding an intention,
+    starting a pomodoro for it and advancing through it.  Both should take
+    about as long however much history there is.
+    """
+
+    def fork(nexus: Nexus) -> None:
+        nexus.cloneWithoutUI()
+
+    def forkAndChange(nexus: Nexus) -> None:
+        fork = nexus.cloneWithoutUI()
+        intention = fork.addIntention("benchmark")
+        fork.startPomodoro(intention)
+        fork.advanceToTime(nexus._lastUpdateTime + 3600.0)
+
+    timings = {}
+    for years in [1, 3, 10]:
+        nexus = nexusFromJSON(
+            multiYearHistory(years), lambda nexus: NoUserInterface()
+        )
+        timings[f"fork, {years} years"] = best(fork, lambda: nexus, repeat=20)
+        timings[f"fork and change, {years} years"] = best(
+            forkAndChange, lambda: nexus, repeat=20
+        )
+    report("forking", timings)
+
+
+benchmarks: list[Callable[[], None]] = [
+    binaryFormat,
+    bulkOperations,
+    forking,
+    ignoring,
+    slottedIntentions,
+]
+
+
+def main() -> None:
+    """
+    Run every benchmark.
+    """
+    for benchmark in benchmarks:
+        benchmark()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+from json import dumps, loads
+from os.path import join
+from random import Random
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from ..binary import (
+    UnsupportedFormat,
+    binaryToJSON,
+    jsonToBinary,
+    packNexus,
+    unpackNexus,
+)
+from ..boundaries import EvaluationResult, NoUserInterface
+from ..intervals import Pomodoro
+from ..nexus import Nexus
+from ..schema import SavedInterval, SavedNexus
+from ..storage import loadFromFile, nexusToJSON, saveToFile
+
+
+def multiYearHistory(years: int) -> SavedNexus:
+    """
+    Make up a saved nexus with C{years} of daily use: a handful of streaks of
+    pomodoros and breaks each working day, starting at arbitrary times.
+    """
+    random = Random(years)
+    saved: SavedNexus = {
+        "initialTime": 1_600_000_000.0,
+        "lastIntentionID": "0",
+        "intentions": [],
+        "lastUpdateTime": 1_600_000_000.0,
+        "upcomingDurations": [],
+        "streaks": [],
+        "sessions": [],
+    }
+    results = ["distracted", "interrupted", "focused", "achieved"]
+    for day in range(years * 250):
+        dayStart = 1_600_000_000.0 + day * 86400 + random.random() * 3600
+        saved["sessions"].append(
+            {"start": dayStart, "end": dayStart + 8 * 3600, "automatic": True}
+        )
+        now = dayStart + random.random() * 600
+        for streakIndex in range(4):
+            streak: list[SavedInterval] = []
+            for index in range(3):
+                intentionID = str(len(saved["intentions"]) + 1)
+                saved["intentions"].append(
+                    {
+                        "created": now - random.random() * 3600,
+                        "modified": now,
+                        "title": f"Work on part {intentionID} of the thing",
+                        "description": "",
+                        "estimates": [
+                            {"duration": 1500.0, "madeAt": now - 60.0}
+                        ],
+                        "abandoned": False,
+                        "id": intentionID,
+                    }
+                )
+                saved["lastIntentionID"] = intentionID
+                streak.append(
+                    {
+                        "startTime": now,
+                        "intentionID": intentionID,
+                        "endTime": now + 1500.0,
+                        "evaluation": {
+                            "result": random.choice(results),  # type:ignore
+                            "timestamp": now + 1500.0 + random.random() * 60,
+                        },
+                        "indexInStreak": index,
+                        "intervalType": "Pomodoro",
+                    }
+                )
+                streak.append(
+                    {
+                        "startTime": now + 1500.0,
+                        "endTime": now + 1800.0,
+                        "intervalType": "Break",
+                    }
+                )
+                now += 1800.0
+            streak.append(
+                {
+                    "startTime": now,
+                    "originalPomEnd": now + 1500.0,
+                    "intervalType": "GracePeriod",
+                }
+            )
+            saved["streaks"].append(streak)
+            now += 500.0 + random.random() * 1800
+        saved["lastUpdateTime"] = now
+    return saved
+
+
+class BinaryFormatTests(TestCase):
+    """
+    Tests for the binary snapshot format.
+    """
+
+    def assertRoundTrips(self, saved: SavedNexus) -> bytes:
+        packed = packNexus(saved)
+        self.assertEqual(dumps(unpackNexus(packed)), dumps(saved))
+        return packed
+
+    def test_roundTrip(self) -> None:
+        """
+        A nexus with every kind of interval survives a round trip through the
+        binary format, exactly.
+        """
+        nexus = Nexus(1000.25, lambda nexus: NoUserInterface(), 0)
+        nexus.addManualSession(2000.0, 10000.0)
+        first = nexus.addIntention("first", "described", estimate=1234.5)
+        nexus.addIntention("second")
+        nexus.advanceToTime(2000.75)
+        nexus.startPomodoro(first)
+        nexus.advanceToTime(2100.1)
+        pomodoro = nexus._streaks[-1][-1]
+        assert isinstance(pomodoro, Pomodoro)
+        nexus.evaluatePomodoro(pomodoro, EvaluationResult.focused)
+        nexus.advanceToTime(9000.0)
+        nexus.intentions[1].abandoned = True
+        saved = nexusToJSON(nexus)
+        self.assertRoundTrips(saved)
+        self.assertRoundTrips(loads(dumps(saved)))
+
+    def test_numbers(self) -> None:
+        """
+        Integers, timestamps that aren't a whole number of seconds apart, and
+        unusual floats all survive the round trip.
+        """
+        saved = multiYearHistory(0)
+        for value in [0, -5, 2**70, 0.1, -0.0, 1e300, float("inf")]:
+            saved["sessions"].append(
+                {"start": value, "end": 3.0, "automatic": False}
+            )
+        self.assertRoundTrips(saved)
+        saved["sessions"].append(
+            {"start": float("nan"), "end": 3.0, "automatic": False}
+        )
+        self.assertEqual(dumps(unpackNexus(packNexus(saved))), dumps(saved))
+
+    def test_unsupported(self) -> None:
+        """
+        Data in some other format or version, or which is truncated, is
+        rejected with L{UnsupportedFormat}.
+        """
+        packed = packNexus(multiYearHistory(1))
+        with self.assertRaises(UnsupportedFormat):
+            unpackNexus(b"{}")
+        with self.assertRaises(UnsupportedFormat):
+            unpackNexus(packed[:4] + b"\xff" + packed[5:])
+        with self.assertRaises(UnsupportedFormat):
+            unpackNexus(packed[:-3])
+
+    def test_convert(self) -> None:
+        """
+        L{jsonToBinary} and L{binaryToJSON} convert files between the two
+        formats.
+        """
+        directory = mkdtemp()
+        self.addCleanup(rmtree, directory)
+        jsonFile = join(directory, "nexus.json")
+        binaryFile = join(directory, "nexus.pomo")
+        again = join(directory, "again.json")
+        saved = multiYearHistory(1)
+        saveToFile(jsonFile, saved)
+        jsonToBinary(jsonFile, binaryFile)
+        binaryToJSON(binaryFile, again)
+        self.assertEqual(loadFromFile(again), loadFromFile(jsonFile))
+
+    def test_multiYearSize(self) -> None:
+        """
+        On a multi-year history, the binary format is a fraction of the size
+        of JSON.  (How long each takes to save and load is measured by
+        L{benchmarks.binaryFormat}.)
+        """
+        saved = multiYearHistory(3)
+        asJSON = dumps(saved).encode("utf-8")
+        packed = self.assertRoundTrips(saved)
+        self.assertLess(len(packed) * 3, len(asJSON))
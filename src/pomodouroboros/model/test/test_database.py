@@ -0,0 +1,167 @@
+from datetime import datetime
+from json import dumps
+from os.path import join
+from shutil import rmtree
+from tempfile import mkdtemp
+from unittest import TestCase
+
+from ..boundaries import EvaluationResult, NoUserInterface
+from ..database import NexusDatabase, databaseToJSON, jsonToDatabase
+from ..intervals import Pomodoro
+from ..nexus import Nexus
+from ..storage import loadFromFile, nexusFromJSON, nexusToJSON, saveToFile
+from .test_binary import multiYearHistory
+
+
+class NexusDatabaseTests(TestCase):
+    """
+    Tests for L{NexusDatabase}.
+    """
+
+    def setUp(self) -> None:
+        self.directory = mkdtemp()
+        self.addCleanup(rmtree, self.directory)
+        self.nexus = Nexus(1000.25, lambda nexus: NoUserInterface(), 0)
+        self.database = self.newDatabase()
+        self.database.attach(self.nexus)
+
+    def newDatabase(self) -> NexusDatabase:
+        database = NexusDatabase(join(self.directory, "nexus.sqlite"))
+        self.addCleanup(database.close)
+        return database
+
+    def assertReloads(self) -> None:
+        """
+        Loading the database again produces the same nexus.
+        """
+        loaded = self.newDatabase().load(lambda nexus: NoUserInterface())
+        assert loaded is not None
+        self.assertEqual(
+            dumps(nexusToJSON(loaded)), dumps(nexusToJSON(self.nexus))
+        )
+
+    def rowsWritten(self) -> int:
+        before = self.database._connection.total_changes
+        self.database.save()
+        return self.database._connection.total_changes - before
+
+    def test_nothingSaved(self) -> None:
+        """
+        An empty database has no nexus to load.
+        """
+        self.assertIsNone(self.newDatabase().load(lambda n: NoUserInterface()))
+
+    def test_roundTrip(self) -> None:
+        """
+        A nexus with every kind of interval is loaded exactly as it was
+        saved.
+        """
+        self.nexus.addManualSession(2000.0, 10000.0)
+        first = self.nexus.addIntention("first", "described", estimate=1234.5)
+        self.nexus.addIntention("second")
+        self.nexus.advanceToTime(2000.75)
+        self.nexus.startPomodoro(first)
+        self.nexus.advanceToTime(2100.1)
+        pomodoro = self.nexus._streaks[-1][-1]
+        assert isinstance(pomodoro, Pomodoro)
+        self.nexus.evaluatePomodoro(pomodoro, EvaluationResult.focused)
+        self.nexus.advanceToTime(9000.0)
+        self.nexus.intentions[1].abandoned = True
+        self.database.save()
+        self.assertReloads()
+
+    def test_onlyChangedRows(self) -> None:
+        """
+        Once everything has been saved, each save writes only the rows for
+        what changed.
+        """
+        for each in range(20):
+            self.nexus.addIntention(f"intention {each}", estimate=1500.0)
+        self.nexus.addManualSession(2000.0, 100000.0)
+        self.nexus.advanceToTime(2000.0)
+        self.database.save()
+        self.assertEqual(self.rowsWritten(), 5)
+        self.nexus.intentions[3].title = "retitled"
+        # The intention; its estimate, deleted and inserted; its two score
+        # events, likewise; and the header.
+        self.assertEqual(self.rowsWritten(), 1 + 2 + 4 + 5)
+        self.assertReloads()
+        self.nexus.startPomodoro(self.nexus.intentions[4])
+        self.nexus.advanceToTime(2100.0)
+        self.assertLess(self.rowsWritten(), 20)
+        self.assertReloads()
+
+    def test_rewrite(self) -> None:
+        """
+        A change to the history that can't be described as changes to
+        individual rows rewrites all of them.
+        """
+        for each in range(5):
+            self.nexus.addIntention(f"intention {each}")
+        self.database.save()
+        del self.nexus._intentions[2]
+        self.assertGreater(self.rowsWritten(), 5 * 2)
+        self.assertReloads()
+
+    def test_migration(self) -> None:
+        """
+        A nexus can be migrated from JSON to a database and back again.
+        """
+        jsonFile = join(self.directory, "nexus.json")
+        databaseFile = join(self.directory, "migrated.sqlite")
+        again = join(self.directory, "again.json")
+        saved = multiYearHistory(1)
+        saveToFile(jsonFile, saved)
+        jsonToDatabase(jsonFile, databaseFile)
+        databaseToJSON(databaseFile, again)
+        self.assertEqual(loadFromFile(again), loadFromFile(jsonFile))
+
+    def test_queries(self) -> None:
+        """
+        Per-day scores and an intention's pomodoros over a date range come
+        from indexed queries, and agree with the loaded nexus.
+        """
+        nexus = nexusFromJSON(multiYearHistory(1), lambda n: NoUserInterface())
+        self.database.attach(nexus)
+        self.database.save()
+        db = self.database._connection
+
+        start = nexus._initialTime + 86400 * 30
+        end = start + 86400 * 60
+        expected: dict[str, float] = {}
+        for event in nexus.scoreEvents():
+            if start <= event.time <= end:
+                day = datetime.fromtimestamp(event.time).date().isoformat()
+                expected[day] = expected.get(day, 0) + event.points
+        scores = self.database.dailyScores(start, end)
+        self.assertEqual([day for day, points in scores], sorted(expected))
+        for day, points in scores:
+            self.assertAlmostEqual(points, expected[day])
+
+        intention = nexus.intentions[-1]
+        found = self.database.intentionPomodoros(intention.id, 0, end * 2)
+        self.assertEqual(
+            [each["startTime"] for each in found],
+            [each.startTime for each in intention.pomodoros],
+        )
+        self.assertEqual(
+            self.database.intentionPomodoros(intention.id, 0, start), []
+        )
+
+        for query, arguments in [
+            (
+                "select sum(points) from scoreEvents where time between ? and ?",
+                (start, end),
+            ),
+            (
+                "select * from intervals where intentionID = ?"
+                " and startTime between ? and ?",
+                ("1", start, end),
+            ),
+        ]:
+            plan = " ".join(
+                str(row[-1])
+                for row in db.execute("explain query plan " + query, arguments)
+            )
+            self.assertIn("USING", plan)
+            self.assertNotIn("SCAN", plan)
@@ -0,0 +1,186 @@
+from unittest import TestCase
+
+from twisted.internet.task import Clock
+
+from ..boundaries import EvaluationResult, NoUserInterface
+from ..ideal import (
+    PointLossSchedule,
+    idealScore,
+    projectedEvents,
+    simulatedIdealScore,
+)
+from ..intervals import Pomodoro
+from ..nexus import Nexus
+
+
+class IdealScoreEquivalenceTests(TestCase):
+    """
+    L{idealScore} computes its results arithmetically; it must always agree
+    with L{simulatedIdealScore}, which simulates them with L{idealFuture}.
+    """
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.nexus = Nexus(
+            self.clock.seconds(), lambda nexus: NoUserInterface(), 0
+        )
+
+    def advanceTime(self, n: float) -> None:
+        self.clock.advance(n)
+        self.nexus.advanceToTime(self.clock.seconds())
+
+    def assertEquivalent(self) -> None:
+        """
+        Check that L{idealScore} and L{simulatedIdealScore} agree about the
+        current state of the nexus, for work periods of various lengths.
+        """
+        now = self.nexus._lastUpdateTime
+        for length in [0.0, 100.0, 300.0, 1000.0, 4321.0, 20000.0]:
+            with self.subTest(now=now, length=length):
+                fast = idealScore(self.nexus, now, now + length)
+                slow = simulatedIdealScore(self.nexus, now, now + length)
+                self.assertEqual(fast.nextPointLoss, slow.nextPointLoss)
+                self.assertEqual(
+                    fast.scoreBeforeLoss(), slow.scoreBeforeLoss()
+                )
+                self.assertEqual(fast.scoreAfterLoss(), slow.scoreAfterLoss())
+
+    def test_idle(self) -> None:
+        """
+        With nothing going on, the ideal future is a sequence of perfect
+        streaks, with placeholder intentions making up the first 9.
+        """
+        self.advanceTime(1000)
+        self.assertEquivalent()
+        for each in range(12):
+            self.nexus.addIntention(f"intention {each}")
+            self.advanceTime(10)
+            self.assertEquivalent()
+
+    def test_atInitialTime(self) -> None:
+        """
+        Intervals that begin at exactly the nexus's initial time do not count
+        towards the score.
+        """
+        self.assertEquivalent()
+
+    def test_throughStreaks(self) -> None:
+        """
+        At every point through a couple of streaks, whether in a pomodoro,
+        a break, a grace period, or idle after a streak has lapsed, the ideal
+        score agrees with the simulation.
+        """
+        self.advanceTime(1000)
+        intentions = [self.nexus.addIntention(f"i{each}") for each in range(4)]
+        self.nexus.startPomodoro(intentions[0])
+        evaluations = iter(
+            [
+                EvaluationResult.focused,
+                EvaluationResult.distracted,
+                EvaluationResult.achieved,
+            ]
+        )
+        for step in range(160):
+            self.advanceTime(37)
+            active = self.nexus._activeInterval
+            if step % 40 == 5 and isinstance(active, Pomodoro):
+                self.nexus.evaluatePomodoro(
+                    active, next(evaluations, EvaluationResult.focused)
+                )
+            if step in {12, 30, 31, 90}:
+                self.nexus.startPomodoro(intentions[step % 4])
+            self.assertEquivalent()
+
+    def test_pomodoroRunning(self) -> None:
+        """
+        While a pomodoro is running, projecting the ideal future would require
+        evaluating it, so the simulation is used instead.
+        """
+        self.advanceTime(1000)
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.advanceTime(10)
+        self.assertIs(projectedEvents(self.nexus, 1010, 5000), None)
+        self.assertIsNot(projectedEvents(self.nexus, 2000, 5000), None)
+        self.assertEquivalent()
+
+
+class PointLossScheduleTests(TestCase):
+    """
+    A L{PointLossSchedule} answers the same question as L{idealScore} for an
+    idle user, for any time in the state that it was built for.
+    """
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.nexus = Nexus(
+            self.clock.seconds(), lambda nexus: NoUserInterface(), 0
+        )
+
+    def assertScheduleAgrees(self, workPeriodEnd: float) -> None:
+        schedule = PointLossSchedule.build(self.nexus, workPeriodEnd)
+        assert schedule is not None
+        start = self.nexus._lastUpdateTime
+        for now in range(int(start), int(workPeriodEnd) + 10, 50):
+            self.nexus.advanceToTime(now)
+            with self.subTest(now=now):
+                expected = idealScore(self.nexus, now, workPeriodEnd)
+                actual = schedule.pointLoss(now)
+                if expected.nextPointLoss is None:
+                    self.assertIs(actual, None)
+                    continue
+                assert actual is not None
+                self.assertEqual(actual.time, expected.nextPointLoss)
+                self.assertEqual(
+                    actual.scoreBefore, expected.scoreBeforeLoss()
+                )
+                self.assertEqual(actual.scoreAfter, expected.scoreAfterLoss())
+
+    def test_noHistory(self) -> None:
+        """
+        With no history, the schedule covers a whole work period.
+        """
+        self.nexus.advanceToTime(1000)
+        self.assertScheduleAgrees(6000)
+
+    def test_withHistory(self) -> None:
+        """
+        Recorded events and existing intentions are taken into account.
+        """
+        self.nexus.advanceToTime(1000)
+        intention = self.nexus.addIntention("recorded")
+        self.nexus.addIntention("other")
+        self.nexus.startPomodoro(intention)
+        self.nexus.advanceToTime(1300)
+        pomodoro = intention.pomodoros[0]
+        self.nexus.evaluatePomodoro(pomodoro, EvaluationResult.achieved)
+        self.nexus.advanceToTime(3000)
+        self.assertIs(self.nexus._activeInterval, None)
+        self.assertScheduleAgrees(9000)
+
+    def test_notIdle(self) -> None:
+        """
+        No schedule can be built while an interval is running, or at the
+        nexus's initial time.
+        """
+        self.assertIs(PointLossSchedule.build(self.nexus, 1000), None)
+        self.nexus.advanceToTime(10)
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.assertIs(PointLossSchedule.build(self.nexus, 1000), None)
+
+    def test_reusedByNexus(self) -> None:
+        """
+        While idle during a session, the nexus computes the schedule of ideal
+        score drops once, and only recomputes it when the score might change.
+        """
+        self.nexus.addManualSession(1000, 5000)
+        self.nexus.advanceToTime(1100)
+        schedule = self.nexus._pointLossSchedule
+        self.assertIsNot(schedule, None)
+        self.nexus.advanceToTime(1103)
+        self.nexus.advanceToTime(1603)
+        self.assertIs(self.nexus._pointLossSchedule, schedule)
+        self.nexus.addIntention("changes the ideal score")
+        self.assertIs(self.nexus._pointLossSchedule, None)
+        # The next prompt is built once the current one expires.
+        self.nexus.advanceToTime(2001)
+        self.assertIsNot(self.nexus._pointLossSchedule, None)
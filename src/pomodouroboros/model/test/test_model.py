@@ -1,11 +1,19 @@
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Type, TypeVar
+from json import dumps
+from typing import Iterator, Sequence, Type, TypeVar
 from unittest import TestCase
 
 from twisted.internet.interfaces import IReactorTime
 from twisted.internet.task import Clock
 
-from ..boundaries import EvaluationResult, PomStartResult, UIEventListener
+from ..boundaries import (
+    EvaluationResult,
+    NoUserInterface,
+    PomStartResult,
+    ScoreEvent,
+    UIEventListener,
+)
 from ..debugger import debug
 from ..ideal import idealScore
 from ..intention import Estimate, Intention
@@ -16,9 +24,19 @@ from ..intervals import (
     GracePeriod,
     Pomodoro,
     StartPrompt,
+    StreakSummary,
 )
 from ..nexus import Nexus
-from ..observables import Changes, IgnoreChanges, SequenceObserver
+from ..observables import (
+    Changes,
+    IgnoreChanges,
+    ObservableList,
+    SequenceObserver,
+)
+from ..scoring import EstimationAccuracy
+from ..sessions import Session
+from ..sharing import SharedPrefixList
+from ..storage import nexusToJSON
 
 
 @dataclass
@@ -340,6 +358,118 @@ class NexusTests(TestCase):
             self.testUI.actions,
         )
 
+    def test_catchUp(self) -> None:
+        """
+        Advancing over a long stretch of time records every interval that
+        elapsed during it, but only tells the UI that the running interval has
+        ended and that a new one has started where we land.
+        """
+        self.advanceTime(5.0)
+        i = self.nexus.addIntention("i")
+        self.nexus.startPomodoro(i)
+        self.nexus.addManualSession(2000.0, 90000.0)
+        self.advanceTime(3 * 86400.0)
+        self.assertEqual(
+            [
+                TestInterval(
+                    Pomodoro(5.0, i, 5 + 5.0 * 60, indexInStreak=0),
+                    actualStartTime=5.0,
+                    actualEndTime=3 * 86400.0 + 5,
+                    currentProgress=[0.0, 1.0],
+                ),
+            ],
+            self.testUI.actions,
+        )
+        self.assertEqual(
+            [
+                interval
+                for streak in self.nexus._streaks
+                for interval in streak
+            ],
+            [
+                Pomodoro(5.0, i, 5 + 5.0 * 60, indexInStreak=0),
+                Break(5 + 5.0 * 60, 5 + (5 * 60.0 * 2)),
+                GracePeriod(5 + (5 * 60.0 * 2), 5 + (5 * 60.0 * 2) + 600),
+            ],
+        )
+        self.assertEqual(
+            [each.points for each in self.nexus.scoreEvents()], [3, 1, 1]
+        )
+
+    def test_streakSummary(self) -> None:
+        """
+        L{Nexus.streakSummary} is kept up to date as the streak progresses,
+        and starts over with each new streak.
+        """
+        self.advanceTime(10.0)
+        first = self.nexus.addIntention("first")
+        self.nexus.startPomodoro(first)
+        self.assertEqual(self.nexus.streakSummary, StreakSummary(1, 0, 300.0))
+        self.advanceTime(100.0)
+        self.nexus.evaluatePomodoro(
+            first.pomodoros[0], EvaluationResult.focused
+        )
+        self.advanceTime(200.0)
+        self.advanceTime(300.0)
+        self.nexus.startPomodoro(self.nexus.addIntention("second"))
+        self.assertEqual(
+            self.nexus.streakSummary,
+            StreakSummary(
+                2, 1, 900.0, Evaluation(EvaluationResult.focused, 110)
+            ),
+        )
+        self.assertEqual(
+            self.nexus.streakSummary,
+            StreakSummary.build(self.nexus._streaks[-1]),
+        )
+        self.advanceTime(5000.0)
+        self.assertEqual(self.nexus.streakSummary, StreakSummary())
+
+    def test_availableIntentionsStayCurrent(self) -> None:
+        """
+        L{Nexus.availableIntentions} is a live view, which follows intentions
+        being added, completed, abandoned, and restarted, and the history
+        being replaced.
+        """
+
+        def check() -> None:
+            self.assertEqual(
+                list(self.nexus.availableIntentions),
+                [
+                    each
+                    for each in self.nexus.intentions
+                    if not each.completed and not each.abandoned
+                ],
+            )
+
+        self.advanceTime(10.0)
+        view = self.nexus.availableIntentions
+        first = self.nexus.addIntention("first")
+        second = self.nexus.addIntention("second")
+        third = self.nexus.addIntention("third")
+        self.assertEqual(view, [first, second, third])
+        second.abandoned = True
+        self.assertEqual(view, [first, third])
+        self.nexus.startPomodoro(first)
+        self.advanceTime(100.0)
+        self.nexus.evaluatePomodoro(
+            first.pomodoros[0], EvaluationResult.achieved
+        )
+        self.assertEqual(view, [third])
+        check()
+        second.abandoned = False
+        self.assertEqual(view, [second, third])
+        self.advanceTime(1000.0)
+        self.nexus.startPomodoro(first)
+        self.assertEqual(view, [first, second, third])
+        self.assertIs(self.nexus.availableIntentions, view)
+        check()
+        # Replacing the history rebuilds the same view.
+        del self.nexus._intentions[1]
+        self.assertEqual(view, [first, third])
+        self.assertIs(self.nexus.availableIntentions, view)
+        check()
+
     def test_story(self) -> None:
         """
         Full story testing various features of a day of using Pomodouroboros.
@@ -617,9 +747,9 @@ class NexusTests(TestCase):
             + (2 * points_for_break),
         )
 
-        from json import dumps, loads
+        from json import loads
 
-        from ..storage import nexusFromJSON, nexusToJSON
+        from ..storage import nexusFromJSON
 
         self.nexus.intentions[-1].abandoned = True
         roundTrip = nexusFromJSON(
@@ -770,3 +900,323 @@ class NexusTests(TestCase):
         self.nexus.evaluatePomodoro(pom, EvaluationResult.focused)
         after = currentPoints()
         self.assertEqual(after - before, 1.0)
+
+    def test_estimationAccuracy(self) -> None:
+        """
+        Completing an intention scores the best of its 10 most recent
+        estimates, each capped lower the older it is.
+        """
+        hour = 60.0 * 60.0
+
+        def accuracy(*durations: float) -> int:
+            intention = Intention(1, 0.0, 0.0, "title", "description")
+            intention.estimates.extend(
+                Estimate(duration * hour, 0.0) for duration in durations
+            )
+            intention.pomodoros.append(
+                Pomodoro(
+                    0.0,
+                    intention,
+                    hour,
+                    0,
+                    Evaluation(EvaluationResult.achieved, 2 * hour),
+                )
+            )
+            [event] = [
+                each
+                for each in intention.intentionScoreEvents(0)
+                if isinstance(each, EstimationAccuracy)
+            ]
+            return event.points
+
+        # an estimate 51 hours off scores 5, whether it is alone or the newest
+        self.assertEqual(accuracy(52), 5)
+        self.assertEqual(accuracy(*[1] * 11, 52), 5)
+        # the 10th most recent estimate is capped at 1 point, and the 11th
+        # isn't scored at all
+        self.assertEqual(accuracy(52, *[1] * 9), 1)
+        self.assertEqual(accuracy(52, *[1] * 10), 0)
+
+    def test_scoreIndexStaysCurrent(self) -> None:
+        """
+        Once the score index has been built by querying L{Nexus.scoreEvents},
+        new intentions, estimates, intervals and evaluations are reflected in
+        subsequent queries, exactly as if every event were examined.
+        """
+
+        def everyEvent(startTime: float, endTime: float) -> list[ScoreEvent]:
+            result: list[ScoreEvent] = []
+            for idx, intention in enumerate(self.nexus.intentions):
+                result.extend(intention.intentionScoreEvents(idx))
+            result = [e for e in result if startTime <= e.time <= endTime]
+            for streak in self.nexus._streaks:
+                for interval in streak:
+                    if interval.startTime > startTime:
+                        result.extend(
+                            e
+                            for e in interval.scoreEvents()
+                            if startTime <= e.time <= endTime
+                        )
+            return result
+
+        def check() -> None:
+            for start, end in [(0.0, 99999.0), (1000.0, 1400.0), (1301, 1302)]:
+                indexed = list(
+                    self.nexus.scoreEvents(startTime=start, endTime=end)
+                )
+                # Events at the same time may appear in any order.
+                self.assertEqual(
+                    [e.time for e in indexed],
+                    sorted(e.time for e in indexed),
+                )
+                self.assertEqual(
+                    sorted((e.time, e.points) for e in indexed),
+                    sorted((e.time, e.points) for e in everyEvent(start, end)),
+                )
+
+        self.advanceTime(1000)
+        check()
+        first = self.nexus.addIntention("first")
+        second = self.nexus.addIntention("second", estimate=300.0)
+        check()
+        self.nexus.startPomodoro(first)
+        self.advanceTime(301)
+        check()
+        pom = first.pomodoros[0]
+        self.nexus.evaluatePomodoro(pom, EvaluationResult.achieved)
+        check()
+        self.advanceTime(300)
+        self.nexus.startPomodoro(second)
+        self.advanceTime(1000)
+        check()
+        self.assertEqual(len(list(self.nexus.scoreEvents())), 9)
+        # Intentions changed directly, rather than through the nexus, are
+        # reflected too.
+        first.estimates = [Estimate(duration=300.0, madeAt=1000.0)]
+        check()
+        self.assertEqual(len(list(self.nexus.scoreEvents())), 11)
+
+    def test_historyObservers(self) -> None:
+        """
+        Each L{HistoryObserver} added with L{Nexus.addHistoryObserver} is told
+        about each change to the history, until it is removed.
+        """
+        changes: list[tuple[object, ...]] = []
+
+        class Recorder:
+            def intentionAppended(
+                self, position: int, intention: Intention
+            ) -> None:
+                changes.append(("intention", position, intention.title))
+
+            def intentionChanged(self, intention: Intention, key: str) -> None:
+                changes.append(("changed", intention.title, key))
+
+            def streakAppended(
+                self, position: int, streak: Sequence[AnyInterval]
+            ) -> None:
+                changes.append(("streak", position))
+
+            def intervalAppended(self, interval: AnyInterval) -> None:
+                changes.append(("interval", type(interval).__name__))
+
+            def sessionsChanged(self) -> None:
+                changes.append(("sessions",))
+
+            def historyReplaced(self) -> None:
+                changes.append(("replaced",))
+
+        recorder = Recorder()
+        self.nexus.addHistoryObserver(recorder)
+        first = self.nexus.addIntention("first")
+        self.nexus.startPomodoro(first)
+        self.nexus.evaluatePomodoro(
+            first.pomodoros[0], EvaluationResult.achieved
+        )
+        self.nexus.addManualSession(1000.0, 2000.0)
+        first.abandoned = True
+        del self.nexus._intentions[0]
+        self.assertEqual(
+            changes,
+            [
+                ("intention", 0, "first"),
+                ("interval", "Pomodoro"),
+                ("changed", "first", "pomodoros"),
+                ("interval", "Break"),
+                ("sessions",),
+                ("changed", "first", "abandoned"),
+                ("replaced",),
+            ],
+        )
+        self.nexus.removeHistoryObserver(recorder)
+        self.nexus.addIntention("second")
+        self.assertEqual(len(changes), 7)
+
+
+class ForkTests(TestCase):
+    """
+    Tests for forking a L{Nexus} with L{Nexus.cloneWithoutUI}.
+    """
+
+    def setUp(self) -> None:
+        self.nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+
+    def test_forkLeavesOriginalAlone(self) -> None:
+        """
+        Changing shared intentions and intervals in a fork copies them, so the
+        L{Nexus} that it was forked from is left unchanged.
+        """
+        self.nexus.advanceToTime(1000)
+        first = self.nexus.addIntention("first")
+        second = self.nexus.addIntention("second")
+        self.nexus.startPomodoro(first)
+        self.nexus.advanceToTime(1100)
+        before = dumps(nexusToJSON(self.nexus))
+
+        fork = self.nexus.cloneWithoutUI()
+        running = fork._activeInterval
+        assert isinstance(running, Pomodoro)
+        self.assertIs(running, first.pomodoros[0])
+        fork.evaluatePomodoro(running, EvaluationResult.achieved)
+        # Achieving it early began a break, followed by a grace period.
+        fork.advanceToTime(1500)
+        self.assertEqual(fork.startPomodoro(second), PomStartResult.Continued)
+        fork.addIntention("third")
+        fork.advanceToTime(5000)
+
+        self.assertEqual(dumps(nexusToJSON(self.nexus)), before)
+        self.assertEqual(first.pomodoros[0].evaluation, None)
+        self.assertEqual(second.pomodoros, [])
+        self.assertEqual(
+            [each.completed for each in fork.intentions],
+            [True, False, False],
+        )
+        self.assertEqual(len(fork.intentions[1].pomodoros), 1)
+        # The original can still be forked and advanced as usual.
+        self.nexus.advanceToTime(1200)
+        self.assertEqual(
+            len(list(self.nexus.cloneWithoutUI().scoreEvents())),
+            len(list(self.nexus.scoreEvents())),
+        )
+
+    def test_forkLeavesObserversAlone(self) -> None:
+        """
+        Forking a L{Nexus} doesn't take over observing the intentions that the
+        fork shares with it, so it still keeps up with changes to them.
+        """
+        first = self.nexus.addIntention("first")
+        self.assertEqual(list(self.nexus.availableIntentions), [first])
+        self.nexus.cloneWithoutUI()
+        first.abandoned = True
+        self.assertEqual(list(self.nexus.availableIntentions), [])
+
+    def test_forkSharesHistory(self) -> None:
+        """
+        Forking a L{Nexus} doesn't copy its history: the fork's streaks and
+        intentions are views onto the original's, and every streak but the
+        current one is the original's own object.
+        """
+        streaks: ObservableList[ObservableList[AnyInterval]] = ObservableList(
+            IgnoreChanges,
+            [
+                ObservableList(
+                    IgnoreChanges, [Break(each * 10.0, each * 10.0 + 5)]
+                )
+                for each in range(1000)
+            ],
+        )
+        self.nexus = Nexus(
+            0.0,
+            lambda nexus: NoUserInterface(),
+            0,
+            _streaks=streaks,
+            _lastUpdateTime=10000.0,
+        )
+        self.nexus.addIntention("first")
+        fork = self.nexus.cloneWithoutUI()
+
+        forkedStreaks = fork._streaks._storage
+        assert isinstance(forkedStreaks, SharedPrefixList)
+        self.assertIs(forkedStreaks._base, streaks)
+        self.assertEqual(forkedStreaks._length, 999)
+        self.assertEqual(forkedStreaks._overrides, {})
+        self.assertEqual(len(forkedStreaks._tail), 1)
+        for original, forked in zip(streaks[:-1], fork._streaks):
+            self.assertIs(forked, original)
+
+        current = fork._streaks[-1]._storage
+        assert isinstance(current, SharedPrefixList)
+        self.assertIs(current._base, streaks[-1])
+        assert isinstance(fork._intentions, ObservableList)
+        intentions = fork._intentions._storage
+        assert isinstance(intentions, SharedPrefixList)
+        self.assertIs(intentions._base, self.nexus._intentions)
+
+
+class SessionTests(TestCase):
+    """
+    Tests for a L{Nexus}'s sessions.
+    """
+
+    def setUp(self) -> None:
+        self.nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+
+    def test_cachesInvalidated(self) -> None:
+        """
+        The active interval and session are cached, but the caches are
+        discarded when sessions or intervals are added.
+        """
+        self.nexus.advanceToTime(100.0)
+        self.assertIs(self.nexus._activeSession(), None)
+        self.assertIs(self.nexus._activeInterval, None)
+        self.nexus.addManualSession(50.0, 150.0)
+        self.assertEqual(self.nexus._activeSession(), Session(50, 150, False))
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.assertIsInstance(self.nexus._activeInterval, Pomodoro)
+        self.nexus.advanceToTime(150.0)
+        self.assertIs(self.nexus._activeSession(), None)
+
+    def test_addSessions(self) -> None:
+        """
+        L{Nexus.addManualSession} keeps sessions sorted with a single
+        insertion, or merges them with overlapping and adjacent manual
+        sessions when asked to coalesce.
+        """
+        changes: list[tuple[str, object]] = []
+
+        @dataclass
+        class Recorder:
+            @contextmanager
+            def added(self, key: object, new: object) -> Iterator[None]:
+                yield
+                changes.append(("added", key))
+
+            @contextmanager
+            def removed(self, key: object, old: object) -> Iterator[None]:
+                yield
+                changes.append(("removed", key))
+
+            @contextmanager
+            def changed(
+                self, key: object, old: object, new: object
+            ) -> Iterator[None]:
+                yield
+                changes.append(("changed", key))
+
+        nexus = Nexus(
+            0.0,
+            lambda nexus: NoUserInterface(),
+            0,
+            _sessions=ObservableList(Recorder()),
+        )
+        nexus.addManualSession(300, 400)
+        nexus.addManualSession(100, 200)
+        nexus.addManualSession(500, 600)
+        self.assertEqual(changes, [("added", 0), ("added", 0), ("added", 2)])
+        nexus.addManualSession(200, 350, coalesce=True)
+        self.assertEqual(
+            list(nexus._sessions),
+            [Session(100, 400, False), Session(500, 600, False)],
+        )
+        nexus.addManualSession(700, 800, coalesce=True)
+        self.assertEqual(len(nexus._sessions), 3)
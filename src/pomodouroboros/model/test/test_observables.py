@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from copy import deepcopy
 from dataclasses import dataclass, field
 from io import StringIO
-from typing import Any, Iterator
+from typing import Any, Iterator, Sequence
+from weakref import ref
 
 from twisted.trial.unittest import SynchronousTestCase as TC
 
+from ..intention import Intention
 from ..observables import (
+    Batch,
+    Change,
+    ChangeKind,
     Changes,
     DebugChanges,
     IgnoreChanges,
@@ -19,7 +25,9 @@ from ..observables import (
     ObservableList,
     Observer,
     PathObserver,
+    batch,
     build,
+    noop,
     observable,
 )
 
@@ -155,6 +163,46 @@ class TestObservables(TC):
         del o[3:7]
         self.assertEqual(a, b)
 
+    def test_bulkOperations(self) -> None:
+        """
+        Extending, clearing, and reversing an L{ObservableList}, and removing
+        a value from it, each notify its observer just once.
+        """
+        io = StringIO()
+        mirror: list[str] = []
+        o: ObservableList[str] = ObservableList(
+            DebugChanges(MirrorList(mirror), io), []
+        )
+        o.extend(["1", "2"])
+        o += ["3", "4"]
+        o.reverse()
+        o.remove("3")
+        self.assertEqual(o, ["4", "2", "1"])
+        self.assertEqual(mirror, ["4", "2", "1"])
+        o.clear()
+        o.extend([])
+        o.reverse()
+        self.assertEqual(mirror, [])
+        self.assertEqual(
+            io.getvalue().splitlines(),
+            [
+                "will add slice(0, 2, None) ['1', '2']",
+                "did add slice(0, 2, None) ['1', '2']",
+                "will add slice(2, 4, None) ['3', '4']",
+                "did add slice(2, 4, None) ['3', '4']",
+                "will change slice(0, 4, None) from ['1', '2', '3', '4']"
+                " to ['4', '3', '2', '1']",
+                "did change slice(0, 4, None) from ['1', '2', '3', '4']"
+                " to ['4', '3', '2', '1']",
+                "will remove 1 '3'",
+                "did remove 1 '3'",
+                "will remove slice(0, 3, None) ['4', '2', '1']",
+                "did remove slice(0, 3, None) ['4', '2', '1']",
+            ],
+        )
+        with self.assertRaises(ValueError):
+            o.remove("missing")
+
     def test_mirrorDict(self) -> None:
         """
         A L{MirrorDict} can update from one dictionary to another.
@@ -212,6 +260,317 @@ class TestObservables(TC):
             ],
         )
 
+    def test_batch(self) -> None:
+        """
+        During a L{batch}, a L{Batch} holds on to its notifications, then
+        reports them, coalesced, once the batch is done, with the changes
+        already made; outside of one, it passes them along as they happen.
+        """
+        cr = ChangeRecorder(None)
+        example = Example.new(Batch(cr), "John", 30)
+        cr.example = example
+        del cr.changes[:]
+        with batch(example.observer):
+            example.value1 = "x"
+            example.value1 = "y"
+            example.value2 = 3
+            example.valueList.append("hello")
+            self.assertEqual(cr.changes, [])
+        self.assertEqual(
+            cr.changes,
+            [
+                ("will change", "value1", "y", "John", "y"),
+                ("did change", "value1", "y", "John", "y"),
+                ("will change", "value2", 3, 30, 3),
+                ("did change", "value2", 3, 30, 3),
+                ("will add", "list.0", "not found"),
+                ("did add", "list.0", "not found"),
+            ],
+        )
+        del cr.changes[:]
+        example.value2 = 4
+        self.assertEqual(
+            cr.changes,
+            [
+                ("will change", "value2", 3, 3, 4),
+                ("did change", "value2", 4, 3, 4),
+            ],
+        )
+
+    def test_batchChangeSet(self) -> None:
+        """
+        A L{ChangeSetObserver} beneath a L{Batch} is given everything that
+        changed during the outermost L{batch} at once; changes that undo each
+        other cancel out, and changes to a sequence are all kept, in order.
+        """
+        cs = ChangeSetRecorder()
+        d: ObservableDict[str, int] = ObservableDict(Batch(cs))
+        values: ObservableList[int] = ObservableList(Batch(cs))
+        with batch(d.observer, values.observer):
+            d["gone"] = 1
+            d["kept"] = 2
+            with batch(d.observer):
+                del d["gone"]
+                d["kept"] = 3
+            values.append(1)
+            values.append(2)
+            values[0] = 5
+            self.assertEqual(cs.changeSets, [])
+        self.assertEqual(
+            cs.changeSets,
+            [
+                [Change(ChangeKind.added, "kept", new=3)],
+                [
+                    Change(ChangeKind.added, 0, new=1),
+                    Change(ChangeKind.added, 1, new=2),
+                    Change(ChangeKind.changed, 0, 1, 5),
+                ],
+            ],
+        )
+
+    def test_batchFailed(self) -> None:
+        """
+        If the body of a L{batch} fails, the changes made before it failed are
+        still delivered.
+        """
+        cs = ChangeSetRecorder()
+        d: ObservableDict[str, int] = ObservableDict(Batch(cs))
+        with self.assertRaises(ZeroDivisionError):
+            with batch(d.observer):
+                d["one"] = 1
+                d["two"] = 1 // 0
+        self.assertEqual(
+            cs.changeSets, [[Change(ChangeKind.added, "one", new=1)]]
+        )
+
+
+class SlottedTests(TC):
+    """
+    Tests for L{observable} classes with C{slots=True}.
+    """
+
+    def test_sameNotifications(self) -> None:
+        """
+        A slotted observable notifies its observer of exactly the same changes
+        as one backed by its C{__dict__}.
+        """
+
+        def changes(cls: type[TerseColor] | type[SlottedColor]) -> list[Any]:
+            cr = ChangeRecorder(None)
+            color = cls(cr, "fullred", 1, 0, 0)
+            cr.example = color
+            color.name = "fullblue"
+            color.r = 0
+            del color.b
+            color.b = 1
+            with self.assertRaises(AttributeError):
+                del color.nothing  # type:ignore[union-attr]
+            return cr.changes
+
+        self.assertEqual(changes(SlottedColor), changes(TerseColor))
+
+    def test_slots(self) -> None:
+        """
+        A slotted observable has no C{__dict__}, but can still be weakly
+        referenced, copied without notifying anyone, and compared.
+        """
+        cr = ChangeRecorder(None)
+        color = SlottedColor(cr, "fullred", 1, 0, 0)
+        self.assertFalse(hasattr(color, "__dict__"))
+        with self.assertRaises(AttributeError):
+            color.other = 1  # type:ignore[attr-defined]
+        self.assertIs(ref(color)(), color)
+        del cr.changes[:]
+        copied = deepcopy(color)
+        self.assertEqual(cr.changes, [])
+        self.assertEqual(copied, color)
+        self.assertEqual(copied.tuplify(), ("fullred", 1, 0, 0))
+
+    def test_observerLast(self) -> None:
+        """
+        A slotted observable whose observer comes after its other fields
+        treats it as L{IgnoreChanges} until it is set.
+        """
+        hdo = SlottedObserverLast(1)
+        cr = ChangeRecorder(hdo)
+        hdo.observer = cr
+        hdo.value = 2
+        self.assertEqual(
+            cr.changes,
+            [
+                ("will change", "value", 1, 1, 2),
+                ("did change", "value", 2, 1, 2),
+            ],
+        )
+
+    def test_intention(self) -> None:
+        """
+        L{Intention} is slotted, so it has no C{__dict__}, but can still be
+        weakly referenced, as paging needs.
+        """
+        intention = Intention(1, 0.0, 0.0, "title", "description")
+        self.assertFalse(hasattr(intention, "__dict__"))
+        self.assertIs(ref(intention)(), intention)
+        with self.assertRaises(AttributeError):
+            intention.other = 1  # type:ignore[attr-defined]
+
+
+class IgnoringTests(TC):
+    """
+    Tests for the fast path that observables take when their observer is
+    L{IgnoreChanges}.
+    """
+
+    def test_notNotified(self) -> None:
+        """
+        Observables don't notify L{IgnoreChanges}, either the class itself or
+        an instance of it, of their changes at all.
+        """
+
+        def notified(*args: object) -> Any:
+            raise AssertionError(f"IgnoreChanges notified of {args}")
+
+        for name in ["added", "removed", "changed"]:
+            self.patch(IgnoreChanges, name, notified)
+        ignorers: list[Changes[Any, Any]] = [IgnoreChanges, IgnoreChanges()]
+        for ignoring in ignorers:
+            values: ObservableList[int] = ObservableList(ignoring, [])
+            values.append(1)
+            values.extend([2, 3])
+            values[0] = 4
+            del values[-1]
+            values.clear()
+            mapping: ObservableDict[str, int] = ObservableDict(ignoring, {})
+            mapping["one"] = 1
+            mapping["one"] = 2
+            del mapping["one"]
+            examples: list[HasDefaultObserver | SlottedObserverLast] = [
+                HasDefaultObserver(0),
+                SlottedObserverLast(0),
+            ]
+            for example in examples:
+                example.observer = ignoring
+                example.value = 1
+                del example.value
+
+    def test_extendSelf(self) -> None:
+        """
+        An observable list ignoring its changes can be extended with itself,
+        with C{extend} or with C{+=}, as a list can.
+        """
+        ignorers: list[Changes[Any, Any]] = [IgnoreChanges, IgnoreChanges()]
+        for ignoring in ignorers:
+            values: ObservableList[int] = ObservableList(ignoring, [1, 2])
+            values.extend(values)
+            self.assertEqual(values, [1, 2, 1, 2])
+            values += values
+            self.assertEqual(values, [1, 2, 1, 2, 1, 2, 1, 2])
+
+
+class PathTests(TC):
+    """
+    Tests for L{PathObserver}.
+    """
+
+    def test_paths(self) -> None:
+        """
+        Changes to nested observables are reported with the path to them,
+        including changes to several list elements at once.
+        """
+        keys = KeyRecorder()
+        root: PathObserver[object, object] = PathObserver(keys, "")
+        example = Example(root, "one", 1, ObservableList(root.child("l"), []))
+        example.value1 = "two"
+        example.valueList.append("x")
+        example.valueList.extend(["y", "z"])
+        example.valueList[0] = "w"
+        nested: ObservableDict[str, int] = ObservableDict(
+            root.child("l").child("d"), {}
+        )
+        nested["k"] = 1
+        self.assertEqual(
+            keys.keys,
+            ["value1", "value2", "valueList"]
+            + ["value1", "l.0", "l.slice(1, 3, None)", "l.0", "l.d.k"],
+        )
+
+    def test_remembered(self) -> None:
+        """
+        Notifying about the same key again reports the same path string,
+        rather than building a new one, and asking for the same child again
+        gives the same observer.
+        """
+        keys = KeyRecorder()
+        root: PathObserver[object, object] = PathObserver(keys, "a")
+        self.assertIs(root.child("b"), root.child("b"))
+        child = root.child("b")
+        for each in range(2):
+            with child.changed("value", 1, 2), child.changed(7, 1, 2):
+                pass
+        self.assertEqual(keys.keys, ["a.b.value", "a.b.7"] * 2)
+        self.assertIs(keys.keys[0], keys.keys[2])
+        self.assertIs(keys.keys[1], keys.keys[3])
+
+    def test_bounded(self) -> None:
+        """
+        Only the most recent list indices, dictionary keys and children are
+        remembered, but the paths reported for the others are still right.
+        """
+        keys = KeyRecorder()
+        root: PathObserver[object, object] = PathObserver(
+            keys, "", remembered=3
+        )
+        values: ObservableList[int] = ObservableList(root, [])
+        for each in range(10):
+            values.append(each)
+        values[2] = 20
+        children = [root.child(str(each)) for each in range(10)]
+        nested: PathObserver[str, int] = PathObserver(keys, "d", remembered=3)
+        names: ObservableDict[str, int] = ObservableDict(nested, {})
+        for each in range(10):
+            names[f"key{each}"] = each
+        self.assertEqual(len(root._indices), 3)
+        self.assertEqual(len(nested._names), 3)
+        self.assertEqual(len(root._children), 3)
+        self.assertIs(root.child("9"), children[9])
+        self.assertIsNot(root.child("0"), children[0])
+        self.assertEqual(
+            keys.keys,
+            [str(each) for each in range(10)]
+            + ["2"]
+            + [f"d.key{each}" for each in range(10)],
+        )
+
+
+@dataclass
+class KeyRecorder:
+    keys: list[str] = field(default_factory=list)
+
+    def added(self, key: str, new: object) -> Any:
+        self.keys.append(key)
+        return noop()
+
+    def removed(self, key: str, old: object) -> Any:
+        self.keys.append(key)
+        return noop()
+
+    def changed(self, key: str, old: object, new: object) -> Any:
+        self.keys.append(key)
+        return noop()
+
+
+@dataclass
+class ChangeSetRecorder:
+    changeSets: list[list[Change]] = field(default_factory=list)
+
+    def added(self, key: object, new: object) -> Any:
+        raise AssertionError("should be batched")
+
+    removed = changed = added
+
+    def committed(self, changes: Sequence[Change]) -> None:
+        self.changeSets.append(list(changes))
+
 
 @observable()
 class TerseColor:
@@ -225,6 +584,24 @@ class TerseColor:
         return (self.name, self.r, self.g, getattr(self, "b", None))
 
 
+@observable(slots=True)
+class SlottedColor:
+    observer: Observer
+    name: str
+    r: float
+    g: float
+    b: float
+
+    def tuplify(self) -> tuple[str, float, float, float | None]:
+        return (self.name, self.r, self.g, getattr(self, "b", None))
+
+
+@observable(slots=True)
+class SlottedObserverLast:
+    value: int
+    observer: Observer = field(default_factory=IgnoreChanges)
+
+
 @dataclass
 class VerboseColor:
     name: str
@@ -0,0 +1,409 @@
+from gc import collect
+from json import dumps
+from os import listdir
+from os.path import basename, dirname, getsize, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from tracemalloc import get_traced_memory, start, stop
+from typing import Any, Callable, cast
+from unittest import TestCase
+
+from ..boundaries import EvaluationResult, NoUserInterface
+from ..database import NexusDatabase
+from ..intervals import Pomodoro
+from ..nexus import Nexus
+from ..observables import IgnoreChanges, ObservableList
+from ..paging import HistoryPager, byMonth, byWeek, loadDefaultHistory
+from ..schema import SavedNexus
+from ..storage import loadFromFile, nexusFromJSON, nexusToJSON
+from .test_binary import multiYearHistory
+
+
+def finishedHistory(years: int) -> SavedNexus:
+    """
+    Make up a saved nexus like L{multiYearHistory}, but where all but a few of
+    the intentions that weren't achieved were abandoned, so that almost all of
+    its history is finished with.
+    """
+    saved = multiYearHistory(years)
+    achieved = {
+        interval["intentionID"]
+        for streak in saved["streaks"]
+        for interval in streak
+        if interval["intervalType"] == "Pomodoro"
+        and interval["evaluation"] is not None
+        and interval["evaluation"]["result"] == "achieved"
+    }
+    for position, intention in enumerate(saved["intentions"]):
+        # Leave out estimates, so that achieved intentions only score points
+        # for being completed.
+        intention["estimates"] = []
+        if intention["id"] not in achieved and (
+            position % 50 or position >= 1000
+        ):
+            intention["abandoned"] = True
+    return saved
+
+
+def loadHistory(years: int) -> Nexus:
+    return nexusFromJSON(
+        finishedHistory(years), lambda nexus: NoUserInterface()
+    )
+
+
+class HistoryPagerTests(TestCase):
+    """
+    Tests for L{HistoryPager}.
+    """
+
+    def setUp(self) -> None:
+        self.directory = mkdtemp()
+        self.addCleanup(rmtree, self.directory)
+        self.reference = loadHistory(1)
+        self.nexus = loadHistory(1)
+        self.pager = HistoryPager(self.directory)
+        self.pager.attach(self.nexus)
+
+    def shardFiles(self) -> dict[str, bytes]:
+        contents = {}
+        for name in listdir(self.directory):
+            if name.endswith(".backups"):
+                continue
+            with open(join(self.directory, name), "rb") as f:
+                contents[name] = f.read()
+        return contents
+
+    def test_pagedOut(self) -> None:
+        """
+        Attaching a L{HistoryPager} pages out everything but the current
+        streak, and all of the intentions, keeping those still open, or with
+        pomodoros in the current streak, pinned, without changing the
+        L{Nexus}.
+        """
+        self.assertEqual(len(self.pager._streaks.tail), 1)
+        self.assertEqual(len(self.pager._intentions.tail), 0)
+        self.assertLessEqual(len(self.pager._sessions.tail), 31)
+        current = [
+            interval.intention
+            for interval in self.nexus._streaks[-1]
+            if isinstance(interval, Pomodoro)
+        ]
+        self.assertEqual(
+            sorted(intention.id for intention in self.pager._pinned.values()),
+            sorted(
+                {
+                    intention.id
+                    for intention in [
+                        *self.nexus.availableIntentions,
+                        *current,
+                    ]
+                }
+            ),
+        )
+        self.assertEqual(
+            dumps(nexusToJSON(self.nexus)), dumps(nexusToJSON(self.reference))
+        )
+
+    def assertShardedBy(
+        self, pager: HistoryPager, shardBy: Callable[[float], str]
+    ) -> None:
+        """
+        The manifest in the given L{HistoryPager}'s live file lists a shard
+        for each period of its history, in order, mapping the span of time
+        it covers to the history it holds.
+        """
+        live = cast(dict[str, Any], loadFromFile(pager.liveFile))
+        shards = live["shards"]
+        self.assertEqual(
+            [shard["period"] for shard in shards],
+            [shardBy(shard["start"]) for shard in shards],
+        )
+        self.assertEqual(
+            sorted(listdir(pager.directory)),
+            sorted(
+                [
+                    *(shard["filename"] for shard in shards),
+                    "live.json",
+                    "live.json.backups",
+                ]
+            ),
+        )
+        for earlier, later in zip(shards, shards[1:]):
+            self.assertLess(earlier["period"], later["period"])
+            self.assertLess(earlier["end"], later["start"])
+            for kind, (start, stop) in later["ranges"].items():
+                self.assertEqual(start, earlier["ranges"][kind][1])
+
+    def test_shards(self) -> None:
+        """
+        By default, each shard holds a month of history.
+        """
+        self.assertShardedBy(self.pager, byMonth)
+        self.assertIn(len(self.pager._shards), {9, 10})
+
+    def test_weekly(self) -> None:
+        """
+        History can be sharded by week instead.
+        """
+        directory = mkdtemp()
+        self.addCleanup(rmtree, directory)
+        pager = HistoryPager(directory, shardBy=byWeek)
+        pager.attach(self.reference)
+        self.assertShardedBy(pager, byWeek)
+        self.assertIn(len(pager._shards), {36, 37})
+        self.assertEqual(
+            dumps(nexusToJSON(self.nexus)), dumps(nexusToJSON(self.reference))
+        )
+
+    def test_reload(self) -> None:
+        """
+        Loading the L{Nexus} again reads only the live file, which is a small
+        part of its history; the rest is read from the shards when it's
+        needed.
+        """
+        self.nexus.addIntention("new")
+        self.nexus.advanceToTime(self.nexus._lastUpdateTime + 100.0)
+        self.pager.save()
+        pager = HistoryPager(self.directory)
+        loaded = pager.load(lambda nexus: NoUserInterface())
+        assert loaded is not None
+        self.assertEqual(pager._recent, {})
+        sizes = {name: len(data) for name, data in self.shardFiles().items()}
+        self.assertLess(sizes["live.json"] * 20, sum(sizes.values()))
+        self.assertEqual(
+            dumps(nexusToJSON(loaded)), dumps(nexusToJSON(self.nexus))
+        )
+
+    def damage(self, filename: str) -> None:
+        with open(filename, "r+") as f:
+            f.seek(getsize(filename) // 2)
+            f.write("#")
+
+    def test_recoverLiveFile(self) -> None:
+        """
+        If the live file is damaged, the newest intact version of it is
+        recovered from its backups, along with the shards that it refers to.
+        """
+        self.nexus.addIntention("new")
+        self.nexus.advanceToTime(self.nexus._lastUpdateTime + 100.0)
+        self.pager.save()
+        self.damage(self.pager.liveFile)
+        loaded = HistoryPager(self.directory).load(
+            lambda nexus: NoUserInterface()
+        )
+        assert loaded is not None
+        self.assertEqual(
+            dumps(nexusToJSON(loaded)), dumps(nexusToJSON(self.nexus))
+        )
+
+    def test_corruptHistory(self) -> None:
+        """
+        If no intact version of the live file can be found,
+        L{loadDefaultHistory} sets the damaged history aside, under a name
+        that no earlier damaged history has, and tells the user that it is
+        starting a new one.
+        """
+        descriptions: list[str] = []
+
+        class Describing(NoUserInterface):
+            def describeCurrentState(self, description: str) -> None:
+                descriptions.append(description)
+
+        def damageEverything() -> None:
+            backups = self.pager._snapshot.backupDirectory
+            for name in listdir(backups):
+                self.damage(join(backups, name))
+            self.damage(self.pager.liveFile)
+
+        self.addCleanup(rmtree, self.directory + ".corrupt")
+        self.addCleanup(rmtree, self.directory + ".corrupt-2")
+        damageEverything()
+        self.pager = loadDefaultHistory(
+            0.0, lambda nexus: Describing(), self.directory
+        )
+        assert self.pager.nexus is not None
+        self.assertEqual(len(self.pager.nexus.intentions), 0)
+        self.assertEqual(len(descriptions), 1)
+        self.assertIn(self.directory + ".corrupt", descriptions[0])
+        self.pager.nexus.addIntention("new")
+        self.pager.save()
+        self.pager.save()
+        damageEverything()
+        self.pager = loadDefaultHistory(
+            0.0, lambda nexus: Describing(), self.directory
+        )
+        self.assertEqual(len(descriptions), 2)
+        self.assertIn(self.directory + ".corrupt-2", descriptions[1])
+        self.assertEqual(
+            sorted(
+                name
+                for name in listdir(dirname(self.directory))
+                if name.startswith(basename(self.directory))
+            ),
+            [
+                basename(self.directory),
+                basename(self.directory) + ".corrupt",
+                basename(self.directory) + ".corrupt-2",
+            ],
+        )
+
+    def test_nothingSaved(self) -> None:
+        """
+        There is nothing to load from an empty directory.
+        """
+        directory = mkdtemp()
+        self.addCleanup(rmtree, directory)
+        self.assertIsNone(
+            HistoryPager(directory).load(lambda nexus: NoUserInterface())
+        )
+
+    def test_newStreaks(self) -> None:
+        """
+        Each closed streak is paged out by the next save after the next one
+        is started, which writes only its shard and the live file, and only
+        once the function returned by L{HistoryPager.prepareSave} is run.
+        """
+        self.nexus.addManualSession(2_000_000_000.0, 2_000_001_000.0)
+        paged = self.pager._streaks.paged
+        before = self.shardFiles()
+        self.nexus._streaks.append(ObservableList(IgnoreChanges))
+        self.assertEqual(self.pager._streaks.paged, paged)
+        write = self.pager.prepareSave()
+        self.assertEqual(self.pager._streaks.paged, paged + 1)
+        self.assertEqual(self.shardFiles(), before)
+        write()
+        after = self.shardFiles()
+        self.assertEqual(len(self.pager._streaks.tail), 1)
+        changed = {name for name in after if before.get(name) != after[name]}
+        self.assertEqual(
+            changed, {self.pager._shards[-1].filename, "live.json"}
+        )
+
+    def test_staleLiveFile(self) -> None:
+        """
+        If a shard was written but the live file referring to it wasn't, the
+        L{Nexus} is loaded as of the live file.
+        """
+        self.pager.save()
+        expected = dumps(nexusToJSON(self.nexus))
+        with open(self.pager.liveFile) as f:
+            stale = f.read()
+        self.nexus._streaks.append(ObservableList(IgnoreChanges))
+        self.nexus._streaks.append(ObservableList(IgnoreChanges))
+        self.pager.save()
+        with open(self.pager.liveFile, "w") as f:
+            f.write(stale)
+        loaded = HistoryPager(self.directory).load(
+            lambda nexus: NoUserInterface()
+        )
+        assert loaded is not None
+        self.assertEqual(dumps(nexusToJSON(loaded)), expected)
+
+    def test_scoreEvents(self) -> None:
+        """
+        The score events for the L{Nexus} add up to the same points, at the
+        same times, whether or not they span whole shards.
+        """
+        end = self.reference._lastUpdateTime
+        for startTime in [0.0, 1_600_000_000.0 + 86400 * 100.5, end - 86400]:
+            expected = list(
+                self.reference.scoreEvents(startTime=startTime, endTime=end)
+            )
+            actual = list(
+                self.nexus.scoreEvents(startTime=startTime, endTime=end)
+            )
+            self.assertAlmostEqual(
+                sum(each.points for each in actual),
+                sum(each.points for each in expected),
+            )
+            self.assertEqual(actual[-1].time, expected[-1].time)
+            self.assertEqual(
+                [each.time for each in actual],
+                sorted(each.time for each in actual),
+            )
+
+    def test_availableIntentions(self) -> None:
+        """
+        Intentions that haven't been finished with stay available.
+        """
+        self.assertEqual(
+            [each.id for each in self.nexus.availableIntentions],
+            [each.id for each in self.reference.availableIntentions],
+        )
+
+    def test_identity(self) -> None:
+        """
+        While anything is using some paged-out history, reading it back in
+        again gives the same objects, linked up as they were.
+        """
+        streak = self.nexus._streaks[10]
+        pomodoro = streak[0]
+        assert isinstance(pomodoro, Pomodoro)
+        self.assertIs(self.nexus._streaks[10], streak)
+        intention = pomodoro.intention
+        position = int(intention.id) - 1
+        self.assertIs(self.nexus._intentions[position], intention)
+        self.assertIn(pomodoro, intention.pomodoros)
+        self.assertIs(intention.pomodoros[0], pomodoro)
+
+    def test_changes(self) -> None:
+        """
+        Changes to paged-out intentions and pomodoros are written back out,
+        and force a L{NexusDatabase} to rewrite all of its rows.
+        """
+        database = NexusDatabase(join(self.directory, "nexus.sqlite"))
+        self.addCleanup(database.close)
+        database.attach(self.nexus)
+        database.save()
+        self.assertFalse(database._mustCompact)
+        self.nexus._intentions[7].title = "retitled"
+        self.assertTrue(database._mustCompact)
+        pomodoro = self.nexus._streaks[20][0]
+        assert isinstance(pomodoro, Pomodoro)
+        self.nexus.evaluatePomodoro(pomodoro, EvaluationResult.distracted)
+        del pomodoro
+        collect()
+        self.assertEqual(self.nexus._intentions[7].title, "retitled")
+        pomodoro = self.nexus._streaks[20][0]
+        assert isinstance(pomodoro, Pomodoro) and pomodoro.evaluation
+        self.assertEqual(
+            pomodoro.evaluation.result, EvaluationResult.distracted
+        )
+        database.save()
+        reloaded = database.load(lambda nexus: NoUserInterface())
+        assert reloaded is not None
+        self.assertEqual(
+            dumps(nexusToJSON(reloaded)), dumps(nexusToJSON(self.nexus))
+        )
+
+    def test_renumbered(self) -> None:
+        """
+        Removing paged-out history reads all of it back in first.
+        """
+        del self.reference._intentions[3]
+        del self.nexus._intentions[3]
+        self.assertEqual(self.pager._intentions.paged, 0)
+        self.assertEqual(
+            dumps(nexusToJSON(self.nexus)), dumps(nexusToJSON(self.reference))
+        )
+
+    def test_flatMemory(self) -> None:
+        """
+        Once the closed history has been paged out, the memory in use hardly
+        depends on how long the history is.
+        """
+
+        def resident(years: int) -> int:
+            directory = mkdtemp()
+            self.addCleanup(rmtree, directory)
+            start()
+            try:
+                nexus = loadHistory(years)
+                HistoryPager(directory).attach(nexus)
+                collect()
+                current, peak = get_traced_memory()
+            finally:
+                stop()
+            return current
+
+        self.assertLess(resident(3), resident(1) * 1.5)
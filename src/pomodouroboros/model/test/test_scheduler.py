@@ -0,0 +1,131 @@
+from unittest import TestCase
+
+from twisted.internet.task import Clock
+
+from ..boundaries import EvaluationResult, NoUserInterface
+from ..intervals import Break, GracePeriod, Pomodoro, StartPrompt
+from ..nexus import Nexus
+from ..scheduler import AdvanceScheduler
+
+
+class NextEventTimeTests(TestCase):
+    """
+    Tests for L{Nexus.nextEventTime}.
+    """
+
+    def setUp(self) -> None:
+        self.nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+
+    def test_idle(self) -> None:
+        """
+        With nothing running and no sessions, nothing will happen on its own.
+        """
+        self.nexus.advanceToTime(100.0)
+        self.assertIs(self.nexus.nextEventTime(), None)
+
+    def test_intervals(self) -> None:
+        """
+        While an interval is running, the next event is when it ends.
+        """
+        self.nexus.advanceToTime(100.0)
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.assertEqual(self.nexus.nextEventTime(), 400.0)
+        self.nexus.advanceToTime(400.0)
+        self.assertIsInstance(self.nexus._activeInterval, Break)
+        self.assertEqual(self.nexus.nextEventTime(), 700.0)
+        self.nexus.advanceToTime(700.0)
+        self.assertIsInstance(self.nexus._activeInterval, GracePeriod)
+        self.assertEqual(self.nexus.nextEventTime(), 900.0)
+        self.nexus.advanceToTime(900.0)
+        self.assertIs(self.nexus.nextEventTime(), None)
+
+    def test_sessions(self) -> None:
+        """
+        Sessions starting and ending are events, as is the ideal score dropping
+        during a session.
+        """
+        self.nexus.addManualSession(1000.0, 5000.0)
+        self.nexus.advanceToTime(100.0)
+        self.assertEqual(self.nexus.nextEventTime(), 1000.0)
+        self.nexus.advanceToTime(1000.0)
+        prompt = self.nexus._activeInterval
+        assert isinstance(prompt, StartPrompt)
+        self.assertEqual(self.nexus.nextEventTime(), prompt.endTime)
+        self.nexus.advanceToTime(4999.0)
+        self.assertEqual(self.nexus.nextEventTime(), 5000.0)
+        self.nexus.advanceToTime(5000.0)
+        self.assertIs(self.nexus.nextEventTime(), None)
+
+
+class AdvanceSchedulerTests(TestCase):
+    """
+    Tests for L{AdvanceScheduler}.
+    """
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.nexus = Nexus(
+            self.clock.seconds(), lambda nexus: NoUserInterface(), 0
+        )
+        self.scheduler = AdvanceScheduler(self.nexus, self.clock, None)
+        self.scheduler.start()
+
+    def pendingTimes(self) -> list[float]:
+        return [each.getTime() for each in self.clock.getDelayedCalls()]
+
+    def test_idle(self) -> None:
+        """
+        When nothing will happen on its own, no timer is armed at all.
+        """
+        self.assertEqual(self.pendingTimes(), [])
+
+    def test_exactBoundaries(self) -> None:
+        """
+        The timer fires exactly at interval boundaries, and is re-armed when
+        the user starts or finishes a pomodoro.
+        """
+        self.clock.advance(10.0)
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.assertEqual(self.pendingTimes(), [310.0])
+        self.clock.advance(300.0)
+        self.assertEqual(self.nexus._lastUpdateTime, 310.0)
+        self.assertIsInstance(self.nexus._activeInterval, Break)
+        self.assertEqual(self.pendingTimes(), [610.0])
+        self.clock.advance(300.0)
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        pomodoro = self.nexus._activeInterval
+        assert isinstance(pomodoro, Pomodoro)
+        self.assertEqual(self.pendingTimes(), [1210.0])
+        self.clock.advance(100.0)
+        self.scheduler.advance()
+        self.nexus.evaluatePomodoro(pomodoro, EvaluationResult.achieved)
+        self.assertEqual(self.pendingTimes(), [1010.0])
+
+    def test_sessionStart(self) -> None:
+        """
+        Adding a session arms the timer for its start.
+        """
+        self.nexus.addManualSession(1000.0, 2000.0)
+        self.assertEqual(self.pendingTimes(), [1000.0])
+        self.clock.advance(1000.0)
+        self.assertIsInstance(self.nexus._activeInterval, StartPrompt)
+
+    def test_progress(self) -> None:
+        """
+        With a C{progressInterval}, the timer also fires that often while an
+        interval is running.
+        """
+        self.scheduler.progressInterval = 3.0
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.assertEqual(self.pendingTimes(), [3.0])
+        self.clock.advance(3.0)
+        self.assertEqual(self.nexus._lastUpdateTime, 3.0)
+        self.assertEqual(self.pendingTimes(), [6.0])
+
+    def test_stop(self) -> None:
+        """
+        Once stopped, no timer is armed, even if the user starts a pomodoro.
+        """
+        self.scheduler.stop()
+        self.nexus.startPomodoro(self.nexus.addIntention())
+        self.assertEqual(self.pendingTimes(), [])
@@ -1,10 +1,11 @@
 from datetime import datetime, time
+from math import inf
 from unittest import TestCase
 from zoneinfo import ZoneInfo
 
 from datetype import aware
 
-from ..sessions import DailySessionRule, Session, Weekday
+from ..sessions import DailySessionRule, Session, SessionIndex, Weekday
 
 PT = ZoneInfo("America/Los_Angeles")
 
@@ -70,3 +71,68 @@ class SessionGenerationTests(TestCase):
             ),
             None,
         )
+
+
+class SessionIndexTests(TestCase):
+    def test_sessionAt(self) -> None:
+        """
+        L{SessionIndex.sessionAt} finds the same session as a linear search
+        for the first sorted session containing the timestamp, even when
+        sessions overlap, along with the span over which that stays true.
+        """
+        sessions = [
+            Session(100, 200, False),
+            Session(150, 400, False),
+            Session(160, 170, False),
+            Session(300, 350, False),
+            Session(500, 600, True),
+        ]
+        index = SessionIndex.build(reversed(sessions))
+        for timestamp in range(0, 700, 5):
+            expected = next(
+                (s for s in sessions if s.start <= timestamp < s.end), None
+            )
+            session, spanStart, spanEnd = index.sessionAt(timestamp)
+            with self.subTest(timestamp=timestamp):
+                self.assertEqual(session, expected)
+                self.assertLessEqual(spanStart, timestamp)
+                self.assertLess(timestamp, spanEnd)
+                for other in (spanStart, spanEnd - 1):
+                    if other not in (inf, -inf):
+                        self.assertEqual(index.sessionAt(other)[0], session)
+        self.assertEqual(index.sessionAt(50), (None, -inf, 100))
+        self.assertEqual(index.sessionAt(175), (sessions[0], 170, 200))
+        self.assertEqual(index.sessionAt(650), (None, 600, inf))
+
+    def test_overlapping(self) -> None:
+        """
+        L{SessionIndex.overlapping} finds every session overlapping a span of
+        time, or touching it if asked to.
+        """
+        sessions = [
+            Session(100, 200, False),
+            Session(150, 400, False),
+            Session(160, 170, False),
+            Session(300, 350, False),
+            Session(500, 600, True),
+        ]
+        index = SessionIndex.build(sessions)
+        for start in range(50, 650, 50):
+            for end in range(start, 700, 50):
+                with self.subTest(start=start, end=end):
+                    self.assertEqual(
+                        index.overlapping(start, end),
+                        [
+                            s
+                            for s in sessions
+                            if s.start < end and s.end > start
+                        ],
+                    )
+                    self.assertEqual(
+                        index.overlapping(start, end, touching=True),
+                        [
+                            s
+                            for s in sessions
+                            if s.start <= end and s.end >= start
+                        ],
+                    )
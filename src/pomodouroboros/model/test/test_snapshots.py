@@ -0,0 +1,201 @@
+from io import StringIO
+from json import dumps, loads
+from os import listdir
+from os.path import getsize, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from typing import Any
+from unittest import TestCase
+
+from .. import snapshots
+from ..snapshots import (
+    CorruptSnapshot,
+    Durability,
+    SnapshotFile,
+    checksummed,
+    checksumming,
+    loadChecksummed,
+    verified,
+    writeChecksummed,
+)
+
+
+def version(number: int) -> str:
+    """
+    Make up the text of a snapshot of some history that has had C{number}
+    things appended to it.
+    """
+    return dumps(
+        {
+            "number": number,
+            "history": [
+                {"item": each, "text": "x" * 50} for each in range(number)
+            ],
+        }
+    )
+
+
+class ChecksumTests(TestCase):
+    """
+    Tests for the checksums embedded in snapshots.
+    """
+
+    def setUp(self) -> None:
+        self.directory = mkdtemp()
+        self.addCleanup(rmtree, self.directory)
+
+    def test_roundTrip(self) -> None:
+        """
+        A checksummed snapshot is still the same JSON object, with its
+        checksum as an extra member, and is verified as intact.
+        """
+        text = checksummed(version(3))
+        self.assertTrue(verified(text))
+        loaded = loads(text)
+        self.assertTrue(loaded.pop("checksum").startswith("crc32:"))
+        self.assertEqual(loaded, loads(version(3)))
+
+    def test_damaged(self) -> None:
+        """
+        A snapshot that has been changed or truncated fails its checksum; one
+        without a checksum at all can't be verified either way.
+        """
+        text = checksummed(version(3))
+        self.assertIs(verified(text.replace('"item": 2', '"item": 7')), False)
+        self.assertIs(verified(text[:-1]), None)
+        self.assertIs(verified(version(3)), None)
+        filename = join(self.directory, "snapshot.json")
+        with open(filename, "w") as f:
+            f.write(text.replace("xxx", "xyx", 1))
+        with self.assertRaises(CorruptSnapshot):
+            loadChecksummed(filename)
+
+    def test_streamed(self) -> None:
+        """
+        Streaming a snapshot out a piece at a time gives the same text as
+        checksumming it all at once.
+        """
+        text = version(20)
+        out = StringIO()
+        with checksumming(out) as streamed:
+            for start in range(0, len(text), 7):
+                streamed.write(text[start : start + 7])
+        self.assertEqual(out.getvalue(), checksummed(text))
+
+    def test_legacy(self) -> None:
+        """
+        A file written before snapshots had checksums loads as it is.
+        """
+        filename = join(self.directory, "snapshot.json")
+        with open(filename, "w") as f:
+            f.write(version(2))
+        self.assertEqual(loadChecksummed(filename), loads(version(2)))
+        writeChecksummed(filename, version(4))
+        self.assertEqual(loadChecksummed(filename), loads(version(4)))
+
+
+class SnapshotFileTests(TestCase):
+    """
+    Tests for L{SnapshotFile}.
+    """
+
+    def setUp(self) -> None:
+        self.directory = mkdtemp()
+        self.addCleanup(rmtree, self.directory)
+        self.snapshot = SnapshotFile(join(self.directory, "snapshot.json"))
+
+    def writeVersions(self, count: int) -> None:
+        for number in range(count):
+            self.snapshot.write(version(number))
+
+    def backups(self) -> list[str]:
+        return sorted(listdir(self.snapshot.backupDirectory), key=int)
+
+    def damage(self, filename: str) -> None:
+        with open(filename, "r+") as f:
+            f.seek(getsize(filename) // 2)
+            f.write("#")
+
+    def test_ring(self) -> None:
+        """
+        Only a bounded number of previous versions are kept, mostly as deltas
+        much smaller than the snapshot itself.
+        """
+        self.writeVersions(50)
+        backups = self.backups()
+        self.assertGreaterEqual(len(backups), self.snapshot.backups)
+        self.assertLessEqual(len(backups), self.snapshot.backups * 2 + 1)
+        sizes = [
+            getsize(join(self.snapshot.backupDirectory, each))
+            for each in backups
+        ]
+        whole = getsize(self.snapshot.filename)
+        self.assertLess(sum(sizes), whole * 3)
+        self.assertLess(min(sizes) * 5, whole)
+
+    def test_recover(self) -> None:
+        """
+        If the snapshot is damaged, the newest intact version is loaded from
+        the backups instead.
+        """
+        self.writeVersions(20)
+        self.assertEqual(self.snapshot.load()["number"], 19)
+        self.damage(self.snapshot.filename)
+        self.assertFalse(self.snapshot.intact())
+        self.assertEqual(self.snapshot.load()["number"], 19)
+        self.damage(join(self.snapshot.backupDirectory, self.backups()[-1]))
+        self.assertEqual(self.snapshot.load()["number"], 18)
+        self.assertNotIn("checksum", self.snapshot.load())
+
+    def test_nothingIntact(self) -> None:
+        """
+        If neither the snapshot nor any of its backups are intact, loading it
+        raises L{CorruptSnapshot}.
+        """
+        self.writeVersions(3)
+        self.damage(self.snapshot.filename)
+        for each in self.backups():
+            self.damage(join(self.snapshot.backupDirectory, each))
+        with self.assertRaises(CorruptSnapshot):
+            self.snapshot.load()
+
+    def test_streamedVersion(self) -> None:
+        """
+        A version streamed out with L{SnapshotFile.writing} is kept as a whole
+        copy, which later deltas build on.
+        """
+        self.writeVersions(3)
+        with self.snapshot.writing() as out:
+            out.write(version(3))
+        self.writeVersions(2)
+        self.damage(self.snapshot.filename)
+        self.assertEqual(self.snapshot.load()["number"], 1)
+        self.damage(join(self.snapshot.backupDirectory, self.backups()[-1]))
+        self.damage(join(self.snapshot.backupDirectory, self.backups()[-2]))
+        self.assertEqual(self.snapshot.load()["number"], 3)
+
+    def test_durability(self) -> None:
+        """
+        Files are flushed to disk before replacing the old ones only if the
+        durability asks for it, and their directory after it if it asks for
+        that too.
+        """
+        synced: list[Any] = []
+        self.patch(snapshots, "fsync", synced.append)
+        for durability, expected in [
+            (Durability.none, 0),
+            (Durability.file, 1),
+            (Durability.directory, 2),
+        ]:
+            del synced[:]
+            snapshot = SnapshotFile(
+                self.snapshot.filename, durability, backups=0
+            )
+            snapshot.write(version(1))
+            self.assertEqual(len(synced), expected)
+            self.assertEqual(snapshot.load()["number"], 1)
+
+    def patch(self, module: object, name: str, value: object) -> None:
+        original = getattr(module, name)
+        setattr(module, name, value)
+        self.addCleanup(setattr, module, name, original)
@@ -0,0 +1,130 @@
+from io import StringIO
+from json import dumps
+from os.path import getsize, join
+from shutil import rmtree
+from tempfile import mkdtemp
+from tracemalloc import get_traced_memory, reset_peak, start, stop
+from unittest import TestCase
+
+from ..boundaries import EvaluationResult, NoUserInterface
+from ..intention import Estimate
+from ..intervals import Pomodoro
+from ..nexus import Nexus
+from ..storage import (
+    captureNexus,
+    loadFromFile,
+    nexusFromJSON,
+    nexusToJSON,
+    saveNexusToFile,
+    writeNexusJSON,
+)
+from .test_binary import multiYearHistory
+
+
+class NexusToJSONTests(TestCase):
+    """
+    Tests for L{nexusToJSON}.
+    """
+
+    def test_noClone(self) -> None:
+        """
+        Saving a nexus in the middle of a streak doesn't clone it, or consume
+        the durations remaining in the streak.
+        """
+        nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+        nexus.startPomodoro(nexus.addIntention())
+        nexus.advanceToTime(300.0)
+
+        def noCloning() -> Nexus:
+            self.fail("saving should not clone")
+
+        nexus.cloneWithoutUI = noCloning  # type:ignore[method-assign]
+        saved = nexusToJSON(nexus)
+        remaining = [each["seconds"] for each in saved["upcomingDurations"]]
+        self.assertEqual(remaining[:2], [600.0, 300.0])
+        self.assertEqual(nexusToJSON(nexus), saved)
+        nexus.advanceToTime(600.0)
+        nexus.startPomodoro(nexus.addIntention())
+        active = nexus._activeInterval
+        assert active is not None
+        self.assertEqual(active.endTime, 1200.0)
+
+
+class WriteNexusJSONTests(TestCase):
+    """
+    Tests for L{writeNexusJSON}, L{captureNexus} and L{saveNexusToFile}.
+    """
+
+    def test_sameAsDump(self) -> None:
+        """
+        The streamed JSON is exactly what dumping L{nexusToJSON} produces.
+        """
+        nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+        empty = StringIO()
+        writeNexusJSON(nexus, empty)
+        self.assertEqual(empty.getvalue(), dumps(nexusToJSON(nexus)))
+        nexus.addManualSession(100.0, 5000.0)
+        intention = nexus.addIntention("one \N{TOMATO}", "d", estimate=100.0)
+        nexus.startPomodoro(intention)
+        nexus.advanceToTime(400.0)
+        pomodoro = nexus._streaks[-1][0]
+        assert isinstance(pomodoro, Pomodoro)
+        nexus.evaluatePomodoro(pomodoro, EvaluationResult.focused)
+        nexus.advanceToTime(2000.0)
+        saved = nexusToJSON(nexus)
+        out = StringIO()
+        writeNexusJSON(nexus, out)
+        self.assertEqual(out.getvalue(), dumps(saved))
+        directory = mkdtemp()
+        self.addCleanup(rmtree, directory)
+        filename = join(directory, "nexus.json")
+        saveNexusToFile(filename, nexus)
+        self.assertEqual(loadFromFile(filename), saved)
+
+    def test_captured(self) -> None:
+        """
+        What L{captureNexus} writes is the L{Nexus} as it was when it was
+        captured, leaving out any change made since, whether to its existing
+        intentions and intervals or by adding to its history.
+        """
+        nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+        first = nexus.addIntention("first", estimate=100.0)
+        nexus.startPomodoro(first)
+        nexus.advanceToTime(100.0)
+        expected = dumps(nexusToJSON(nexus))
+        write = captureNexus(nexus)
+        first.title = "renamed"
+        first.estimates[0] = Estimate(200.0, 100.0)
+        nexus.evaluatePomodoro(first.pomodoros[0], EvaluationResult.achieved)
+        nexus.addManualSession(100.0, 5000.0)
+        nexus.addIntention("second")
+        nexus.advanceToTime(4000.0)
+        out = StringIO()
+        write(out)
+        self.assertEqual(out.getvalue(), expected)
+
+    def test_boundedMemory(self) -> None:
+        """
+        The memory used while saving doesn't grow with the size of the
+        history.
+        """
+        directory = mkdtemp()
+        self.addCleanup(rmtree, directory)
+        filename = join(directory, "nexus.json")
+
+        def peakWhileSaving(years: int) -> int:
+            nexus = nexusFromJSON(
+                multiYearHistory(years), lambda nexus: NoUserInterface()
+            )
+            start()
+            self.addCleanup(stop)
+            reset_peak()
+            saveNexusToFile(filename, nexus)
+            current, peak = get_traced_memory()
+            stop()
+            return peak
+
+        small = peakWhileSaving(1)
+        large = peakWhileSaving(4)
+        self.assertLess(large, small * 1.5)
+        self.assertGreater(getsize(filename), large * 10)
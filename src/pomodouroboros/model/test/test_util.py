@@ -0,0 +1,89 @@
+from typing import Callable
+from unittest import TestCase
+
+from twisted.internet.defer import Deferred
+from twisted.internet.task import Clock
+
+from ..boundaries import NoUserInterface
+from ..nexus import Nexus
+from ..util import BackgroundSaver
+
+
+class BackgroundSaverTests(TestCase):
+    """
+    Tests for L{BackgroundSaver}.
+    """
+
+    def setUp(self) -> None:
+        self.clock = Clock()
+        self.nexus = Nexus(0.0, lambda nexus: NoUserInterface(), 0)
+        self.prepared: list[float] = []
+        self.written: list[float] = []
+        self.background: list[tuple[Callable[[], None], Deferred[None]]] = []
+        self.saver = BackgroundSaver(
+            self.clock, self.runInBackground, 1.0, self.prepare
+        )
+
+    def prepare(self, nexus: Nexus) -> Callable[[], None]:
+        captured = nexus._lastUpdateTime
+        self.prepared.append(captured)
+        return lambda: self.written.append(captured)
+
+    def runInBackground(self, write: Callable[[], None]) -> Deferred[None]:
+        done: Deferred[None] = Deferred()
+        self.background.append((write, done))
+        return done
+
+    def finishWrite(self) -> None:
+        write, done = self.background.pop(0)
+        write()
+        done.callback(None)
+
+    def test_coalesce(self) -> None:
+        """
+        A burst of changes is captured once, after the quiet period, and
+        written in the background.
+        """
+        for each in range(5):
+            self.nexus.advanceToTime(float(each))
+            self.saver.changed(self.nexus)
+            self.clock.advance(0.5)
+        self.assertEqual(self.prepared, [])
+        self.clock.advance(0.5)
+        self.assertEqual(self.prepared, [4.0])
+        self.assertEqual(self.written, [])
+        self.finishWrite()
+        self.assertEqual(self.written, [4.0])
+
+    def test_writesInOrder(self) -> None:
+        """
+        A write doesn't start until the previous one has finished.
+        """
+        self.saver.changed(self.nexus)
+        self.clock.advance(1.0)
+        self.nexus.advanceToTime(5.0)
+        self.saver.changed(self.nexus)
+        self.clock.advance(1.0)
+        self.assertEqual(self.prepared, [0.0, 5.0])
+        self.assertEqual(len(self.background), 1)
+        self.finishWrite()
+        self.finishWrite()
+        self.assertEqual(self.written, [0.0, 5.0])
+
+    def test_flush(self) -> None:
+        """
+        Flushing captures any pending changes right away, and fires once
+        everything has been written.
+        """
+        self.saver.changed(self.nexus)
+        flushed = self.saver.flush()
+        self.assertEqual(self.prepared, [0.0])
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+        results: list[None] = []
+        flushed.addCallback(results.append)
+        self.assertEqual(results, [])
+        self.finishWrite()
+        self.assertEqual(results, [None])
+        self.saver.flush().addCallback(results.append)
+        self.assertEqual(results, [None, None])
+        self.assertEqual(self.prepared, [0.0])
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+from dataclasses import dataclass, field
 from functools import wraps
 from typing import (
     Callable,
@@ -12,11 +13,17 @@ from typing import (
 )
 
 from dateutil.relativedelta import relativedelta
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.interfaces import (
+    IDelayedCall,
+    IReactorCore,
+    IReactorTime,
+)
 from twisted.python.failure import Failure
 
 from .debugger import debug
 from .nexus import Nexus
-from .storage import saveDefaultNexus
+from .storage import prepareDefaultSave, saveDefaultNexus
 
 T = TypeVar("T")
 
@@ -60,6 +67,96 @@ def showFailures() -> Iterator[None]:
         raise
 
 
+@dataclass
+class BackgroundSaver:
+    """
+    Save a L{Nexus} in the background, once it has been left alone for a
+    while, so that the user's interactions don't wait for the disk.
+
+    Each change only marks the L{Nexus} as dirty.  Once C{quietPeriod} seconds
+    pass without another change, its state is captured (which is quick) and
+    handed to C{runInBackground} to be written out (which is not), so a burst
+    of changes results in a single write.
+    """
+
+    clock: IReactorTime
+    runInBackground: Callable[[Callable[[], None]], Deferred[None]]
+    """
+    Run a function to write some captured state in the background, returning
+    a L{Deferred} that fires when it has finished.
+    """
+    quietPeriod: float = 1.0
+    prepare: Callable[[Nexus], Callable[[], None]] = prepareDefaultSave
+    """
+    Capture the state of a L{Nexus}, returning a function that writes it.
+    """
+
+    _dirty: Nexus | None = field(default=None, init=False)
+    _timer: IDelayedCall | None = field(default=None, init=False)
+    _writing: Deferred[None] = field(
+        default_factory=lambda: succeed(None), init=False
+    )
+    """
+    Fires when every write started so far has finished; writes are run one
+    after another, in order.
+    """
+
+    def start(self, reactor: IReactorCore) -> None:
+        """
+        Use this saver for every L{interactionRoot}, and flush it before the
+        given reactor shuts down.
+        """
+        global _backgroundSaver
+        _backgroundSaver = self
+        reactor.addSystemEventTrigger("before", "shutdown", self.flush)
+
+    def changed(self, nexus: Nexus) -> None:
+        """
+        The given L{Nexus} was changed, and should be saved soon.
+        """
+        self._dirty = nexus
+        if self._timer is not None and self._timer.active():
+            self._timer.reset(self.quietPeriod)
+        else:
+            self._timer = self.clock.callLater(self.quietPeriod, self._save)
+
+    def flush(self) -> Deferred[None]:
+        """
+        Save any changes right away.
+
+        @return: a L{Deferred} that fires once everything has been written.
+        """
+        if self._timer is not None and self._timer.active():
+            self._timer.cancel()
+        self._save()
+        flushed: Deferred[None] = Deferred()
+
+        def written(result: None) -> None:
+            flushed.callback(None)
+
+        self._writing.addCallback(written)
+        return flushed
+
+    def _save(self) -> None:
+        self._timer = None
+        nexus, self._dirty = self._dirty, None
+        if nexus is None:
+            return
+        debug("capturing nexus to save")
+        write = self.prepare(nexus)
+
+        def inBackground(result: None) -> Deferred[None]:
+            return self.runInBackground(write)
+
+        def failed(failure: Failure) -> None:
+            print(failure.getTraceback())
+
+        self._writing.addCallback(inBackground).addErrback(failed)
+
+
+_backgroundSaver: BackgroundSaver | None = None
+
+
 class HasNexus(Protocol):
     nexus: Nexus
 
@@ -76,6 +173,8 @@ def interactionRoot(
     Decorator that should wrap every operation that potentially mutates the
     model, saving it back to disk afterwards if it completes without raising an
     exception, or printing the exception to the terminal if it does raise one.
+
+    Once a L{BackgroundSaver} has been started, saving is left to it.
     """
 
     @wraps(c)
@@ -85,6 +184,9 @@ def interactionRoot(
         with showFailures():
             debug("start action:", c)
             result = c(self, *args, **kwargs)
+            if (saver := _backgroundSaver) is not None:
+                saver.changed(self.nexus)
+                return result
             debug("save nexus:", result)
             saveDefaultNexus(self.nexus)
             debug("saved:", result)